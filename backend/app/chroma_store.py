@@ -3,11 +3,16 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import hashlib
 import os
-import chromadb
-from sentence_transformers import SentenceTransformer
-from langchain_chroma import Chroma
+import re
+import threading
+import zlib
 from app.config import settings
+from app.embedding_cache import EmbeddingCache, text_key
+from app.micro_batcher import MicroBatcher
+from app.onnx_encoder import OnnxSentenceEncoder, onnx_model_dir
+from app.vector_cache import DocumentVectorCache, load_document_vectors
 
 
 # --------------------------------------------------
@@ -15,9 +20,30 @@ from app.config import settings
 # --------------------------------------------------
 
 PERSIST_DIR = settings.CHROMA_PERSIST_DIR
-os.makedirs(PERSIST_DIR, exist_ok=True)
 
-print("🔥 Chroma persist directory:", PERSIST_DIR)
+
+# --------------------------------------------------
+# 🔒 Thread-Safe Lazy Loading
+# --------------------------------------------------
+#
+# Nothing heavy happens at import time: torch, the embedding model,
+# the Chroma client and the collections are created on first use
+# (or by `warm_up` at startup). Same pattern as services/reranker.
+#
+
+_lock = threading.RLock()
+_embedder = None
+_embedding_cache = None
+_tokenizer = None
+_client = None
+_research_vector_store = None
+_pdf_vector_stores = {}
+
+# Per-document chunk matrices for exact in-memory search
+document_vectors = DocumentVectorCache(
+    max_bytes=settings.DOC_VECTOR_CACHE_MAX_MB * 1024 * 1024,
+    max_chunks=settings.DOC_VECTOR_CACHE_MAX_CHUNKS,
+)
 
 
 # --------------------------------------------------
@@ -28,10 +54,23 @@ class SentenceTransformerEmbedder:
     """
     Safe wrapper for SentenceTransformer.
     Prevents tokenizer crashes from bad inputs.
+    Document embeddings are served from `cache` when one is given;
+    concurrent queries are encoded together when batching is enabled.
     """
 
-    def __init__(self, model):
+    def __init__(self, model, cache: EmbeddingCache | None = None):
         self.model = model
+        self.cache = cache
+        self.batcher = (
+            MicroBatcher(
+                self._encode,
+                max_size=settings.EMBED_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EMBED_BATCH_MAX_WAIT_MS,
+                name="embed-batcher",
+            )
+            if settings.EMBED_QUERY_BATCHING
+            else None
+        )
 
     def embed_documents(self, texts):
 
@@ -54,14 +93,30 @@ class SentenceTransformerEmbedder:
         if not safe_texts:
             return []
 
-        embeddings = self.model.encode(
-            safe_texts,
+        if self.cache is None:
+            return self._encode(safe_texts).tolist()
+
+        keys = [text_key(t) for t in safe_texts]
+        cached = self.cache.get_many(keys)
+
+        missing = [i for i, k in enumerate(keys) if k not in cached]
+
+        if missing:
+            fresh = self._encode([safe_texts[i] for i in missing])
+            self.cache.put_many([keys[i] for i in missing], fresh)
+
+            for i, vector in zip(missing, fresh):
+                cached[keys[i]] = vector
+
+        return [cached[k].tolist() for k in keys]
+
+    def _encode(self, texts):
+        return self.model.encode(
+            texts,
             normalize_embeddings=True,
             show_progress_bar=False,
         )
 
-        return embeddings.tolist()
-
     def embed_query(self, text):
 
         if text is None:
@@ -75,11 +130,10 @@ class SentenceTransformerEmbedder:
         if not cleaned:
             cleaned = "empty"
 
-        embedding = self.model.encode(
-            [f"query: {cleaned}"],
-            normalize_embeddings=True,
-            show_progress_bar=False,
-        )
+        if self.batcher is not None:
+            return self.batcher.submit(f"query: {cleaned}").tolist()
+
+        embedding = self._encode([f"query: {cleaned}"])
 
         return embedding[0].tolist()
 
@@ -88,26 +142,129 @@ class SentenceTransformerEmbedder:
 # Initialize Embedding Model
 # --------------------------------------------------
 
-_embedding_model = SentenceTransformer(settings.SENTENCE_EMBED_MODEL)
-_embedder = SentenceTransformerEmbedder(_embedding_model)
+def load_embedding_model(backend: str = settings.EMBED_BACKEND):
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(settings.SENTENCE_EMBED_MODEL)
+
+    return OnnxSentenceEncoder(
+        onnx_model_dir(settings.EMBED_ONNX_DIR, settings.SENTENCE_EMBED_MODEL),
+        backend=backend,
+    )
+
+
+def get_embedder():
+    """
+    Lazily loads the embedding model and its cache.
+    Thread-safe.
+    """
+    global _embedder, _embedding_cache
+
+    if _embedder is not None:
+        return _embedder
+
+    with _lock:
+        if _embedder is None:
+            # Vectors differ slightly per backend, so each gets its own cache
+            if settings.EMBED_CACHE_ENABLED:
+                _embedding_cache = EmbeddingCache(
+                    directory=settings.EMBED_CACHE_DIR,
+                    model_name=f"{settings.SENTENCE_EMBED_MODEL}@{settings.EMBED_BACKEND}",
+                    capacity=settings.EMBED_CACHE_MAX_ENTRIES,
+                )
+
+            _embedder = SentenceTransformerEmbedder(
+                load_embedding_model(),
+                _embedding_cache,
+            )
+
+    return _embedder
+
+
+def embed_query(text):
+    """
+    Normalized query embedding, reusable across cache lookup and search.
+    """
+    return get_embedder().embed_query(text)
+
+
+def get_embedding_tokenizer():
+    """
+    The embedding model's tokenizer on its own (no model weights), so
+    chunks can be sized in the same tokens the embedder sees.
+    """
+    global _tokenizer
+
+    if _tokenizer is not None:
+        return _tokenizer
+
+    with _lock:
+        if _tokenizer is None:
+            from transformers import AutoTokenizer
+
+            _tokenizer = AutoTokenizer.from_pretrained(settings.SENTENCE_EMBED_MODEL)
+
+    return _tokenizer
+
+
+def embedding_cache_stats():
+    if _embedder is None:
+        return {"loaded": False}
+    return _embedding_cache.stats() if _embedding_cache else {"enabled": False}
+
+
+def query_batcher_stats():
+    if _embedder is None:
+        return {"loaded": False}
+    return _embedder.batcher.stats() if _embedder.batcher else {"enabled": False}
 
 
 # --------------------------------------------------
 # Persistent Chroma Client
 # --------------------------------------------------
 
-client = chromadb.PersistentClient(path=PERSIST_DIR)
+def get_chroma_client():
+    global _client
+
+    if _client is not None:
+        return _client
+
+    with _lock:
+        if _client is None:
+            import chromadb
+
+            os.makedirs(PERSIST_DIR, exist_ok=True)
+            print("🔥 Chroma persist directory:", PERSIST_DIR)
+            _client = chromadb.PersistentClient(path=PERSIST_DIR)
+
+    return _client
+
+
+def _open_store(collection_name: str):
+    from langchain_chroma import Chroma
+
+    return Chroma(
+        collection_name=collection_name,
+        client=get_chroma_client(),
+        embedding_function=get_embedder(),
+    )
 
 
 # --------------------------------------------------
 # 📚 Research Papers (arXiv abstracts)
 # --------------------------------------------------
 
-research_vector_store = Chroma(
-    collection_name="research_papers",
-    client=client,
-    embedding_function=_embedder,
-)
+def get_research_vector_store():
+    global _research_vector_store
+
+    if _research_vector_store is not None:
+        return _research_vector_store
+
+    with _lock:
+        if _research_vector_store is None:
+            _research_vector_store = _open_store("research_papers")
+
+    return _research_vector_store
 
 
 def add_research_abstracts(abstracts, metadatas, ids):
@@ -129,7 +286,7 @@ def add_research_abstracts(abstracts, metadatas, ids):
     if not safe_abstracts:
         return
 
-    research_vector_store.add_texts(
+    get_research_vector_store().add_texts(
         texts=safe_abstracts,
         metadatas=metadatas,
         ids=ids,
@@ -138,7 +295,7 @@ def add_research_abstracts(abstracts, metadatas, ids):
 
 def search_research_papers(query, n_results=5):
 
-    return research_vector_store.similarity_search(
+    return get_research_vector_store().similarity_search(
         query=str(query),
         k=min(n_results, 15),
     )
@@ -148,24 +305,87 @@ def search_research_papers(query, n_results=5):
 # 📄 PDF Chunks (uploads + arXiv)
 # --------------------------------------------------
 
-pdf_vector_store = Chroma(
-    collection_name="pdf_chunks",
-    client=client,
-    embedding_function=_embedder,
-)
-
 # Shared owner for global (arXiv) docs
 GLOBAL_OWNER = "GLOBAL"
 
 
-def add_chunks_to_chroma(chunks, doc_id: str):
+# --------------------------------------------------
+# 🧭 Partition Routing
+# --------------------------------------------------
+#
+#   single:  everything in `pdf_chunks`, tenants split by metadata
+#   owner:   `pdf_chunks_global` (arXiv) + one collection per user
+#   sharded: `pdf_chunks_global` + PDF_SHARDS collections, users
+#            hashed onto them (owner filter still applied)
+#
+# All of a document's chunks live in its owner's partition, so every
+# per-document operation is routed by owner. Existing data is moved
+# with scripts/migrate_pdf_partitions.py.
+#
+
+def pdf_partition(owner, partitioning: str | None = None) -> tuple[str, bool]:
+    """
+    (collection name, whether queries still need the user_id filter)
+    for the chunks of `owner`.
+    """
+    partitioning = partitioning or settings.PDF_PARTITIONING
+    owner = str(owner) if owner else GLOBAL_OWNER
+
+    if partitioning == "single":
+        return "pdf_chunks", True
+
+    if owner == GLOBAL_OWNER:
+        return "pdf_chunks_global", False
+
+    if partitioning == "sharded":
+        shard = zlib.crc32(owner.encode("utf-8")) % settings.PDF_SHARDS
+        return f"pdf_chunks_s{shard:03d}", True
+
+    # Collection names: 3-63 chars of [A-Za-z0-9._-]
+    if not re.fullmatch(r"[A-Za-z0-9]{1,48}", owner):
+        owner = hashlib.sha1(owner.encode("utf-8")).hexdigest()[:24]
+
+    return f"pdf_chunks_u_{owner}", False
+
+
+def get_pdf_vector_store(owner=GLOBAL_OWNER):
+    name, _ = pdf_partition(owner)
+    store = _pdf_vector_stores.get(name)
+
+    if store is not None:
+        return store
+
+    with _lock:
+        if name not in _pdf_vector_stores:
+            _pdf_vector_stores[name] = _open_store(name)
+
+    return _pdf_vector_stores[name]
+
+
+def chunk_id(doc_id: str, section: str, text: str) -> str:
+    """
+    Content-addressed chunk id: re-indexing unchanged text yields the
+    same id, so only the delta has to be embedded.
+    """
+    return f"{doc_id}_{text_key(section + chr(10) + text)[:32]}"
+
+
+def add_chunks_to_chroma(chunks, doc_id: str, skip_ids=None) -> list[str]:
+    """
+    Upserts chunks under content-hash ids and returns the ids of every
+    valid chunk. Chunks whose id is in `skip_ids` (already stored) are
+    not embedded again.
+    """
 
     if not settings.ENABLE_CHROMA or not chunks:
-        return
+        return []
 
+    skip_ids = skip_ids or set()
     texts, metadatas, ids = [], [], []
+    seen = []
+    queued = set()
 
-    for i, c in enumerate(chunks):
+    for c in chunks:
 
         if isinstance(c, dict):
             content = c.get("page_content")
@@ -191,79 +411,314 @@ def add_chunks_to_chroma(chunks, doc_id: str):
 
         owner = metadata.get("user_id")
         owner = str(owner) if owner else GLOBAL_OWNER
+        section = metadata.get("section") or "body"
+
+        cid = chunk_id(doc_id, section, cleaned)
+        seen.append(cid)
+
+        # Unchanged, or a repeat within this batch
+        if cid in skip_ids or cid in queued:
+            continue
+
+        queued.add(cid)
 
         texts.append(cleaned)
 
         metadatas.append({
             "metadata_id": str(metadata_id),
             "user_id": owner,
-            "section": metadata.get("section") or "body",
+            "section": section,
         })
 
-        ids.append(f"{doc_id}_{i}")
+        ids.append(cid)
+
+    # One document has one owner, but route each chunk regardless
+    partitions = {}
 
-    if texts:
-        pdf_vector_store.add_texts(
+    for text, metadata, cid in zip(texts, metadatas, ids):
+        batch = partitions.setdefault(pdf_partition(metadata["user_id"])[0], ([], [], []))
+        batch[0].append(text)
+        batch[1].append(metadata)
+        batch[2].append(cid)
+
+    for (texts, metadatas, ids) in partitions.values():
+        get_pdf_vector_store(metadatas[0]["user_id"]).add_texts(
             texts=texts,
             metadatas=metadatas,
             ids=ids,
         )
 
+    if partitions:
+        document_vectors.invalidate(doc_id)
+
+    return seen
+
+
+def _pdf_collection(owner):
+    # Make sure the collection exists with the store's settings
+    get_pdf_vector_store(owner)
+    return get_chroma_client().get_collection(pdf_partition(owner)[0])
+
+
+def get_chunk_ids(doc_id: str, owner: str, batch_size: int = 1000) -> set[str]:
+    """
+    Ids of everything Chroma holds for a document.
+    """
+
+    if not settings.ENABLE_CHROMA:
+        return set()
+
+    collection = _pdf_collection(owner)
+    ids = set()
+
+    while True:
+        page = collection.get(
+            where={"metadata_id": str(doc_id)},
+            include=[],
+            limit=batch_size,
+            offset=len(ids),
+        )
+
+        if not page["ids"]:
+            return ids
+
+        ids.update(page["ids"])
+
+
+def delete_chunks(ids, owner: str, batch_size: int = 1000):
+    if not settings.ENABLE_CHROMA or not ids:
+        return
+
+    collection = _pdf_collection(owner)
+    ids = list(ids)
+
+    for start in range(0, len(ids), batch_size):
+        collection.delete(ids=ids[start:start + batch_size])
+
+    # Ids are "<document id>_<hash>"
+    for document_id in {i.rsplit("_", 1)[0] for i in ids}:
+        document_vectors.invalidate(document_id)
+
+
+def copy_document_vectors(
+    source_doc_id: str,
+    target_doc_id: str,
+    owner: str,
+    source_owner: str,
+    batch_size: int = 256,
+) -> int:
+    """
+    Duplicates every chunk of `source_doc_id` under `target_doc_id`,
+    reusing the stored embeddings (no model call). Only metadata_id
+    and user_id change, so the copy is isolated by the same filters
+    (and lands in the same partition) as a freshly indexed document.
+    Chunks the target held before and the source lacks are deleted.
+    Returns the number of chunks copied.
+    """
+
+    if not settings.ENABLE_CHROMA:
+        return 0
+
+    source = _pdf_collection(source_owner)
+    target = _pdf_collection(owner)
+    stale = get_chunk_ids(target_doc_id, owner)
+
+    prefix = f"{source_doc_id}_"
+    copied = 0
+
+    while True:
+        page = source.get(
+            where={"metadata_id": str(source_doc_id)},
+            include=["embeddings", "documents", "metadatas"],
+            limit=batch_size,
+            offset=copied,
+        )
+
+        if not page["ids"]:
+            break
+
+        # Keep the content-hash suffix so later diffs line up
+        ids = [
+            f"{target_doc_id}_{source_id.removeprefix(prefix)}"
+            for source_id in page["ids"]
+        ]
+        metadatas = [
+            {**metadata, "metadata_id": str(target_doc_id), "user_id": owner}
+            for metadata in page["metadatas"]
+        ]
+
+        target.upsert(
+            ids=ids,
+            embeddings=page["embeddings"],
+            documents=page["documents"],
+            metadatas=metadatas,
+        )
+
+        stale.difference_update(ids)
+        copied += len(ids)
+
+    if copied:
+        delete_chunks(stale, owner)
+        document_vectors.invalidate(target_doc_id)
+
+    return copied
+
+
+def distance_to_similarity(distance: float) -> float:
+    """
+    Chroma's default space is squared L2; on normalized embeddings
+    that is 2 - 2·cos, so cosine similarity = 1 - d / 2.
+    """
+    return 1.0 - float(distance) / 2.0
+
+
+def weight_by_section(results, section_weights: dict, n_results: int) -> list:
+    """
+    Re-scores (doc, distance) pairs as similarity × section weight
+    (sections not listed weigh 1.0) and returns the best `n_results`
+    as (doc, score), highest first.
+    """
+    scored = [
+        (
+            doc,
+            distance_to_similarity(distance)
+            * section_weights.get(doc.metadata.get("section"), 1.0),
+        )
+        for doc, distance in results
+    ]
+    scored.sort(key=lambda pair: pair[1], reverse=True)
+
+    return scored[:n_results]
+
 
 def semantic_search(
     query,
     n_results=5,
     metadata_id=None,
     user_id=None,
-    section_priority=False,
+    section_weights=None,
+    query_embedding=None,
+    index_version=None,
+    with_scores=False,
 ):
+    """
+    One similarity search. With `section_weights` it over-fetches
+    (RETRIEVAL_OVERFETCH × n_results) and keeps the best n_results by
+    similarity × section weight, so preferred sections rank higher
+    without a second, section-filtered query.
+
+    Searches scoped to one document use the in-memory document vector
+    cache (exact top-k); pass the document's `index_version` so a
+    re-index in another process is noticed.
+
+    `with_scores` returns (doc, score) pairs, best first: cosine
+    similarity, × section weight when weights are given.
+    """
+
+    owner_filter = str(user_id) if user_id else GLOBAL_OWNER
+    store = get_pdf_vector_store(owner_filter)
+    _, shared_partition = pdf_partition(owner_filter)
 
     filters = []
 
     if metadata_id:
         filters.append({"metadata_id": str(metadata_id)})
 
-    owner_filter = str(user_id) if user_id else GLOBAL_OWNER
-    filters.append({"user_id": owner_filter})
+    # A per-owner partition holds nothing else to filter out
+    if shared_partition or not filters:
+        filters.append({"user_id": owner_filter})
 
-    # --------------------------------------------------
-    # Priority Search (abstract + introduction)
-    # --------------------------------------------------
+    combined_filter = (
+        filters[0]
+        if len(filters) == 1
+        else {"$and": filters}
+    )
 
-    if section_priority:
-        priority_filters = filters + [
-            {"section": {"$in": ["abstract", "introduction"]}}
-        ]
+    k = n_results * settings.RETRIEVAL_OVERFETCH if section_weights else n_results
+
+    # All paths return (doc, distance), lower = closer
+    results = None
 
-        priority_filter = (
-            priority_filters[0]
-            if len(priority_filters) == 1
-            else {"$and": priority_filters}
+    if metadata_id and settings.DOC_VECTOR_CACHE_ENABLED:
+        if query_embedding is None:
+            query_embedding = embed_query(query)
+
+        results = _search_cached_document(
+            (str(metadata_id), owner_filter),
+            combined_filter,
+            index_version or 0,
+            query_embedding,
+            k,
         )
 
-        results = pdf_vector_store.similarity_search_with_score(
+    if results is None and query_embedding is not None:
+        results = store.similarity_search_by_vector_with_relevance_scores(
+            embedding=query_embedding,
+            k=k,
+            filter=combined_filter,
+        )
+    elif results is None:
+        results = store.similarity_search_with_score(
             query=str(query),
-            k=n_results,
-            filter=priority_filter,
+            k=k,
+            filter=combined_filter,
         )
 
-        if len(results) >= n_results:
-            return [doc for doc, _ in results]
+    if section_weights:
+        results = weight_by_section(results, section_weights, n_results)
+    else:
+        results = [(doc, distance_to_similarity(d)) for doc, d in results]
 
-    # --------------------------------------------------
-    # Fallback Search
-    # --------------------------------------------------
+    if with_scores:
+        return results
 
-    combined_filter = (
-        filters[0]
-        if len(filters) == 1
-        else {"$and": filters}
-    )
+    return [doc for doc, _ in results]
 
-    results = pdf_vector_store.similarity_search_with_score(
-        query=str(query),
-        k=n_results,
-        filter=combined_filter,
+
+def _search_cached_document(key, where, version, query_embedding, k):
+    """
+    Exact top-k over the document's cached vectors as (doc, distance),
+    or None when the document is too large for the cache.
+    """
+    from langchain.schema import Document
+
+    entry = document_vectors.get(
+        key,
+        version,
+        lambda: load_document_vectors(
+            _pdf_collection(key[1]), where, version, document_vectors.max_chunks
+        ),
     )
 
-    return [doc for doc, _ in results]
\ No newline at end of file
+    if entry is None:
+        return None
+
+    # Squared L2 on unit vectors, same scale as Chroma's distances
+    return [
+        (
+            Document(page_content=entry.texts[row], metadata=entry.metadatas[row]),
+            2.0 - 2.0 * similarity,
+        )
+        for row, similarity in entry.top_k(query_embedding, k)
+    ]
+
+
+def document_vector_cache_stats():
+    return document_vectors.stats()
+
+# --------------------------------------------------
+# 🔥 Warm-up + Readiness
+# --------------------------------------------------
+
+def models_ready() -> bool:
+    return _embedder is not None and bool(_pdf_vector_stores)
+
+
+def warm_up():
+    """
+    Loads the embedder and opens both collections, then runs one
+    query so the first real request does not pay for lazy setup.
+    """
+    get_research_vector_store()
+    get_pdf_vector_store(GLOBAL_OWNER)
+    embed_query("warm-up")
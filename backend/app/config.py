@@ -3,6 +3,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from pathlib import Path
+from typing import Literal
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,8 +28,83 @@ class Settings(BaseSettings):
     # --------------------
     CHROMA_PERSIST_DIR: str = "./chroma_persist"
     SENTENCE_EMBED_MODEL: str = "BAAI/bge-base-en-v1.5"
+    # torch: SentenceTransformer fp32
+    # onnx / onnx-int8: onnxruntime export from scripts/download_models.py
+    EMBED_BACKEND: Literal["torch", "onnx", "onnx-int8"] = "torch"
+    EMBED_ONNX_DIR: str = str(BASE_DIR.parent / "models" / "onnx")
     ENABLE_CHROMA: bool = True
 
+    # On-disk cache of chunk embeddings (model + normalized text hash)
+    EMBED_CACHE_ENABLED: bool = True
+    EMBED_CACHE_DIR: str = "./embedding_cache"
+    EMBED_CACHE_MAX_ENTRIES: int = 200_000
+
+    # PDF chunking: "chars" is the original 700 / 150 character splitter,
+    # "tokens" sizes chunks with the embedding tokenizer (opt-in: run
+    # scripts/reindex_documents.py after switching so stored chunks and
+    # prompt_excerpt agree).
+    # Keep CHUNK_TOKENS well under 512 so query + chunk fits the reranker
+    CHUNKER: Literal["tokens", "chars"] = "chars"
+    CHUNK_TOKENS: int = 256
+    CHUNK_OVERLAP_TOKENS: int = 32
+
+    # Retrieval: one search over-fetching n_results × RETRIEVAL_OVERFETCH,
+    # re-scored as cosine similarity × section weight (unlisted = 1.0)
+    RETRIEVAL_OVERFETCH: int = 3
+    SECTION_WEIGHTS_ASK: dict[str, float] = {
+        "abstract": 1.05,
+        "introduction": 1.05,
+    }
+    SECTION_WEIGHTS_SUMMARY: dict[str, float] = {
+        "abstract": 1.3,
+        "introduction": 1.25,
+        "conclusion": 1.15,
+        "results": 1.05,
+    }
+
+    # Layout of PDF chunks across Chroma collections:
+    #   single:  one `pdf_chunks` collection, metadata filters only
+    #   owner:   shared arXiv collection + one collection per user
+    #   sharded: shared arXiv collection + PDF_SHARDS user shards
+    # Move existing data with scripts/migrate_pdf_partitions.py first
+    PDF_PARTITIONING: Literal["single", "owner", "sharded"] = "single"
+    PDF_SHARDS: int = 16
+
+    # In-memory vectors of recently queried documents: exact top-k
+    # instead of a filtered HNSW search. Larger documents skip it.
+    DOC_VECTOR_CACHE_ENABLED: bool = True
+    DOC_VECTOR_CACHE_MAX_MB: int = 512
+    DOC_VECTOR_CACHE_MAX_CHUNKS: int = 5000
+
+    # Concurrent embed_query calls are encoded as one batch
+    EMBED_QUERY_BATCHING: bool = True
+    EMBED_BATCH_MAX_SIZE: int = 32
+    EMBED_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # Cross-encoder reranker
+    # torch: sentence-transformers CrossEncoder fp32
+    # onnx / onnx-int8: export from scripts/download_models.py --onnx
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_BACKEND: Literal["torch", "onnx", "onnx-int8"] = "torch"
+    RERANK_MAX_LENGTH: int = 512
+    # Pairs are grouped by token length; a forward pass holds at most
+    # this many (padded) tokens, so short pairs run in bigger batches
+    RERANK_MAX_BATCH_TOKENS: int = 8192
+    # Concurrent questions are scored together in one model pass
+    RERANK_BATCHING: bool = True
+    RERANK_BATCH_MAX_PAIRS: int = 128
+    RERANK_BATCH_MAX_WAIT_MS: float = 3.0
+
+    # Cascade: vector scores (similarity × section weight) decide how
+    # much cross-encoder work a question needs.
+    # skip:   the prompt's chunks lead the rest by >= RERANK_SKIP_MARGIN
+    # shrink: only candidates within RERANK_SHRINK_WINDOW of the best
+    #         (at least RERANK_MIN_CANDIDATES) are reranked
+    RERANK_CASCADE: bool = True
+    RERANK_SKIP_MARGIN: float = 0.08
+    RERANK_SHRINK_WINDOW: float = 0.15
+    RERANK_MIN_CANDIDATES: int = 6
+
     # --------------------
     # Ollama (Local LLM)
     # --------------------
@@ -36,6 +112,85 @@ class Settings(BaseSettings):
     OLLAMA_MODEL: str = "phi3:mini"
     LLM_TEMP: float = 0.2
     LLM_MAX_TOKENS: int = 1000
+    OLLAMA_TIMEOUT: float = 300.0
+    OLLAMA_MAX_CONNECTIONS: int = 8
+    # Per process (each uvicorn worker / CLI run schedules on its own)
+    LLM_MAX_CONCURRENCY: int = 1
+    LLM_MAX_QUEUE: int = 32
+
+    # separate:    second prompt re-sends question + answer
+    # single_pass: answer and follow-ups from one generation
+    # context:     second call reuses the answer's Ollama context
+    FOLLOWUP_MODE: Literal["separate", "single_pass", "context"] = "separate"
+    FOLLOWUPS_DEFERRED: bool = False
+
+    # Generate /pdf/summarize output as soon as indexing finishes
+    # (API process only; bulk pre-indexing and scripts skip it)
+    SUMMARY_EAGER: bool = False
+
+    # Semantic answer cache (paraphrased questions on the same document)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_THRESHOLD: float = 0.95
+    ANSWER_CACHE_MAX_ENTRIES: int = 2048
+    ANSWER_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+
+    # --------------------
+    # Executors (blocking work off the event loop)
+    # --------------------
+    # Embed workers mostly wait on the query batcher, so this bounds
+    # how many queries can share one batch
+    EMBED_WORKERS: int = 16
+    # Threads calling the cross-encoder directly (RERANK_BATCHING off)
+    RERANK_WORKERS: int = 2
+    # With RERANK_BATCHING, rerank workers only wait on the batcher's
+    # model thread, so this bounds how many questions share one pass
+    RERANK_BATCH_WORKERS: int = 16
+    EXECUTOR_MAX_PENDING: int = 64
+
+    # Load embedder, Chroma and reranker in the background at startup
+    WARMUP_MODELS: bool = True
+
+    # --------------------
+    # Uploads
+    # --------------------
+    UPLOAD_MAX_BYTES: int = 50 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+
+    # --------------------
+    # Ingestion queue
+    # --------------------
+    INGEST_PROCESS_WORKERS: int = 2
+    INGEST_PAGES_PER_TASK: int = 16         # pages per extraction task
+    INGEST_CHUNK_WINDOW_CHARS: int = 8000   # text buffered before splitting
+    INGEST_BATCH_SIZE: int = 64             # chunks per embed + Chroma write
+
+    # PDF text backend; "auto" = pypdfium2, then pypdf, then pdfplumber
+    PDF_EXTRACTOR: Literal["auto", "pypdfium2", "pypdf", "pdfplumber"] = "auto"
+    # Retry empty / garbled pages with the other backends
+    PDF_EXTRACTOR_FALLBACK: bool = True
+
+    # Per-page extracted text (zstd) so re-chunking skips PDF parsing
+    TEXT_CACHE_ENABLED: bool = True
+    TEXT_CACHE_DIR: str = "./text_cache"
+    TEXT_CACHE_LEVEL: int = 3
+    INGEST_CONCURRENCY: int = 2
+    INGEST_MAX_ATTEMPTS: int = 3
+    INGEST_RETRY_BASE_SECONDS: float = 10.0
+    INGEST_POLL_SECONDS: float = 1.0
+
+    # --------------------
+    # PDF downloads + arXiv pre-indexing
+    # --------------------
+    DOWNLOAD_MAX_CONNECTIONS: int = 16
+    DOWNLOAD_MAX_CONNECTIONS_PER_HOST: int = 4
+    DOWNLOAD_TIMEOUT_SECONDS: float = 120.0
+
+    ARXIV_DOWNLOAD_CONCURRENCY: int = 4
+    ARXIV_INDEX_CONCURRENCY: int = 2
+    ARXIV_RATE_PER_HOST: float = 1.0        # request starts per second per host
+    ARXIV_MAX_ATTEMPTS: int = 3
+    ARXIV_PREINDEX_CHECKPOINT: str = "./arxiv_preindex_checkpoint.json"
+    ARXIV_PREINDEX_ON_STARTUP: bool = False
 
     # --------------------
     # MongoDB (optional alias)
@@ -64,6 +64,13 @@ async def create_indexes():
         name="documents_ready_flag"
     )
 
+    # Content hash of the stored PDF (dedup)
+    await db.documents.create_index(
+        "sha256",
+        name="documents_sha256",
+        partialFilterExpression={"sha256": {"$type": "string"}}
+    )
+
 
     # ==================================================
     # 📚 Research papers (arXiv metadata)
@@ -92,6 +99,34 @@ async def create_indexes():
         name="chat_history_ttl"
     )
 
+    # ==================================================
+    # ⏳ Ingestion jobs
+    # ==================================================
+
+    # One job per document (re-queued in place)
+    await db.ingestion_jobs.create_index(
+        "document_id",
+        unique=True,
+        name="ingestion_jobs_document_unique"
+    )
+
+    # Workers claim the oldest runnable job
+    await db.ingestion_jobs.create_index(
+        [("status", 1), ("next_run_at", 1)],
+        name="ingestion_jobs_claim"
+    )
+
+    # ==================================================
+    # 📝 Cached document summaries
+    # ==================================================
+
+    # One summary per document + model + prompt version
+    await db.document_summaries.create_index(
+        [("document_id", 1), ("model", 1), ("prompt_version", 1)],
+        unique=True,
+        name="document_summaries_lookup"
+    )
+
     # ==================================================
     # 🕘 Recently viewed (uploads + arXiv)
     # ==================================================
@@ -0,0 +1,249 @@
+# backend/app/embedding_cache.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# --------------------------------------------------
+# Keys
+# --------------------------------------------------
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _safe_dirname(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+# --------------------------------------------------
+# Content-addressed Embedding Cache
+# --------------------------------------------------
+
+class EmbeddingCache:
+    """
+    On-disk cache of embeddings keyed by model + hash of normalized text.
+
+    Vectors live in a fixed-capacity float16 memory-mapped array
+    (`vectors.f16`); an SQLite table maps each key to its row and last
+    use time. When the array is full the least recently used rows are
+    evicted and their slots reused.
+
+    Safe to share between threads and processes (API workers, scripts):
+    lookups and writes run under SQLite's write lock, so a slot is
+    never handed out twice or overwritten while it is being read.
+    """
+
+    def __init__(self, directory: str, model_name: str, capacity: int):
+        self.directory = os.path.join(directory, _safe_dirname(model_name))
+        self.capacity = capacity
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(self.directory, "index.sqlite"),
+            timeout=30,
+            check_same_thread=False,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " slot INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_slot ON entries(slot)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)"
+        )
+        self._db.commit()
+
+        self._vectors = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------- storage ----------
+
+    @contextmanager
+    def _transaction(self):
+        """
+        BEGIN IMMEDIATE takes SQLite's write lock up front, which
+        serializes this block with every other process using the cache.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+
+            try:
+                yield
+            except BaseException:
+                self._db.rollback()
+                raise
+
+            self._db.commit()
+
+    def _load_vectors(self, dim: int | None = None) -> bool:
+        """
+        Opens the vector file, creating it for `dim` if no process has
+        yet. Returns False when it does not exist and `dim` is None.
+        """
+        if self._vectors is not None:
+            return True
+
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE name = 'dim'"
+        ).fetchone()
+
+        if row:
+            dim = row[0]
+        elif dim is None:
+            return False
+        else:
+            self._db.execute(
+                "INSERT INTO meta (name, value) VALUES ('dim', ?)",
+                (dim,),
+            )
+
+        path = os.path.join(self.directory, "vectors.f16")
+
+        self._vectors = np.memmap(
+            path,
+            dtype=np.float16,
+            mode="r+" if os.path.exists(path) else "w+",
+            shape=(self.capacity, dim),
+        )
+        return True
+
+    def _allocate_slots(self, count: int) -> list[int]:
+        """
+        Unused rows first, then least recently used ones. Evicted slots
+        are reused in the same transaction, so the highest slot in
+        `entries` marks the end of the used rows.
+        """
+        next_slot = self._db.execute(
+            "SELECT COALESCE(MAX(slot) + 1, 0) FROM entries"
+        ).fetchone()[0]
+
+        fresh = max(0, min(count, self.capacity - next_slot))
+        slots = list(range(next_slot, next_slot + fresh))
+
+        if len(slots) < count:
+            slots.extend(self._evict(count - len(slots)))
+
+        return slots
+
+    def _evict(self, count: int) -> list[int]:
+        rows = self._db.execute(
+            "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?",
+            (count,),
+        ).fetchall()
+
+        self._db.executemany(
+            "DELETE FROM entries WHERE key = ?",
+            [(key,) for key, _ in rows],
+        )
+        self.evictions += len(rows)
+        return [slot for _, slot in rows]
+
+    # ---------- public API ----------
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        if not keys:
+            return {}
+
+        with self._transaction():
+            if not self._load_vectors():
+                self.misses += len(keys)
+                return {}
+
+            found = {}
+            unique = list(dict.fromkeys(keys))
+
+            # SQLite caps bound parameters per statement
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT key, slot FROM entries WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+
+                for key, slot in rows:
+                    found[key] = np.asarray(self._vectors[slot], dtype=np.float32)
+
+            now = time.time()
+            self._db.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+
+        self.hits += sum(1 for k in keys if k in found)
+        self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, keys: list[str], vectors):
+        if not keys:
+            return
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        with self._transaction():
+            self._load_vectors(vectors.shape[1])
+
+            pending = {}
+            for key, vector in zip(keys, vectors):
+                pending[key] = vector
+
+            existing = set()
+            for key in pending:
+                if self._db.execute(
+                    "SELECT 1 FROM entries WHERE key = ?", (key,)
+                ).fetchone():
+                    existing.add(key)
+
+            new_keys = [k for k in pending if k not in existing]
+            new_keys = new_keys[:self.capacity]
+            slots = self._allocate_slots(len(new_keys))
+
+            for key, slot in zip(new_keys, slots):
+                self._vectors[slot] = pending[key]
+
+            now = time.time()
+            self._db.executemany(
+                "INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                [(key, slot, now) for key, slot in zip(new_keys, slots)],
+            )
+            self._vectors.flush()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+        return {
+            "entries": entries,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
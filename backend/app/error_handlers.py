@@ -6,6 +6,8 @@ from starlette.status import (
 )
 import logging
 
+from app.llm_inference import LLMQueueFull
+
 
 logger = logging.getLogger(__name__)
 
@@ -37,3 +39,12 @@ async def generic_exception_handler(request: Request, exc):
         status_code=HTTP_500_INTERNAL_SERVER_ERROR,
         content={"error": "Internal server error"},
     )
+
+
+async def llm_queue_full_handler(request: Request, exc: LLMQueueFull):
+    logger.warning(f"LLM queue full for {request.url.path}, retry after {exc.retry_after}s")
+    return JSONResponse(
+        status_code=429,
+        content={"error": "Model is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
@@ -0,0 +1,90 @@
+# backend/app/executors.py
+
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from app.config import settings
+
+
+# --------------------------------------------------
+# Bounded executor
+# --------------------------------------------------
+
+class BoundedExecutor:
+    """
+    Thread (or process) pool with a cap on queued work.
+
+    Blocking calls (embedding, reranking, PDF parsing) run on the pool
+    so the event loop stays free for lightweight requests. Callers
+    beyond `max_workers + max_pending` wait on the event loop instead
+    of piling up futures inside the pool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_pending: int,
+        processes: bool = False,
+    ):
+        self.name = name
+
+        if processes:
+            # spawn: workers must not inherit torch / Chroma threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=name,
+            )
+
+        self._slots = asyncio.Semaphore(max_workers + max_pending)
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+
+        async with self._slots:
+            return await loop.run_in_executor(self._pool, call)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# --------------------------------------------------
+# Dedicated pools per stage
+# --------------------------------------------------
+
+embedding_executor = BoundedExecutor(
+    "embed",
+    max_workers=settings.EMBED_WORKERS,
+    max_pending=settings.EXECUTOR_MAX_PENDING,
+)
+
+rerank_executor = BoundedExecutor(
+    "rerank",
+    max_workers=(
+        settings.RERANK_BATCH_WORKERS
+        if settings.RERANK_BATCHING
+        else settings.RERANK_WORKERS
+    ),
+    max_pending=settings.EXECUTOR_MAX_PENDING,
+)
+
+# CPU-heavy ingestion stages (PDF parsing, chunking)
+ingest_process_executor = BoundedExecutor(
+    "ingest",
+    max_workers=settings.INGEST_PROCESS_WORKERS,
+    max_pending=settings.EXECUTOR_MAX_PENDING,
+    processes=True,
+)
+
+
+def shutdown_executors():
+    for executor in (embedding_executor, rerank_executor, ingest_process_executor):
+        executor.shutdown()
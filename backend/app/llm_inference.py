@@ -1,54 +1,491 @@
 # app/llm_inference.py
 
-import requests
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import math
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
 from app.config import settings
 
 
-def _call_ollama(prompt: str) -> str:
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------
+# Shared HTTP Client (keep-alive pool)
+# --------------------------------------------------
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Lazily creates the pooled client used for every Ollama call.
+    Must be called from inside the running event loop.
+    """
+    global _client
+
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=settings.OLLAMA_BASE_URL,
+            timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                keepalive_expiry=60.0,
+            ),
+        )
+
+    return _client
+
+
+async def close_http_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _build_payload(
+    prompt: str,
+    stream: bool,
+    context: list[int] | None = None,
+) -> dict:
+    payload = {
+        "model": settings.OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": stream,
+        "options": {
+            "temperature": settings.LLM_TEMP,
+            "num_predict": settings.LLM_MAX_TOKENS,
+        },
+    }
+
+    if context:
+        payload["context"] = context
+
+    return payload
+
+
+# --------------------------------------------------
+# Request Scheduler
+# --------------------------------------------------
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SUMMARY = 1
+PRIORITY_FOLLOWUP = 2
+
+
+class LLMQueueFull(Exception):
+    """
+    Raised when too many generations are already waiting.
+    Mapped to HTTP 429 with a Retry-After header.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _summarize_timings(samples) -> dict:
+    if not samples:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(0.95 * len(ordered)))
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "p95_ms": round(ordered[p95_index] * 1000, 1),
+    }
+
+
+class LLMScheduler:
+    """
+    Coordinates every generation sent to Ollama.
+
+    - at most `max_concurrency` generations run at once
+    - waiting requests are served by priority, then arrival order
+    - identical in-flight non-streaming prompts share one generation
+    - once `max_queue` requests are waiting, new ones get LLMQueueFull
+
+    All of this is per process: each uvicorn worker and the pre-index
+    CLI has its own scheduler, so Ollama can see up to
+    `max_concurrency` generations from each of them.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+
+        self._active = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+        self._queue_wait = deque(maxlen=1000)
+        self._service_time = deque(maxlen=1000)
+        self._counters = {
+            "submitted": 0,
+            "coalesced": 0,
+            "rejected": 0,
+            "completed": 0,
+        }
+
+    # ---------- admission ----------
+
+    def retry_after(self) -> int:
+        mean_service = (
+            statistics.mean(self._service_time) if self._service_time else 30.0
+        )
+        waves = (len(self._waiters) + 1) / self.max_concurrency
+        return max(1, math.ceil(waves * mean_service))
+
+    def admit(self):
+        if len(self._waiters) >= self.max_queue:
+            self._counters["rejected"] += 1
+            raise LLMQueueFull(self.retry_after())
+
+    # ---------- slots ----------
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        self.admit()
+        enqueued = time.perf_counter()
+
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            entry = (priority, next(self._seq), waiter)
+            heapq.heappush(self._waiters, entry)
+
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Slot was handed over just before cancellation
+                    self._release()
+                else:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                raise
+
+        started = time.perf_counter()
+        self._queue_wait.append(started - enqueued)
+
+        try:
+            yield
+        finally:
+            self._service_time.append(time.perf_counter() - started)
+            self._counters["completed"] += 1
+            self._release()
+
+    def _release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # Hand the slot straight to the next waiter
+                waiter.set_result(None)
+                return
+
+        self._active -= 1
+
+    # ---------- coalescing ----------
+
+    async def run(
+        self,
+        key: str,
+        priority: int,
+        factory: Callable[[], Awaitable],
+    ):
+        self._counters["submitted"] += 1
+
+        task = self._inflight.get(key)
+
+        if task is not None:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        async def execute():
+            async with self.slot(priority):
+                return await factory()
+
+        task = asyncio.ensure_future(execute())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    # ---------- metrics ----------
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "inflight_prompts": len(self._inflight),
+            **self._counters,
+            "queue_wait": _summarize_timings(self._queue_wait),
+            "service_time": _summarize_timings(self._service_time),
+        }
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+)
+
+
+def _coalesce_key(payload: dict) -> str:
+    raw = json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------------
+# Raw Ollama Calls
+# --------------------------------------------------
+
+async def _call_ollama(
+    prompt: str,
+    context: list[int] | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> tuple[str, list[int] | None]:
+    """
+    Returns the generated text and Ollama's `context` token state,
+    which can be passed back to continue from the same KV prefix.
+    Goes through the scheduler; identical in-flight calls coalesce.
+    """
+    payload = _build_payload(prompt, stream=False, context=context)
+
+    return await llm_scheduler.run(
+        _coalesce_key(payload),
+        priority,
+        lambda: _post_generate(payload),
+    )
+
+
+async def _post_generate(payload: dict) -> tuple[str, list[int] | None]:
     try:
-        response = requests.post(
-            f"{settings.OLLAMA_BASE_URL}/api/generate",
-            json={
-                "model": settings.OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": settings.LLM_TEMP,
-                    "num_predict": settings.LLM_MAX_TOKENS,
-                },
-            },
-            timeout=300,
+        response = await get_http_client().post(
+            "/api/generate",
+            json=payload,
         )
 
         if response.status_code != 200:
-            print("⚠️ Ollama HTTP error:", response.text)
-            return ""
+            logger.warning("Ollama HTTP %s: %s", response.status_code, response.text)
+            return "", None
 
         data = response.json()
-        print("RAW OLLAMA RESPONSE:", data)  # <-- Debug here
+        logger.debug(
+            "Ollama done: eval_count=%s total_duration=%s",
+            data.get("eval_count"),
+            data.get("total_duration"),
+        )
 
-        return data.get("response", "").strip()
+        return data.get("response", "").strip(), data.get("context")
 
     except Exception as e:
-        print("⚠️ Ollama call failed:", e)
-        return ""
+        logger.warning("Ollama call failed: %s", e)
+        return "", None
+
+
+async def _stream_ollama(
+    prompt: str,
+    context: list[int] | None = None,
+    state: dict | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> AsyncIterator[str]:
+    """
+    Yields response tokens as Ollama produces them.
+    Ollama streams one JSON object per line until `done` is true;
+    the final `context` is stored in `state` when one is given.
+    Holds a scheduler slot for the whole stream.
+    """
+    async with llm_scheduler.slot(priority):
+        async for token in _stream_generate(prompt, context, state):
+            yield token
+
+
+async def _stream_generate(
+    prompt: str,
+    context: list[int] | None,
+    state: dict | None,
+) -> AsyncIterator[str]:
+    try:
+        async with get_http_client().stream(
+            "POST",
+            "/api/generate",
+            json=_build_payload(prompt, stream=True, context=context),
+        ) as response:
+
+            if response.status_code != 200:
+                body = await response.aread()
+                logger.warning("Ollama HTTP %s: %s", response.status_code, body)
+                return
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    # Truncated / garbled line: skip it, keep streaming
+                    logger.warning("Ollama stream sent invalid JSON: %.200s", line)
+                    continue
+
+                token = data.get("response")
+
+                if token:
+                    yield token
+
+                if data.get("done"):
+                    if state is not None:
+                        state["context"] = data.get("context")
+                    return
+
+    except httpx.HTTPError as e:
+        logger.warning("Ollama stream failed: %s", e)
 
 # --------------------------------------------------
 # Generic Generation
 # --------------------------------------------------
 
-def generate_text(prompt: str) -> str:
+async def generate_text(
+    prompt: str,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> str:
+    text, _ = await generate_with_context(prompt, priority=priority)
+    return text
+
+
+async def generate_with_context(
+    prompt: str,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> tuple[str, list[int] | None]:
+    if not prompt or not prompt.strip():
+        return "", None
+    return await _call_ollama(prompt, priority=priority)
+
+
+async def stream_text(
+    prompt: str,
+    state: dict | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> AsyncIterator[str]:
     if not prompt or not prompt.strip():
-        return ""
-    return _call_ollama(prompt)
+        return
+    async for token in _stream_ollama(prompt, state=state, priority=priority):
+        yield token
 
 
 # --------------------------------------------------
 # Follow-up Generator
 # --------------------------------------------------
 
-def generate_followups(question: str, answer: str) -> list[str]:
-    followup_prompt = f"""
+FOLLOWUPS_MARKER = "FOLLOW-UP QUESTIONS:"
+
+SINGLE_PASS_FOLLOWUP_INSTRUCTIONS = f"""
+After the answer, write a line containing exactly:
+{FOLLOWUPS_MARKER}
+Then write exactly 3 short and relevant follow-up questions as a numbered list.
+""".strip()
+
+
+def parse_followups(raw: str) -> list[str]:
+    if not raw:
+        return []
+
+    lines = [
+        line.strip().lstrip("1234567890. ").strip()
+        for line in raw.split("\n")
+        if line.strip()
+    ]
+
+    return lines[:3]
+
+
+def split_answer_and_followups(raw: str) -> tuple[str, list[str]]:
+    """
+    Splits a single-pass generation into the answer and its follow-ups.
+    """
+    answer, marker, rest = (raw or "").partition(FOLLOWUPS_MARKER)
+
+    if not marker:
+        return answer.strip(), []
+
+    return answer.strip(), parse_followups(rest)
+
+
+class FollowupSplitter:
+    """
+    Streaming counterpart of `split_answer_and_followups`.
+
+    `feed` returns the part of the token that belongs to the answer,
+    holding back any tail that could be the start of the marker.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._seen_marker = False
+
+    def feed(self, token: str) -> str:
+        self._buffer += token
+
+        if self._seen_marker:
+            return ""
+
+        index = self._buffer.find(FOLLOWUPS_MARKER)
+
+        if index >= 0:
+            self._seen_marker = True
+            visible = self._buffer[:index]
+            self._buffer = self._buffer[index:]
+            return visible
+
+        safe = max(0, len(self._buffer) - len(FOLLOWUPS_MARKER) + 1)
+        visible, self._buffer = self._buffer[:safe], self._buffer[safe:]
+        return visible
+
+    def finish(self) -> tuple[str, list[str]]:
+        if self._seen_marker:
+            return "", parse_followups(
+                self._buffer[len(FOLLOWUPS_MARKER):]
+            )
+        return self._buffer, []
+
+
+async def generate_followups(
+    question: str,
+    answer: str,
+    context: list[int] | None = None,
+) -> list[str]:
+    """
+    With `context` from the answer call, Ollama continues from the
+    cached conversation, so only a short instruction is sent.
+    """
+    if context:
+        followup_prompt = """
+Generate exactly 3 short and relevant follow-up questions about your previous answer.
+Return them as a numbered list.
+Do not include explanations.
+""".strip()
+    else:
+        followup_prompt = f"""
 You are a research assistant.
 
 Based on this conversation:
@@ -64,15 +501,10 @@ Return them as a numbered list.
 Do not include explanations.
 """.strip()
 
-    raw = _call_ollama(followup_prompt)
-
-    if not raw:
-        return []
-
-    lines = [
-        line.strip().lstrip("1234567890. ").strip()
-        for line in raw.split("\n")
-        if line.strip()
-    ]
+    raw, _ = await _call_ollama(
+        followup_prompt,
+        context=context,
+        priority=PRIORITY_FOLLOWUP,
+    )
 
-    return lines[:3]
\ No newline at end of file
+    return parse_followups(raw)
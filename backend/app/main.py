@@ -1,9 +1,12 @@
 # backend/app/main.py
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import logging
+import time
 
 from routers import papers
 from routers import auth, users, pdf_chunking
@@ -12,7 +15,23 @@ from routers.dashboard import dashboard_router
 from routers.google_auth import router as google_auth_router
 
 
+from app.config import settings
 from app.db import check_mongo_connection, create_indexes
+from app.executors import shutdown_executors
+from app.llm_inference import close_http_client, llm_scheduler, LLMQueueFull
+from app.error_handlers import llm_queue_full_handler
+from services.answer_cache import answer_cache
+from app.chroma_store import (
+    document_vector_cache_stats,
+    embedding_cache_stats,
+    query_batcher_stats,
+    models_ready,
+    warm_up,
+)
+from services.reranker import get_reranker, reranker_loaded, reranker_stats
+from services.ingestion_queue import close_download_session, ingestion_worker
+from services.arxiv_preindex import build_preindexer
+from services.summary_service import enable_eager_summaries
 
 
 logging.basicConfig(level=logging.INFO)
@@ -40,6 +59,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Backpressure from the LLM scheduler → 429 + Retry-After
+app.add_exception_handler(LLMQueueFull, llm_queue_full_handler)
+
 # ✅ Include all routers
 app.include_router(auth.auth_router)
 app.include_router(google_auth_router)
@@ -50,13 +72,46 @@ app.include_router(papers.papers_router)
 app.include_router(chat_router)
 
 
+def warm_up_models():
+    start = time.perf_counter()
+    try:
+        warm_up()
+        get_reranker()
+        logging.info("🔥 Models warm in %.1fs", time.perf_counter() - start)
+    except Exception as e:
+        logging.error("Model warm-up failed: %s", e)
+
+
 @app.on_event("startup")
 async def startup():
     logging.info("🚀 Backend started successfully")
     # Optional: enable these later if needed
     await check_mongo_connection()
     await create_indexes()
-    pass
+    enable_eager_summaries()
+    await ingestion_worker.start()
+
+    if settings.ARXIV_PREINDEX_ON_STARTUP:
+        app.state.preindexer = build_preindexer()
+        app.state.preindexer.start()
+
+    if settings.WARMUP_MODELS:
+        # Kept on app.state so the task is not garbage collected
+        app.state.warmup = asyncio.get_running_loop().run_in_executor(
+            None, warm_up_models
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    preindexer = getattr(app.state, "preindexer", None)
+    if preindexer is not None:
+        await preindexer.stop()
+
+    await ingestion_worker.stop()
+    await close_download_session()
+    shutdown_executors()
+    await close_http_client()
 
 
 @app.get("/")
@@ -64,6 +119,35 @@ async def root():
     return {"status": "running"}
 
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "llm": llm_scheduler.stats(),
+        "answer_cache": answer_cache.stats(),
+        "embedding_cache": embedding_cache_stats(),
+        "query_batcher": query_batcher_stats(),
+        "document_vectors": document_vector_cache_stats(),
+        "reranker": reranker_stats(),
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once the embedder, Chroma collections and
+    reranker are loaded, 503 while they are still warming up.
+    """
+    status = {
+        "embedder": models_ready(),
+        "reranker": reranker_loaded(),
+    }
+
+    if all(status.values()):
+        return {"status": "ready", **status}
+
+    return JSONResponse(status_code=503, content={"status": "loading", **status})
+
+
 @app.get("/health")
 async def health():
     try:
@@ -0,0 +1,112 @@
+# backend/app/micro_batcher.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+# --------------------------------------------------
+# Cross-request Micro-batcher
+# --------------------------------------------------
+
+class MicroBatcher:
+    """
+    Collects concurrent blocking calls into shared model passes.
+
+    Callers (executor threads) block in `submit`; a background thread
+    waits up to `max_wait_ms` after the first request for more to
+    arrive, then hands up to `max_size` units of work (`size_fn` per
+    item, 1 by default) to `process_fn` in one call. `process_fn`
+    takes the list of items and returns one result per item; each
+    caller gets its own.
+    """
+
+    def __init__(
+        self,
+        process_fn,
+        max_size: int,
+        max_wait_ms: float,
+        size_fn=None,
+        name: str = "micro-batcher",
+    ):
+        self._process = process_fn
+        self._size = size_fn or (lambda item: 1)
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.units = 0
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name=self.name,
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def submit(self, item):
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = self._size(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            batch.append(entry)
+            size += self._size(entry[0])
+
+        return batch, size
+
+    def _run(self):
+        while True:
+            batch, size = self._collect()
+            items = [item for item, _ in batch]
+
+            try:
+                results = self._process(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            self.units += size
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "units": self.units,
+            "mean_batch_size": (
+                round(self.items / self.batches, 2) if self.batches else 0.0
+            ),
+        }
@@ -0,0 +1,212 @@
+# backend/app/onnx_encoder.py
+
+import json
+import os
+import re
+
+import numpy as np
+
+
+# --------------------------------------------------
+# Exported model layout
+# --------------------------------------------------
+#
+#   <EMBED_ONNX_DIR>/<model name>/
+#       model.onnx          fp32 export
+#       model_int8.onnx     dynamic int8 quantization of model.onnx
+#       pooling.json        SentenceTransformer pooling config
+#       tokenizer files
+#
+
+ONNX_FILES = {
+    "onnx": "model.onnx",
+    "onnx-int8": "model_int8.onnx",
+}
+
+
+def onnx_model_dir(base_dir: str, model_name: str) -> str:
+    return os.path.join(base_dir, re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name))
+
+
+def load_onnx_session(model_dir: str, backend: str):
+    """
+    (InferenceSession, tokenizer) for an exported model on CPU with
+    full graph optimization.
+    """
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+
+    path = os.path.join(model_dir, ONNX_FILES[backend])
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} not found; run "
+            "`cd backend && python -m scripts.download_models --onnx`"
+        )
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    session = ort.InferenceSession(
+        path,
+        sess_options=options,
+        providers=["CPUExecutionProvider"],
+    )
+
+    return session, AutoTokenizer.from_pretrained(model_dir)
+
+
+def onnx_feeds(encoded, input_names: set[str]) -> dict:
+    """Tokenizer output restricted to the graph's int64 inputs."""
+    return {
+        name: encoded[name].astype(np.int64)
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in input_names and name in encoded
+    }
+
+
+# --------------------------------------------------
+# ONNX Runtime encoder
+# --------------------------------------------------
+
+class OnnxSentenceEncoder:
+    """
+    Minimal stand-in for SentenceTransformer.encode backed by
+    onnxruntime, so SentenceTransformerEmbedder works unchanged.
+    """
+
+    def __init__(self, model_dir: str, backend: str, max_length: int = 512):
+        self.session, self.tokenizer = load_onnx_session(model_dir, backend)
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.max_length = max_length
+        self.pooling = self._load_pooling(model_dir)
+
+    @staticmethod
+    def _load_pooling(model_dir: str) -> str:
+        path = os.path.join(model_dir, "pooling.json")
+
+        if not os.path.exists(path):
+            return "cls"
+
+        with open(path) as f:
+            config = json.load(f)
+
+        return "mean" if config.get("pooling_mode_mean_tokens") else "cls"
+
+    def encode(
+        self,
+        sentences,
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        show_progress_bar: bool = False,
+    ):
+        outputs = []
+
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+
+            feeds = onnx_feeds(encoded, self.input_names)
+
+            hidden = self.session.run(None, feeds)[0]
+
+            if self.pooling == "mean":
+                mask = encoded["attention_mask"][..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            else:
+                pooled = hidden[:, 0]
+
+            outputs.append(pooled.astype(np.float32))
+
+        embeddings = np.concatenate(outputs) if outputs else np.zeros((0, 0), np.float32)
+
+        if normalize_embeddings and len(embeddings):
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+        return embeddings
+
+
+# --------------------------------------------------
+# ONNX Runtime cross-encoder
+# --------------------------------------------------
+
+class OnnxCrossEncoder:
+    """
+    Minimal stand-in for sentence_transformers.CrossEncoder.predict
+    (single-logit relevance models) backed by onnxruntime. The export
+    lives in the same layout as the embedder, with `model.onnx` holding
+    the classifier logits.
+    """
+
+    def __init__(self, model_dir: str, backend: str, max_length: int = 512):
+        self.session, self.tokenizer = load_onnx_session(model_dir, backend)
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.max_length = max_length
+
+    def predict(self, pairs, batch_size: int = 32, show_progress_bar: bool = False):
+        scores = []
+
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+
+            encoded = self.tokenizer(
+                [query for query, _ in batch],
+                [passage for _, passage in batch],
+                padding=True,
+                truncation="only_second",
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+
+            feeds = onnx_feeds(encoded, self.input_names)
+
+            logits = self.session.run(None, feeds)[0]
+            scores.append(logits.reshape(len(batch), -1)[:, 0].astype(np.float32))
+
+        return np.concatenate(scores) if scores else np.zeros(0, np.float32)
+
+
+# --------------------------------------------------
+# Parity
+# --------------------------------------------------
+
+def cosine_parity(reference, candidate) -> dict:
+    """
+    Row-wise cosine similarity between two embedding matrices.
+    """
+    a = np.asarray(reference, dtype=np.float32)
+    b = np.asarray(candidate, dtype=np.float32)
+
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    cos = (a * b).sum(axis=1)
+
+    return {
+        "mean": float(cos.mean()),
+        "min": float(cos.min()),
+    }
+
+
+def kendall_tau(reference, candidate) -> float:
+    """
+    Rank agreement of two score lists (tau-a): 1.0 = same order,
+    -1.0 = reversed.
+    """
+    a = np.asarray(reference, dtype=np.float64)
+    b = np.asarray(candidate, dtype=np.float64)
+
+    if len(a) < 2:
+        return 1.0
+
+    i, j = np.triu_indices(len(a), k=1)
+    concordance = np.sign(a[i] - a[j]) * np.sign(b[i] - b[j])
+
+    return float(concordance.sum() / len(i))
@@ -0,0 +1,206 @@
+# backend/app/vector_cache.py
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# --------------------------------------------------
+# Hot-document Vector Cache
+# --------------------------------------------------
+#
+# /pdf/ask is always scoped to one document, which usually has a few
+# hundred chunks. Holding that document's vectors as one normalized
+# float32 matrix turns retrieval into an exact dot-product top-k,
+# instead of an HNSW walk with a metadata filter over every chunk in
+# `pdf_chunks`.
+#
+
+# Rough per-chunk overhead of the metadata dict and Python objects
+_METADATA_BYTES = 256
+
+# Oversized documents remembered at once (LRU)
+_TOO_LARGE_ENTRIES = 1024
+
+
+@dataclass
+class DocumentVectors:
+    version: int
+    texts: list[str]
+    metadatas: list[dict]
+    matrix: np.ndarray      # (chunks, dim) float32, rows L2-normalized
+    nbytes: int
+
+    def top_k(self, query_embedding, k: int) -> list[tuple[int, float]]:
+        """
+        Exact nearest chunks as (row, cosine similarity), best first.
+        """
+        if not len(self.texts):
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self.matrix @ query
+
+        k = min(k, len(scores))
+        rows = np.argpartition(-scores, k - 1)[:k]
+        rows = rows[np.argsort(-scores[rows])]
+
+        return [(int(r), float(scores[r])) for r in rows]
+
+
+def load_document_vectors(
+    collection,
+    where: dict,
+    version: int,
+    max_chunks: int,
+    batch_size: int = 1000,
+) -> DocumentVectors | None:
+    """
+    Reads every chunk matching `where` (embeddings included) from a
+    Chroma collection. Returns None past `max_chunks`: large documents
+    stay on the HNSW path.
+    """
+    texts, metadatas, vectors = [], [], []
+    offset = 0
+
+    while True:
+        page = collection.get(
+            where=where,
+            include=["embeddings", "documents", "metadatas"],
+            limit=batch_size,
+            offset=offset,
+        )
+
+        if not page["ids"]:
+            break
+
+        texts.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        offset += len(page["ids"])
+
+        if offset > max_chunks:
+            return None
+
+    if vectors:
+        matrix = np.vstack(vectors)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+    else:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+
+    nbytes = (
+        matrix.nbytes
+        + sum(len(t) for t in texts)
+        + _METADATA_BYTES * len(texts)
+    )
+
+    return DocumentVectors(version, texts, metadatas, matrix, nbytes)
+
+
+class DocumentVectorCache:
+    """
+    LRU of DocumentVectors bounded by `max_bytes`.
+
+    Keys are (document id, owner). An entry is used only while its
+    version matches the caller's (the document's index_version), and
+    is dropped outright by `invalidate` when the document's chunks
+    are written in this process. Documents over `max_chunks` are
+    remembered (per version, in a small LRU) so they are not re-read
+    on every query.
+
+    Thread-safe: searches run on executor threads.
+    """
+
+    def __init__(self, max_bytes: int, max_chunks: int):
+        self.max_bytes = max_bytes
+        self.max_chunks = max_chunks
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, DocumentVectors] = OrderedDict()
+        self._too_large: OrderedDict[tuple, int] = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    def get(self, key: tuple, version: int, loader) -> DocumentVectors | None:
+        """
+        Cached vectors for `key`, calling `loader()` on a miss. None
+        means "use the vector index" (document too large).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            if self._too_large.get(key) == version:
+                self._too_large.move_to_end(key)
+                self.bypassed += 1
+                return None
+
+            # Re-indexed since: its size is unknown again
+            self._too_large.pop(key, None)
+
+            self.misses += 1
+
+        # Load outside the lock; concurrent misses on one key both load
+        # and the second insert simply replaces the first
+        entry = loader()
+
+        with self._lock:
+            if entry is None:
+                self._too_large[key] = version
+                self._too_large.move_to_end(key)
+
+                while len(self._too_large) > _TOO_LARGE_ENTRIES:
+                    self._too_large.popitem(last=False)
+
+                self.bypassed += 1
+                return None
+
+            self._drop(key)
+
+            if entry.nbytes <= self.max_bytes:
+                self._entries[key] = entry
+                self._bytes += entry.nbytes
+
+                while self._bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+
+        return entry
+
+    def _drop(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def invalidate(self, document_id: str):
+        document_id = str(document_id)
+
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == document_id]:
+                self._drop(key)
+
+            for key in [k for k in self._too_large if k[0] == document_id]:
+                del self._too_large[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._entries),
+                "megabytes": round(self._bytes / 1e6, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bypassed": self.bypassed,
+            }
@@ -35,7 +35,8 @@ async def get_chat_history(
         {
             "document_id": ObjectId(document_id),
             "user_id": current_user["_id"],
-        }
+        },
+        {"followup_context": 0},
     ).sort("timestamp", 1).to_list(500)
 
     for chat in chats:
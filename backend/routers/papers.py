@@ -5,17 +5,12 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from app.db import db
 from app.auth import get_current_user
 from app.chroma_store import search_research_papers
+from app.executors import embedding_executor
 from services.document_service import get_or_create_arxiv_document
-from services.pdf_service import extract_and_index_pdf
-
-import aiohttp
-import os
+from services.ingestion_queue import enqueue_ingestion
 
 papers_router = APIRouter(prefix="/papers", tags=["Papers"])
 
-UPLOAD_DIR = "pdf_uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 
 # ==================================================
 # 🔥 Recent arXiv papers
@@ -58,7 +53,7 @@ async def search_papers(
     current_user=Depends(get_current_user),
 ):
     try:
-        results = search_research_papers(q, limit)
+        results = await embedding_executor.run(search_research_papers, q, limit)
     except Exception:
         return []
 
@@ -204,57 +199,14 @@ async def analyze_arxiv_paper(
 
     document = await get_or_create_arxiv_document(paper)
 
-    # 🔒 Lock to prevent double indexing
-    locked = await db.documents.find_one_and_update(
-        {
-            "_id": document["_id"],
-            "processing": {"$ne": True},
-        },
-        {"$set": {"processing": True}},
-        return_document=True,
-    )
-
-    if not locked:
-        return {"document_id": str(document["_id"])}
-
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(paper["pdf_url"]) as resp:
-                if resp.status != 200:
-                    raise HTTPException(500, "Failed to download PDF")
-                pdf_bytes = await resp.read()
-
-        pdf_path = os.path.join(UPLOAD_DIR, f"{document['_id']}.pdf")
-
-        with open(pdf_path, "wb") as f:
-            f.write(pdf_bytes)
-
-        await db.documents.update_one(
-            {"_id": document["_id"]},
-            {"$set": {"path": pdf_path}},
-        )
-
-        document["path"] = pdf_path
-
-        await extract_and_index_pdf(document)
-
-        # Ensure clean state
-        await db.documents.update_one(
-            {"_id": document["_id"]},
-            {
-                "$set": {
-                    "ready_for_chat": True,
-                    "indexed": True,
-                    "processing": False,
-                }
-            },
-        )
-
-    finally:
-        await db.documents.update_one(
-            {"_id": document["_id"]},
-            {"$set": {"processing": False}},
-        )
+    # 🔒 enqueue_ingestion only queues once per document;
+    # download + indexing run in the ingestion worker
+    if document.get("indexed"):
+        status = "ready"
+    elif await enqueue_ingestion(document["_id"], pdf_url=paper["pdf_url"]):
+        status = "queued"
+    else:
+        status = "processing"
 
     await db.recent_views.update_one(
         {
@@ -274,7 +226,7 @@ async def analyze_arxiv_paper(
         upsert=True,
     )
 
-    return {"document_id": str(document["_id"])}
+    return {"document_id": str(document["_id"]), "status": status}
 
 
 @papers_router.post("/process/{paper_id}")
@@ -1,21 +1,55 @@
 from datetime import datetime
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 
 from app.db import db
 from app.auth import get_current_user
-from app.chroma_store import semantic_search
-from app.llm_inference import generate_text, generate_followups
-from services.document_service import create_uploaded_document
-from services.pdf_service import extract_and_index_pdf
-from services.reranker import rerank
+from app.chroma_store import semantic_search, embed_query
+from app.config import settings
+from app.llm_inference import (
+    generate_with_context,
+    stream_text,
+    generate_followups,
+    llm_scheduler,
+    LLMQueueFull,
+    PRIORITY_SUMMARY,
+    split_answer_and_followups,
+    FollowupSplitter,
+    SINGLE_PASS_FOLLOWUP_INSTRUCTIONS,
+)
+from app.executors import embedding_executor, rerank_executor
+from services.document_service import (
+    create_uploaded_document,
+    save_upload,
+    store_upload,
+    discard_upload,
+    UploadTooLarge,
+)
+from services.pdf_service import is_junk_chunk, deduplicate_chunks, prompt_excerpt
+from services.ingestion_queue import enqueue_ingestion, get_ingestion_job
+from services.summary_service import (
+    get_cached_summary,
+    get_or_create_summary,
+    retrieve_summary_context,
+    build_summary_prompt,
+    store_summary,
+    NO_CONTENT_SUMMARY,
+    FAILED_SUMMARY,
+)
+from services.reranker import cascade_rerank
+from services.answer_cache import answer_cache, answer_scope
 from schemas.pdf import AskPdfRequest, SummarizePdfRequest
 
+import json
+import logging
 import os
-import re
+import time
 
 pdf_router = APIRouter(prefix="/pdf", tags=["PDF"])
 
+logger = logging.getLogger(__name__)
+
 UPLOAD_DIR = "pdf_uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -24,28 +58,223 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 # 🔧 Helpers
 # ==================================================
 
-def is_junk_chunk(text: str) -> bool:
-    text = text.strip()
-    if len(text) < 30:
-        return True
-    if re.fullmatch(r"\[\d+\]", text):
-        return True
-    return False
+FALLBACK_ANSWER = "This paper does not contain that information. Would you like me to search the web?"
+
+# Reranked chunks that go into the /ask prompt
+ASK_PROMPT_CHUNKS = 3
+
+
+def sse_event(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def sse_busy(exc: LLMQueueFull) -> str:
+    return sse_event(
+        {"error": "Model is busy, please retry shortly", "retry_after": exc.retry_after},
+        event="error",
+    )
+
+
+async def load_chat_document(document_id: str, current_user) -> dict:
+    if not ObjectId.is_valid(document_id):
+        raise HTTPException(400, "Invalid document id")
+
+    document = await db.documents.find_one({
+        "_id": ObjectId(document_id),
+        "$or": [
+            {"owner": current_user["_id"]},
+            {"owner": None},
+        ],
+    })
+
+    if not document:
+        raise HTTPException(404, "Document not found")
+
+    return document
+
+
+async def touch_recent_view(document: dict, current_user):
+    view_type = "upload" if document.get("owner") else "arxiv"
+    await db.recent_views.update_one(
+    {
+        "user_id": current_user["_id"],
+        "type": "view_type",
+        "document_id": document["_id"],
+    },
+    {
+        "$set": {
+            "title": document["title"],
+            "viewed_at": datetime.utcnow(),
+        }
+    },
+    upsert=True,
+    )
+
+
+# ==================================================
+# 🔎 Retrieval + Prompt Building
+# ==================================================
+
+async def lookup_cached_answer(query: str, document: dict):
+    """
+    Embeds the question once and checks the semantic answer cache.
+    Returns (query_embedding, cached_answer_or_None).
+    """
+    query_embedding = await embedding_executor.run(embed_query, query)
+
+    if not settings.ANSWER_CACHE_ENABLED:
+        return query_embedding, None
+
+    return query_embedding, answer_cache.lookup(
+        answer_scope(document), query_embedding
+    )
+
+
+def cache_answer(document, query, query_embedding, answer, followups, started):
+    if not settings.ANSWER_CACHE_ENABLED:
+        return
+
+    answer_cache.store(
+        answer_scope(document),
+        query_embedding,
+        query,
+        answer,
+        followups,
+        cost_seconds=time.perf_counter() - started,
+    )
+
+
+async def retrieve_ask_context(query: str, document: dict, query_embedding=None):
+    owner = document.get("owner")
+
+    scored = await embedding_executor.run(
+        semantic_search,
+        query=query,
+        metadata_id=str(document["_id"]),
+        n_results=20,
+        user_id=str(owner) if owner else None,
+        section_weights=settings.SECTION_WEIGHTS_ASK,
+        query_embedding=query_embedding,
+        index_version=document.get("index_version", 0),
+        with_scores=True,
+    )
+
+    scores = {id(c): score for c, score in scored}
+
+    valid_chunks = [
+        c for c, _ in scored
+        if c.page_content
+        and not is_junk_chunk(c.page_content)
+    ]
+
+    valid_chunks = deduplicate_chunks(valid_chunks, 20)
+
+    return await rerank_executor.run(
+        cascade_rerank,
+        query,
+        [(c, scores[id(c)]) for c in valid_chunks],
+        top_k=8,
+        prompt_k=ASK_PROMPT_CHUNKS,
+    )
+
+
+def build_ask_prompt(query: str, chunks, with_followups: bool = False) -> str:
+    context = "\n\n".join(prompt_excerpt(c, 600) for c in chunks[:ASK_PROMPT_CHUNKS])
+    followup_instructions = (
+        f"\n{SINGLE_PASS_FOLLOWUP_INSTRUCTIONS}\n" if with_followups else ""
+    )
+
+    return f"""
+Answer the research question using ONLY the context below.
+
+If answer not present, reply exactly:
+{FALLBACK_ANSWER}
+{followup_instructions}
+Context:
+{context}
+
+Question:
+{query}
+
+Answer:
+""".strip()
+
+
+# ==================================================
+# 💬 Follow-ups
+# ==================================================
+
+async def compute_followups(query: str, answer: str, llm_context) -> list[str]:
+    context = llm_context if settings.FOLLOWUP_MODE == "context" else None
+    return await generate_followups(query, answer, context=context)
+
+
+def followups_deferred() -> bool:
+    return (
+        settings.FOLLOWUPS_DEFERRED
+        and settings.FOLLOWUP_MODE != "single_pass"
+    )
 
 
-def deduplicate_chunks(chunks, max_chunks):
-    seen = set()
-    unique = []
+# ==================================================
+# 💾 Chat History
+# ==================================================
+
+async def record_qa(
+    document: dict,
+    current_user,
+    query: str,
+    answer: str,
+    followups: list[str] | None,
+    llm_context=None,
+):
+    """
+    Stores the question/answer pair and returns the assistant message id.
+    `followups=None` marks them as pending for /pdf/followups; in
+    "context" mode the answer's Ollama context is kept on the message
+    for them, so any API worker can serve that call.
+    """
+    timestamp = datetime.utcnow()
 
-    for c in chunks:
-        key = c.page_content.strip()[:200]
-        if key not in seen:
-            seen.add(key)
-            unique.append(c)
-        if len(unique) >= max_chunks:
-            break
+    assistant = {
+        "document_id": document["_id"],
+        "user_id": current_user["_id"],
+        "role": "assistant",
+        "type": "qa",
+        "content": answer,
+        "question": query,
+        "followups": followups,
+        "timestamp": timestamp,
+    }
 
-    return unique
+    if followups is None and llm_context and settings.FOLLOWUP_MODE == "context":
+        assistant["followup_context"] = llm_context
+
+    result = await db.chat_history.insert_many([
+        {
+            "document_id": document["_id"],
+            "user_id": current_user["_id"],
+            "role": "user",
+            "type": "qa",
+            "content": query,
+            "timestamp": timestamp,
+        },
+        assistant,
+    ])
+
+    return result.inserted_ids[1]
+
+
+async def record_summary(document: dict, current_user, summary: str):
+    await db.chat_history.insert_one({
+        "document_id": document["_id"],
+        "user_id": current_user["_id"],
+        "role": "assistant",
+        "type": "summary",
+        "content": summary,
+        "timestamp": datetime.utcnow(),
+    })
 
 
 # ==================================================
@@ -54,12 +283,21 @@ def deduplicate_chunks(chunks, max_chunks):
 
 @pdf_router.post("/upload")
 async def upload_pdf(
+    request: Request,
     file: UploadFile = File(...),
     current_user=Depends(get_current_user),
 ):
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(400, "Only PDF files are allowed")
 
+    # The body is already spooled by the time this runs; a declared
+    # size over the limit is still rejected before it is copied and
+    # hashed. Set the proxy's body limit (e.g. nginx
+    # client_max_body_size) to UPLOAD_MAX_BYTES to refuse it earlier.
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(413, "File too large")
+
     user_id = current_user["_id"]
 
     existing = await db.documents.find_one({
@@ -74,44 +312,54 @@ async def upload_pdf(
             "status": "already_exists",
         }
 
-    document = await create_uploaded_document(
-        filename=file.filename,
-        user_id=user_id,
-    )
+    try:
+        temp_path, size_bytes, sha256 = await save_upload(
+            file,
+            UPLOAD_DIR,
+            max_bytes=settings.UPLOAD_MAX_BYTES,
+            chunk_bytes=settings.UPLOAD_CHUNK_BYTES,
+        )
+    except UploadTooLarge:
+        raise HTTPException(413, "File too large")
+
+    # Same bytes already uploaded by this user under another name
+    same_content = await db.documents.find_one({
+        "owner": user_id,
+        "source": "upload",
+        "sha256": sha256,
+    })
 
-    path = os.path.join(UPLOAD_DIR, f"{document['_id']}.pdf")
-    file_bytes = await file.read()
+    if same_content:
+        await discard_upload(temp_path)
+        return {
+            "document_id": str(same_content["_id"]),
+            "status": "already_exists",
+        }
 
-    with open(path, "wb") as f:
-        f.write(file_bytes)
+    try:
+        document = await create_uploaded_document(
+            filename=file.filename,
+            user_id=user_id,
+            sha256=sha256,
+            size_bytes=size_bytes,
+        )
+    except BaseException:
+        await discard_upload(temp_path)
+        raise
+
+    path = os.path.join(UPLOAD_DIR, f"{document['_id']}.pdf")
+    await store_upload(temp_path, path)
 
     await db.documents.update_one(
         {"_id": document["_id"]},
-        {
-            "$set": {
-                "path": path,
-                "size_bytes": len(file_bytes),
-                "processing": True
-            }
-        },
+        {"$set": {"path": path}},
     )
 
-    await extract_and_index_pdf({
-        "_id": document["_id"],
-        "path": path,
-        "owner": user_id,
-    })
+    # Parsing + embedding happen in the ingestion worker (or a vector
+    # copy when the same PDF is already indexed for anyone);
+    # progress is reported by /pdf/status/{document_id}
+    await enqueue_ingestion(document["_id"])
 
-    await db.documents.update_one(
-        {"_id": document["_id"]},
-        {
-            "$set": {
-                "ready_for_chat": True,
-                "indexed": True,
-                "processing": False
-            }
-        }
-    )
     # Add to recent views
     await db.recent_views.update_one(
         {
@@ -130,7 +378,38 @@ async def upload_pdf(
 
     return {
         "document_id": str(document["_id"]),
-        "status": "uploaded",
+        "status": "queued",
+    }
+
+
+# ==================================================
+# ⏳ Ingestion Status
+# ==================================================
+
+@pdf_router.get("/status/{document_id}")
+async def get_document_status(
+    document_id: str,
+    current_user=Depends(get_current_user),
+):
+    document = await load_chat_document(document_id, current_user)
+    job = await get_ingestion_job(document["_id"])
+
+    return {
+        "document_id": document_id,
+        "processing": bool(document.get("processing")),
+        "reindexing": bool(document.get("reindexing")),
+        "indexed": bool(document.get("indexed")),
+        "ready_for_chat": bool(document.get("ready_for_chat")),
+        "index_failed": bool(document.get("index_failed")),
+        "job": {
+            "status": job.get("status"),
+            "stage": job.get("stage"),
+            "progress": job.get("progress", 0),
+            "attempts": job.get("attempts", 0),
+            "error": job.get("error"),
+            "next_run_at": job.get("next_run_at"),
+            "updated_at": job.get("updated_at"),
+        } if job else None,
     }
 
 # ==================================================
@@ -163,208 +442,389 @@ async def ask_pdf(
     current_user=Depends(get_current_user),
 ):
 
-    if not ObjectId.is_valid(payload.document_id):
-        raise HTTPException(400, "Invalid document id")
-
-    doc_id = ObjectId(payload.document_id)
-
-    document = await db.documents.find_one({
-        "_id": doc_id,
-        "$or": [
-            {"owner": current_user["_id"]},
-            {"owner": None},
-        ],
-    })
-
-    if not document:
-        raise HTTPException(404, "Document not found")
+    document = await load_chat_document(payload.document_id, current_user)
 
     if document.get("processing") or not document.get("ready_for_chat"):
         raise HTTPException(409, "Document still processing")
 
-    owner = document.get("owner")
+    started = time.perf_counter()
+    query_embedding, hit = await lookup_cached_answer(payload.query, document)
 
-    chunks = semantic_search(
-        query=payload.query,
-        metadata_id=payload.document_id,
-        n_results=20,
-        user_id=str(owner) if owner else None,
-        section_priority=True,
-    )
+    if hit is not None:
+        message_id = await record_qa(
+            document, current_user, payload.query, hit.answer, hit.followups
+        )
+        await touch_recent_view(document, current_user)
 
-    valid_chunks = [
-        c for c in chunks
-        if c.page_content
-        and not is_junk_chunk(c.page_content)
-    ]
+        return {
+            "answer": hit.answer,
+            "followups": hit.followups or [],
+            "followups_pending": hit.followups is None,
+            "message_id": str(message_id),
+            "needs_web_search": False,
+            "cached": True,
+        }
 
-    valid_chunks = deduplicate_chunks(valid_chunks, 20)
-    valid_chunks = rerank(payload.query, valid_chunks, top_k=8)
+    valid_chunks = await retrieve_ask_context(
+        payload.query, document, query_embedding
+    )
 
-    fallback_text = "This paper does not contain that information. Would you like me to search the web?"
+    single_pass = settings.FOLLOWUP_MODE == "single_pass"
+    followups = []
+    llm_context = None
 
     if not valid_chunks:
-        answer = fallback_text
-        followups = []
+        answer = FALLBACK_ANSWER
         needs_web_search = True
     else:
-        context = "\n\n".join(c.page_content[:600] for c in valid_chunks[:3])
+        prompt = build_ask_prompt(
+            payload.query, valid_chunks, with_followups=single_pass
+        )
 
-        prompt = f"""
-Answer the research question using ONLY the context below.
+        raw, llm_context = await generate_with_context(prompt)
 
-If answer not present, reply exactly:
-{fallback_text}
+        if single_pass:
+            answer, followups = split_answer_and_followups(raw)
+        else:
+            answer = (raw or "").strip()
 
-Context:
-{context}
+        # An empty answer means generation failed
+        needs_web_search = (
+            not answer
+            or answer.startswith("This paper does not contain")
+        )
 
-Question:
-{payload.query}
+        if needs_web_search:
+            answer = FALLBACK_ANSWER
+            followups = []
 
-Answer:
-""".strip()
+    pending = not needs_web_search and not single_pass and followups_deferred()
+
+    if not needs_web_search and not single_pass and not pending:
+        try:
+            followups = await compute_followups(
+                payload.query, answer, llm_context
+            )
+        except LLMQueueFull:
+            # The answer is already paid for; /pdf/followups fills these in later
+            pending = True
+
+    message_id = await record_qa(
+        document,
+        current_user,
+        payload.query,
+        answer,
+        None if pending else followups,
+        llm_context,
+    )
 
-        answer = (generate_text(prompt) or "").strip()
+    if not needs_web_search:
+        cache_answer(
+            document,
+            payload.query,
+            query_embedding,
+            answer,
+            None if pending else followups,
+            started,
+        )
 
-        needs_web_search = answer.startswith("This paper does not contain")
+    await touch_recent_view(document, current_user)
+
+    return {
+        "answer": answer,
+        "followups": followups,
+        "followups_pending": pending,
+        "message_id": str(message_id),
+        "needs_web_search": needs_web_search,
+        "cached": False,
+    }
+
+
+@pdf_router.post("/ask/stream")
+async def ask_pdf_stream(
+    payload: AskPdfRequest,
+    current_user=Depends(get_current_user),
+):
+    """
+    Server-Sent Events variant of /pdf/ask.
+
+    Emits `data: {"token": ...}` events while the answer is generated,
+    then `event: answer` with the final answer (chat history is written
+    at this point), `event: followups` unless they are deferred,
+    and `event: done`.
+    """
+
+    document = await load_chat_document(payload.document_id, current_user)
+
+    if document.get("processing") or not document.get("ready_for_chat"):
+        raise HTTPException(409, "Document still processing")
+
+    started = time.perf_counter()
+    query_embedding, hit = await lookup_cached_answer(payload.query, document)
+
+    if hit is not None:
+        return StreamingResponse(
+            cached_answer_events(hit, document, current_user, payload.query),
+            media_type="text/event-stream",
+        )
+
+    # Reject before the 200 + event stream is committed
+    llm_scheduler.admit()
+
+    valid_chunks = await retrieve_ask_context(
+        payload.query, document, query_embedding
+    )
+    single_pass = settings.FOLLOWUP_MODE == "single_pass"
+
+    async def events():
+        parts = []
+        followups = []
+        state = {}
+
+        if valid_chunks:
+            prompt = build_ask_prompt(
+                payload.query, valid_chunks, with_followups=single_pass
+            )
+            splitter = FollowupSplitter()
+
+            try:
+                async for token in stream_text(prompt, state=state):
+                    if not parts:
+                        logger.info(
+                            "ask/stream TTFT %.0f ms",
+                            (time.perf_counter() - started) * 1000,
+                        )
+                    parts.append(token)
+
+                    visible = splitter.feed(token) if single_pass else token
+                    if visible:
+                        yield sse_event({"token": visible})
+            except LLMQueueFull as e:
+                yield sse_busy(e)
+                return
+
+            if single_pass:
+                tail, followups = splitter.finish()
+                if tail:
+                    yield sse_event({"token": tail})
+                answer = split_answer_and_followups("".join(parts))[0]
+            else:
+                answer = "".join(parts).strip()
+        else:
+            answer = ""
+
+        needs_web_search = (
+            not answer
+            or answer.startswith("This paper does not contain")
+        )
 
         if needs_web_search:
-            answer = fallback_text
+            answer = FALLBACK_ANSWER
             followups = []
-        else:
-            followups = generate_followups(payload.query, answer)
 
-    timestamp = datetime.utcnow()
+        pending = not needs_web_search and not single_pass
+
+        message_id = await record_qa(
+            document,
+            current_user,
+            payload.query,
+            answer,
+            None if pending else followups,
+            state.get("context"),
+        )
+        await touch_recent_view(document, current_user)
+
+        deferred = pending and followups_deferred()
+
+        yield sse_event(
+            {
+                "answer": answer,
+                "message_id": str(message_id),
+                "needs_web_search": needs_web_search,
+                "followups_pending": deferred,
+            },
+            event="answer",
+        )
+
+        if deferred:
+            cache_answer(
+                document, payload.query, query_embedding,
+                answer, None, started,
+            )
+        else:
+            if pending:
+                try:
+                    followups = await compute_followups(
+                        payload.query, answer, state.get("context")
+                    )
+                    await db.chat_history.update_one(
+                        {"_id": message_id},
+                        {
+                            "$set": {"followups": followups},
+                            "$unset": {"followup_context": ""},
+                        },
+                    )
+                except LLMQueueFull:
+                    # Left pending; /pdf/followups can fill them in later
+                    followups = []
+
+            if not needs_web_search:
+                cache_answer(
+                    document, payload.query, query_embedding,
+                    answer, followups, started,
+                )
+
+            yield sse_event({"followups": followups}, event="followups")
+
+        yield sse_event({}, event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+async def cached_answer_events(hit, document, current_user, query):
+    message_id = await record_qa(
+        document, current_user, query, hit.answer, hit.followups
+    )
+    await touch_recent_view(document, current_user)
 
-    await db.chat_history.insert_many([
-        {
-            "document_id": doc_id,
-            "user_id": current_user["_id"],
-            "role": "user",
-            "type": "qa",
-            "content": payload.query,
-            "timestamp": timestamp,
-        },
+    yield sse_event({"token": hit.answer})
+    yield sse_event(
         {
-            "document_id": doc_id,
-            "user_id": current_user["_id"],
-            "role": "assistant",
-            "type": "qa",
-            "content": answer,
-            "timestamp": timestamp,
+            "answer": hit.answer,
+            "message_id": str(message_id),
+            "needs_web_search": False,
+            "followups_pending": hit.followups is None,
+            "cached": True,
         },
-    ])
-
-    view_type = "upload" if document.get("owner") else "arxiv"
-    await db.recent_views.update_one(
-    {
-        "user_id": current_user["_id"],
-        "type": "view_type",
-        "document_id": ObjectId(payload.document_id),
-    },
-    {
-        "$set": {
-            "title": document["title"],
-            "viewed_at": datetime.utcnow(),
-        }
-    },
-    upsert=True,
+        event="answer",
     )
 
-    return {
-        "answer": answer,
-        "followups": followups,
-        "needs_web_search": needs_web_search
-    }
+    if hit.followups is not None:
+        yield sse_event({"followups": hit.followups}, event="followups")
+
+    yield sse_event({}, event="done")
 
 
 # ==================================================
-# 📝 Summarize PDF
+# 💬 Deferred Follow-ups
 # ==================================================
 
-@pdf_router.post("/summarize")
-async def summarize_pdf(
-    payload: SummarizePdfRequest,
+@pdf_router.get("/followups/{message_id}")
+async def get_followups(
+    message_id: str,
     current_user=Depends(get_current_user),
 ):
+    """
+    Computes follow-ups for an answer lazily and stores them
+    on the assistant message so later calls are free.
+    """
 
-    if not ObjectId.is_valid(payload.document_id):
-        raise HTTPException(400, "Invalid document id")
-
-    doc_id = ObjectId(payload.document_id)
+    if not ObjectId.is_valid(message_id):
+        raise HTTPException(400, "Invalid message id")
 
-    document = await db.documents.find_one({
-        "_id": doc_id,
-        "$or": [
-            {"owner": current_user["_id"]},
-            {"owner": None},
-        ],
+    message = await db.chat_history.find_one({
+        "_id": ObjectId(message_id),
+        "user_id": current_user["_id"],
+        "role": "assistant",
+        "type": "qa",
     })
 
-    if not document:
-        raise HTTPException(404, "Document not found")
+    if not message:
+        raise HTTPException(404, "Message not found")
 
-    owner = document.get("owner")
+    if message.get("followups") is not None:
+        return {"followups": message["followups"]}
 
-    chunks = semantic_search(
-        query="Summarize the main contributions of this paper",
-        metadata_id=payload.document_id,
-        n_results=15,
-        user_id=str(owner) if owner else None,
-        section_priority=True,
+    followups = await compute_followups(
+        message.get("question") or "",
+        message.get("content") or "",
+        message.get("followup_context"),
     )
 
-    valid_chunks = [
-        c for c in chunks
-        if c.page_content and not is_junk_chunk(c.page_content)
-    ]
+    await db.chat_history.update_one(
+        {"_id": message["_id"]},
+        {
+            "$set": {"followups": followups},
+            "$unset": {"followup_context": ""},
+        },
+    )
 
-    valid_chunks = deduplicate_chunks(valid_chunks, 12)
+    return {"followups": followups}
 
-    if not valid_chunks:
-        summary = "No readable content found."
-    else:
-        context = "\n\n".join(c.page_content[:800] for c in valid_chunks[:4])
 
-        prompt = f"""
-Summarize the research paper using this format:
+# ==================================================
+# 📝 Summarize PDF
+# ==================================================
+
+@pdf_router.post("/summarize")
+async def summarize_pdf(
+    payload: SummarizePdfRequest,
+    current_user=Depends(get_current_user),
+):
 
-Objective:
-Problem Being Addressed:
-Methodology:
-Key Findings:
-Conclusion:
-Limitations:
+    document = await load_chat_document(payload.document_id, current_user)
 
-Text:
-{context}
-""".strip()
+    summary, cached = await get_or_create_summary(document)
 
-        summary = generate_text(prompt) or "Summary generation failed."
+    await record_summary(document, current_user, summary)
+    await touch_recent_view(document, current_user)
+    return {"summary": summary, "cached": cached}
 
-    await db.chat_history.insert_one({
-        "document_id": doc_id,
-        "user_id": current_user["_id"],
-        "role": "assistant",
-        "type": "summary",
-        "content": summary,
-        "timestamp": datetime.utcnow(),
-    })
 
-    view_type = "upload" if document.get("owner") else "arxiv"
-    await db.recent_views.update_one(
-    {
-        "user_id": current_user["_id"],
-        "type": "view_type",
-        "document_id": ObjectId(payload.document_id),
-    },
-    {
-        "$set": {
-            "title": document["title"],
-            "viewed_at": datetime.utcnow(),
-        }
-    },
-    upsert=True,
-    )
-    return {"summary": summary}
\ No newline at end of file
+@pdf_router.post("/summarize/stream")
+async def summarize_pdf_stream(
+    payload: SummarizePdfRequest,
+    current_user=Depends(get_current_user),
+):
+    """
+    Server-Sent Events variant of /pdf/summarize.
+    A cached summary is sent as a single token event.
+    """
+
+    document = await load_chat_document(payload.document_id, current_user)
+
+    cached = await get_cached_summary(document)
+
+    if cached is None:
+        llm_scheduler.admit()
+
+    started = time.perf_counter()
+
+    async def events():
+        if cached is not None:
+            summary = cached
+            yield sse_event({"token": summary})
+        else:
+            valid_chunks = await retrieve_summary_context(document)
+            parts = []
+
+            if valid_chunks:
+                prompt = build_summary_prompt(valid_chunks)
+
+                try:
+                    async for token in stream_text(prompt, priority=PRIORITY_SUMMARY):
+                        if not parts:
+                            logger.info(
+                                "summarize/stream TTFT %.0f ms",
+                                (time.perf_counter() - started) * 1000,
+                            )
+                        parts.append(token)
+                        yield sse_event({"token": token})
+                except LLMQueueFull as e:
+                    yield sse_busy(e)
+                    return
+
+                summary = "".join(parts).strip() or FAILED_SUMMARY
+                await store_summary(document, summary)
+            else:
+                summary = NO_CONTENT_SUMMARY
+
+        await record_summary(document, current_user, summary)
+        await touch_recent_view(document, current_user)
+
+        yield sse_event(
+            {"summary": summary, "cached": cached is not None},
+            event="done",
+        )
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,154 @@
+"""
+Character splitter (700 / 150 chars) vs token-aware splitter
+(CHUNK_TOKENS / CHUNK_OVERLAP_TOKENS with the embedding tokenizer).
+
+For every PDF in --corpus (synthetic PDFs are generated when empty),
+both chunkers run on the same extracted pages through the ingestion
+section/chunk stages. For each chunker the script reports:
+- chunks per document and tokens per chunk (mean / max)
+- chunks the embedder (max_seq_length) or the reranker (512 tokens
+  including the query) would truncate
+- embedding time for all chunks
+- retrieval quality. Sentences sampled from the page text are used as
+  queries; a hit is any chunk of the same document that contains the
+  sentence. Recall@k and MRR are reported.
+
+Usage:
+    cd backend && python -m scripts.bench_chunkers --corpus ./bench_pdfs --queries 50
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import tempfile
+import time
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from app.config import settings
+from scripts.make_synthetic_pdfs import make_corpus
+from services.pdf_extractors import count_pages, extract_page_range, extractor_chain
+from services.pdf_service import (
+    get_chunk_splitter,
+    iter_chunks,
+    iter_section_lines,
+    with_headings,
+)
+
+
+RERANK_MAX_TOKENS = 512
+
+
+def sample_queries(pages, count: int, rng: random.Random) -> list[str]:
+    sentences = [
+        s.strip()
+        for page in pages
+        for s in re.split(r"(?<=[.!?])\s+", page.text.replace("\n", " "))
+        if 40 <= len(s.strip()) <= 300
+    ]
+    return rng.sample(sentences, min(count, len(sentences)))
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def evaluate(model, tokenizer, chunks, queries, k: int) -> dict:
+    start = time.perf_counter()
+    vectors = model.encode(chunks, batch_size=32, normalize_embeddings=True)
+    embed_seconds = time.perf_counter() - start
+
+    query_vectors = model.encode(queries, batch_size=32, normalize_embeddings=True)
+    normalized = [normalize(c) for c in chunks]
+
+    recall = mrr = 0.0
+
+    for query, vector in zip(queries, query_vectors):
+        relevant = {i for i, c in enumerate(normalized) if normalize(query) in c}
+        if not relevant:
+            continue
+
+        ranking = np.argsort(-(vectors @ vector))
+
+        for rank, index in enumerate(ranking[:k], 1):
+            if index in relevant:
+                recall += 1
+                mrr += 1 / rank
+                break
+
+    tokens = [len(tokenizer.tokenize(c)) for c in chunks]
+    query_tokens = max((len(tokenizer.tokenize(q)) for q in queries), default=0)
+
+    return {
+        "chunks": len(chunks),
+        "tokens": tokens,
+        "embed_seconds": embed_seconds,
+        # +2 for [CLS] / [SEP]
+        "embed_truncated": sum(t + 2 > model.max_seq_length for t in tokens),
+        "rerank_truncated": sum(t + query_tokens + 3 > RERANK_MAX_TOKENS for t in tokens),
+        "hits": recall,
+        "mrr": mrr,
+        "queries": len(queries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "synthetic_pdfs"))
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 30])
+    parser.add_argument("--queries", type=int, default=50, help="per document")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.pdf")))
+    if not paths:
+        paths = make_corpus(args.corpus, args.pages)
+
+    model = SentenceTransformer(settings.SENTENCE_EMBED_MODEL)
+    tokenizer = model.tokenizer
+    backends = extractor_chain(settings.PDF_EXTRACTOR)
+    rng = random.Random(0)
+
+    totals = {name: [] for name in ("chars", "tokens")}
+
+    for path in paths:
+        pages = extract_page_range(path, 0, count_pages(path, backends), backends)
+        queries = sample_queries(pages, args.queries, rng)
+
+        for name in totals:
+            chunks = [
+                text
+                for _, text in iter_chunks(
+                    iter_section_lines(with_headings(p for p in pages if p.text)),
+                    settings.INGEST_CHUNK_WINDOW_CHARS,
+                    splitter=get_chunk_splitter(name),
+                )
+            ]
+            totals[name].append(evaluate(model, tokenizer, chunks, queries, args.k))
+
+    print(
+        f"\n{'chunker':<8} {'chunks/doc':>10} {'tok mean':>9} {'tok max':>8} "
+        f"{'emb trunc':>10} {'rr trunc':>9} {'embed s':>8} "
+        f"{'recall@' + str(args.k):>9} {'MRR':>6}"
+    )
+
+    for name, results in totals.items():
+        tokens = [t for r in results for t in r["tokens"]]
+        queries = sum(r["queries"] for r in results) or 1
+
+        print(
+            f"{name:<8} {np.mean([r['chunks'] for r in results]):>10.1f} "
+            f"{np.mean(tokens):>9.0f} {max(tokens):>8} "
+            f"{sum(r['embed_truncated'] for r in results):>10} "
+            f"{sum(r['rerank_truncated'] for r in results):>9} "
+            f"{sum(r['embed_seconds'] for r in results):>8.2f} "
+            f"{sum(r['hits'] for r in results) / queries:>9.3f} "
+            f"{sum(r['mrr'] for r in results) / queries:>6.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
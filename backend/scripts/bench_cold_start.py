@@ -0,0 +1,65 @@
+"""
+Cold-start timing for the API and CLI entry points.
+
+Each measurement runs in a fresh interpreter so nothing is cached:
+- import time of modules that used to load models on import
+- time until the first embedding / first Chroma query is served
+
+Run it on the commit before lazy loading and on the current tree to
+compare.
+
+Usage:
+    cd backend && python scripts/bench_cold_start.py --runs 3
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+
+SCENARIOS = {
+    "import app.chroma_store": "import app.chroma_store",
+    "import services.pdf_service": "import services.pdf_service",
+    "import routers.papers": "import routers.papers",
+    "import app.main": "import app.main",
+    "first embed_query": (
+        "from app.chroma_store import embed_query; embed_query('warm-up')"
+    ),
+    "first semantic_search": (
+        "from app.chroma_store import semantic_search; "
+        "semantic_search('warm-up', n_results=1)"
+    ),
+}
+
+
+def time_snippet(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    baseline = statistics.median(time_snippet("pass") for _ in range(args.runs))
+    print(f"\ninterpreter start: {baseline:.2f}s (subtracted below)\n")
+
+    for label, code in SCENARIOS.items():
+        try:
+            runs = [time_snippet(code) - baseline for _ in range(args.runs)]
+        except subprocess.CalledProcessError:
+            print(f"{label:<28} failed")
+            continue
+        print(f"{label:<28} median {statistics.median(runs):6.2f}s  min {min(runs):6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
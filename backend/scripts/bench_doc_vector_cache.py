@@ -0,0 +1,136 @@
+"""
+Per-question retrieval latency as `pdf_chunks` grows: filtered HNSW
+search vs the in-memory document vector cache.
+
+A throwaway Chroma collection (same metadata layout as pdf_chunks) is
+filled with random unit vectors, --chunks-per-doc per document, up to
+each size in --sizes. At every size, questions against random
+documents are timed three ways:
+- hnsw:   collection.query with the metadata_id + user_id $and filter
+          (what semantic_search did for every /pdf/ask)
+- cold:   first question on a document: load its vectors from Chroma
+          into the cache, then exact top-k
+- cached: exact top-k on an already cached document
+
+It also reports how often HNSW's filtered top-k matches the exact one.
+Synthetic vectors, no embedding model needed; 1M x 768 vectors take a
+few GB of disk and a while to insert.
+
+Usage:
+    cd backend && python -m scripts.bench_doc_vector_cache --sizes 10000 100000 1000000
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+from app.chroma_store import GLOBAL_OWNER
+from app.vector_cache import DocumentVectorCache, load_document_vectors
+
+
+def unit_vectors(rng, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def grow(collection, rng, start_doc: int, target: int, chunks_per_doc: int, dim: int) -> int:
+    """Adds whole documents until the collection holds `target` chunks."""
+    doc = start_doc
+
+    while collection.count() < target:
+        vectors = unit_vectors(rng, chunks_per_doc, dim)
+        ids = [f"doc{doc}_{i}" for i in range(chunks_per_doc)]
+
+        collection.add(
+            ids=ids,
+            embeddings=vectors.tolist(),
+            documents=[f"chunk {i} of document {doc}" for i in range(chunks_per_doc)],
+            metadatas=[
+                {"metadata_id": f"doc{doc}", "user_id": GLOBAL_OWNER, "section": "body"}
+                for _ in range(chunks_per_doc)
+            ],
+        )
+        doc += 1
+
+    return doc
+
+
+def percentiles(seconds: list[float]) -> str:
+    ms = np.asarray(seconds) * 1000
+    return f"{np.percentile(ms, 50):>8.2f} {np.percentile(ms, 95):>8.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--chunks-per-doc", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--k", type=int, default=60, help="20 results x RETRIEVAL_OVERFETCH")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp(prefix="bench_vectors_")
+    collection = chromadb.PersistentClient(path=directory).create_collection("pdf_chunks")
+    docs = 0
+
+    print(
+        f"\n{'chunks':>10} {'docs':>6} │ {'hnsw p50':>8} {'p95':>8} │ "
+        f"{'cold p50':>8} {'p95':>8} │ {'cached p50':>10} {'p95':>8} │ {'hnsw=exact':>10}"
+    )
+
+    try:
+        for size in args.sizes:
+            docs = grow(collection, rng, docs, size, args.chunks_per_doc, args.dim)
+            cache = DocumentVectorCache(max_bytes=2 ** 40, max_chunks=10 ** 6)
+            timings = {"hnsw": [], "cold": [], "cached": []}
+            agreement = []
+
+            for _ in range(args.questions):
+                document_id = f"doc{rng.integers(docs)}"
+                where = {"$and": [{"metadata_id": document_id}, {"user_id": GLOBAL_OWNER}]}
+                query = unit_vectors(rng, 1, args.dim)[0]
+
+                start = time.perf_counter()
+                found = collection.query(
+                    query_embeddings=[query.tolist()],
+                    n_results=args.k,
+                    where=where,
+                    include=["documents", "metadatas", "distances"],
+                )
+                timings["hnsw"].append(time.perf_counter() - start)
+
+                cache.invalidate(document_id)
+                start = time.perf_counter()
+                entry = cache.get(
+                    (document_id, GLOBAL_OWNER),
+                    0,
+                    lambda: load_document_vectors(collection, where, 0, cache.max_chunks),
+                )
+                exact = entry.top_k(query, args.k)
+                timings["cold"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                entry = cache.get((document_id, GLOBAL_OWNER), 0, lambda: None)
+                exact = entry.top_k(query, args.k)
+                timings["cached"].append(time.perf_counter() - start)
+
+                exact_texts = {entry.texts[row] for row, _ in exact}
+                agreement.append(len(exact_texts & set(found["documents"][0])) / len(exact_texts))
+
+            print(
+                f"{collection.count():>10} {docs:>6} │ {percentiles(timings['hnsw'])} │ "
+                f"{percentiles(timings['cold'])} │ {percentiles(timings['cached']):>19} │ "
+                f"{np.mean(agreement):>10.3f}"
+            )
+
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Embedding backend benchmark: PyTorch fp32 vs ONNX fp32 vs ONNX int8.
+
+For each backend, in a fresh subprocess so RSS is not shared:
+- load time and resident memory added by the model
+- chunks/s over a fixed synthetic chunk set
+- cosine parity against the PyTorch vectors (saved by the torch run)
+
+Usage:
+    cd backend && python -m scripts.download_models --onnx
+    cd backend && python -m scripts.bench_embedding_backends --chunks 512
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import psutil
+
+
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+
+SENTENCES = [
+    "We introduce a transformer-based retrieval model for long scientific documents.",
+    "Experiments on three benchmarks show consistent improvements over dense baselines.",
+    "The encoder is initialized from a pretrained checkpoint and fine-tuned with contrastive loss.",
+    "Ablations indicate that section-aware chunking contributes most of the gain.",
+    "We release code and data to support reproducibility of all reported results.",
+    "Limitations include reliance on English corpora and sensitivity to OCR noise.",
+]
+
+
+def make_chunks(count):
+    # ~120-word passages, similar to the 700-char chunker output
+    return [
+        "passage: " + " ".join(SENTENCES[(i + j) % len(SENTENCES)] for j in range(6))
+        for i in range(count)
+    ]
+
+
+def load_model(backend):
+    from app.config import settings
+
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(settings.SENTENCE_EMBED_MODEL)
+
+    from app.onnx_encoder import OnnxSentenceEncoder, onnx_model_dir
+    return OnnxSentenceEncoder(
+        onnx_model_dir(settings.EMBED_ONNX_DIR, settings.SENTENCE_EMBED_MODEL),
+        backend=backend,
+    )
+
+
+def run_backend(backend, chunks_count, batch_size, reference_path):
+    from app.onnx_encoder import cosine_parity
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    start = time.perf_counter()
+    model = load_model(backend)
+    load_seconds = time.perf_counter() - start
+
+    chunks = make_chunks(chunks_count)
+    model.encode(chunks[:batch_size], normalize_embeddings=True)  # warm-up
+
+    start = time.perf_counter()
+    vectors = model.encode(chunks, batch_size=batch_size, normalize_embeddings=True)
+    encode_seconds = time.perf_counter() - start
+
+    result = {
+        "backend": backend,
+        "load_s": round(load_seconds, 2),
+        "chunks_per_s": round(chunks_count / encode_seconds, 1),
+        "rss_mb": round((process.memory_info().rss - rss_before) / 2**20, 1),
+    }
+
+    if backend == "torch":
+        np.save(reference_path, vectors)
+    elif os.path.exists(reference_path):
+        result["cosine"] = cosine_parity(np.load(reference_path), vectors)
+
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backend", choices=BACKENDS)
+    parser.add_argument("--reference", default=None)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args.backend, args.chunks, args.batch_size, args.reference)
+        return
+
+    reference = os.path.join(tempfile.mkdtemp(), "torch_vectors.npy")
+    print(f"\n{'backend':<10} {'load s':>7} {'chunks/s':>9} {'RSS MB':>8} {'cos mean':>9} {'cos min':>8}")
+
+    for backend in BACKENDS:
+        proc = subprocess.run(
+            [
+                sys.executable, "-m", "scripts.bench_embedding_backends",
+                "--backend", backend,
+                "--chunks", str(args.chunks),
+                "--batch-size", str(args.batch_size),
+                "--reference", reference,
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        if proc.returncode != 0:
+            print(f"{backend:<10} failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        cos = r.get("cosine", {"mean": 1.0, "min": 1.0})
+        print(
+            f"{backend:<10} {r['load_s']:>7} {r['chunks_per_s']:>9} {r['rss_mb']:>8} "
+            f"{cos['mean']:>9.5f} {cos['min']:>8.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
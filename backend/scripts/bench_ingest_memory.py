@@ -0,0 +1,99 @@
+"""
+Peak memory of PDF ingestion vs document size.
+
+Each (page count, mode) runs in a fresh interpreter that extracts,
+section-tags and chunks a synthetic PDF through index_pdf_stream with
+page ranges on a local process pool. Chunks go to a counting sink,
+so the embedding model's fixed footprint is left out.
+
+Modes:
+- stream: batches are written as they are produced (the pipeline)
+- eager:  every chunk is collected first and written once (old shape)
+
+Peak RSS is ru_maxrss of the pipeline process, minus its RSS after
+imports.
+
+Usage:
+    cd backend && python -m scripts.bench_ingest_memory --pages 10 100 1000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import psutil
+
+
+def child(path: str, mode: str):
+    from services.pdf_extractors import extract_page_range, extractor_chain
+    from services.pdf_service import index_pdf_stream
+
+    backends = extractor_chain("auto")
+    pool = ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn"))
+    baseline = psutil.Process().memory_info().rss
+
+    collected = []
+    written = 0
+
+    def sink(batch, document_id, skip_ids):
+        nonlocal written
+        if mode == "eager":
+            collected.extend(batch)
+        written += len(batch)
+        return [f"{document_id}_{written - len(batch) + i}" for i in range(len(batch))]
+
+    index_pdf_stream(
+        path,
+        "bench",
+        "GLOBAL",
+        backends,
+        lambda start, stop: pool.submit(extract_page_range, path, start, stop, backends),
+        write=sink,
+        cache=None,
+    )
+
+    # ru_maxrss is KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    pool.shutdown()
+
+    print(json.dumps({"chunks": written, "peak_mb": (peak - baseline) / 2**20}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--modes", nargs="+", default=["stream", "eager"])
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "synthetic_pdfs"))
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    from scripts.make_synthetic_pdfs import make_corpus
+
+    paths = make_corpus(args.corpus, args.pages)
+
+    print(f"\n{'pages':>6} {'mode':>7} {'chunks':>8} {'peak RSS MB':>12}")
+
+    for pages, path in zip(args.pages, paths):
+        for mode in args.modes:
+            out = subprocess.run(
+                [sys.executable, "-m", "scripts.bench_ingest_memory", "--child", path, mode],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{pages:>6} {mode:>7} {result['chunks']:>8} {result['peak_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Filtered query latency vs corpus size for each PDF_PARTITIONING layout.
+
+One throwaway Chroma client holds the same synthetic corpus three
+times: in a single `pdf_chunks` collection, per owner (shared arXiv
+collection + one per user) and hash-sharded. Documents of
+--chunks-per-doc random unit vectors are split between arXiv
+(--global-share) and --users uploaders. At every size in --sizes,
+questions against random documents are timed with the filter and
+collection semantic_search would use for that layout (HNSW path; the
+in-memory document cache is not involved).
+
+Usage:
+    cd backend && python -m scripts.bench_partitioning --sizes 10000 100000 1000000 --users 200
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+from app.chroma_store import GLOBAL_OWNER, pdf_partition
+from app.config import settings
+
+
+LAYOUTS = ["single", "owner", "sharded"]
+
+
+def unit_vectors(rng, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def add_document(client, layout: str, doc_id: str, owner: str, vectors: np.ndarray):
+    name, _ = pdf_partition(owner, layout)
+
+    client.get_or_create_collection(name).add(
+        ids=[f"{doc_id}_{i}" for i in range(len(vectors))],
+        embeddings=vectors.tolist(),
+        metadatas=[
+            {"metadata_id": doc_id, "user_id": owner, "section": "body"}
+            for _ in range(len(vectors))
+        ],
+    )
+
+
+def query_filter(layout: str, doc_id: str, owner: str) -> tuple[str, dict]:
+    name, shared = pdf_partition(owner, layout)
+
+    if shared:
+        return name, {"$and": [{"metadata_id": doc_id}, {"user_id": owner}]}
+
+    return name, {"metadata_id": doc_id}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--global-share", type=float, default=0.5, help="share of arXiv documents")
+    parser.add_argument("--chunks-per-doc", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--k", type=int, default=60)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp(prefix="bench_partitions_")
+    client = chromadb.PersistentClient(path=directory)
+    documents = []  # (doc id, owner)
+    total = 0
+
+    print(f"\nusers={args.users} shards={settings.PDF_SHARDS} global share={args.global_share}")
+    print(f"{'chunks':>10} {'docs':>6} " + " ".join(f"│ {l + ' p50':>11} {'p95':>7}" for l in LAYOUTS))
+
+    try:
+        for size in args.sizes:
+            while total < size:
+                doc_id = f"doc{len(documents)}"
+                owner = (
+                    GLOBAL_OWNER
+                    if rng.random() < args.global_share
+                    else f"user{rng.integers(args.users)}"
+                )
+                vectors = unit_vectors(rng, args.chunks_per_doc, args.dim)
+
+                for layout in LAYOUTS:
+                    add_document(client, layout, doc_id, owner, vectors)
+
+                documents.append((doc_id, owner))
+                total += args.chunks_per_doc
+
+            timings = {layout: [] for layout in LAYOUTS}
+
+            for _ in range(args.questions):
+                doc_id, owner = documents[rng.integers(len(documents))]
+                query = unit_vectors(rng, 1, args.dim)[0].tolist()
+
+                for layout in LAYOUTS:
+                    name, where = query_filter(layout, doc_id, owner)
+                    collection = client.get_collection(name)
+
+                    start = time.perf_counter()
+                    collection.query(query_embeddings=[query], n_results=args.k, where=where)
+                    timings[layout].append(time.perf_counter() - start)
+
+            row = f"{total:>10} {len(documents):>6} "
+            for layout in LAYOUTS:
+                ms = np.asarray(timings[layout]) * 1000
+                row += f"│ {np.percentile(ms, 50):>11.2f} {np.percentile(ms, 95):>7.2f} "
+            print(row)
+
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+PDF text extraction throughput: serial vs page ranges over a process pool.
+
+For each synthetic PDF (see make_synthetic_pdfs.py) and worker count,
+extracts every page the way the ingestion pipeline does - page ranges
+of --pages-per-task fanned out over a spawn ProcessPoolExecutor and
+reassembled in order - and reports pages/s. workers=1 is the old
+serial loop.
+
+Usage:
+    cd backend && python -m scripts.bench_pdf_extraction --pages 10 100 300 --workers 1 2 4 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts.make_synthetic_pdfs import make_corpus
+from services.pdf_extractors import (
+    EXTRACTORS,
+    count_pages,
+    extract_page_range,
+    extractor_chain,
+    page_ranges,
+)
+
+
+def extract_serial(path: str, backends: list[str]) -> int:
+    pages = extract_page_range(path, 0, count_pages(path, backends), backends)
+    return sum(len(p.text) for p in pages)
+
+
+def extract_parallel(pool, path: str, pages_per_task: int, backends: list[str]) -> int:
+    ranges = page_ranges(count_pages(path, backends), pages_per_task)
+    futures = [
+        pool.submit(extract_page_range, path, a, b, backends)
+        for a, b in ranges
+    ]
+
+    pages = [page for f in futures for page in f.result()]
+    assert [p.number for p in pages] == list(range(len(pages)))
+    return sum(len(p.text) for p in pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--pages-per-task", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=2)
+    parser.add_argument("--extractor", default="pypdf", choices=["auto", *EXTRACTORS])
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "synthetic_pdfs"))
+    args = parser.parse_args()
+
+    paths = make_corpus(args.corpus, args.pages)
+    ctx = multiprocessing.get_context("spawn")
+    backends = extractor_chain(args.extractor)
+
+    print(f"\n{'pages':>6} {'workers':>8} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+
+    for pages, path in zip(args.pages, paths):
+        serial = None
+
+        for workers in args.workers:
+            if workers == 1:
+                run = lambda: extract_serial(path, backends)
+                pool = None
+            else:
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+                # Start the workers before timing
+                list(pool.map(count_pages, [path] * workers))
+                run = lambda: extract_parallel(pool, path, args.pages_per_task, backends)
+
+            best = float("inf")
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - start)
+
+            if pool is not None:
+                pool.shutdown()
+
+            serial = serial or best
+            print(
+                f"{pages:>6} {workers:>8} {best:>9.2f} "
+                f"{pages / best:>9.1f} {serial / best:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
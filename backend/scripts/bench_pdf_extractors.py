@@ -0,0 +1,110 @@
+"""
+PDF extraction backends: throughput and quality on a fixed PDF set.
+
+For every PDF in --corpus (synthetic paper-like PDFs are generated when
+the directory is empty) and every backend (plus the "auto" fallback
+chain), extracts all pages in-process and reports:
+- chars/s and pages/s
+- section-detection hit rate: sections found by the ingestion
+  SECTION_REGEX / sections found by any backend on that PDF
+- pages whose text was judged empty or garbled
+
+Usage:
+    cd backend && python -m scripts.bench_pdf_extractors --corpus ./bench_pdfs
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from scripts.make_synthetic_pdfs import make_corpus
+from services.pdf_extractors import (
+    EXTRACTORS,
+    count_pages,
+    extract_page_range,
+    extractor_chain,
+    is_usable_text,
+)
+from services.pdf_service import SECTION_REGEX, normalize_section
+
+
+def detect_sections(text: str) -> set[str]:
+    sections = set()
+
+    for line in text.split("\n"):
+        match = SECTION_REGEX.search(line.strip())
+        if match:
+            sections.add(normalize_section(match.group(1)))
+
+    return sections
+
+
+def run_backend(path: str, backends: list[str]) -> dict:
+    start = time.perf_counter()
+    pages = extract_page_range(path, 0, count_pages(path, backends), backends)
+    elapsed = time.perf_counter() - start
+
+    text = "\n".join(p.text for p in pages)
+
+    return {
+        "seconds": elapsed,
+        "pages": len(pages),
+        "chars": len(text),
+        "bad_pages": sum(1 for p in pages if not is_usable_text(p.text)),
+        "sections": detect_sections(text),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "synthetic_pdfs"))
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 150])
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.pdf")))
+    if not paths:
+        paths = make_corpus(args.corpus, args.pages)
+
+    variants = {name: [name] for name in EXTRACTORS}
+    variants["auto"] = extractor_chain("auto")
+
+    totals = defaultdict(lambda: defaultdict(float))
+
+    for path in paths:
+        results = {}
+
+        for label, backends in variants.items():
+            try:
+                results[label] = run_backend(path, backends)
+            except Exception as e:
+                print(f"{os.path.basename(path)} / {label}: failed ({e})")
+
+        expected = set().union(*(r["sections"] for r in results.values()))
+
+        for label, r in results.items():
+            t = totals[label]
+            t["seconds"] += r["seconds"]
+            t["pages"] += r["pages"]
+            t["chars"] += r["chars"]
+            t["bad_pages"] += r["bad_pages"]
+            t["sections_found"] += len(r["sections"])
+            t["sections_expected"] += len(expected)
+
+    print(
+        f"\n{'backend':<12} {'chars/s':>12} {'pages/s':>9} "
+        f"{'section hit':>12} {'bad pages':>10}"
+    )
+
+    for label, t in totals.items():
+        hit = t["sections_found"] / t["sections_expected"] if t["sections_expected"] else 0.0
+        print(
+            f"{label:<12} {t['chars'] / t['seconds']:>12,.0f} "
+            f"{t['pages'] / t['seconds']:>9.1f} {hit:>11.1%} {int(t['bad_pages']):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Query embedding throughput: one encode per query vs micro-batching.
+
+Runs N concurrent callers (threads, like the embed executor) that each
+embed queries through either a direct batch-of-1 `model.encode` or the
+MicroBatcher, and reports queries/s at each concurrency level.
+
+Usage:
+    cd backend && python -m scripts.bench_query_batching --queries 512
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sentence_transformers import SentenceTransformer
+
+from app.config import settings
+from app.micro_batcher import MicroBatcher
+
+
+QUESTIONS = [
+    "What dataset is used for evaluation?",
+    "How does the proposed model compare to the baseline?",
+    "What are the limitations of this approach?",
+    "Which loss function is optimized during training?",
+    "How many parameters does the model have?",
+    "What is the main contribution of the paper?",
+    "How is the retrieval component implemented?",
+    "Which hyperparameters were tuned?",
+]
+
+
+def make_queries(count):
+    return [
+        f"query: {QUESTIONS[i % len(QUESTIONS)]} (variant {i})"
+        for i in range(count)
+    ]
+
+
+def run(callers, queries, embed_one):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        list(pool.map(embed_one, queries))
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--max-batch-size", type=int, default=settings.EMBED_BATCH_MAX_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=settings.EMBED_BATCH_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    model = SentenceTransformer(settings.SENTENCE_EMBED_MODEL)
+
+    def encode(texts):
+        return model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
+
+    queries = make_queries(args.queries)
+    encode(queries[:8])  # warm-up
+
+    print(f"\n{'callers':>8} {'direct q/s':>12} {'batched q/s':>12} {'speedup':>8} {'mean batch':>11}")
+
+    for callers in args.concurrency:
+        direct = run(callers, queries, lambda q: encode([q])[0])
+
+        batcher = MicroBatcher(
+            encode,
+            max_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+        )
+        batched = run(callers, queries, batcher.submit)
+
+        print(
+            f"{callers:>8} {direct:>12.1f} {batched:>12.1f} "
+            f"{batched / direct:>7.2f}x {batcher.stats()['mean_batch_size']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Cascade reranking: how often the cross-encoder can be skipped or cut
+down, and what that does to the prompt and the answer.
+
+For indexed documents in Mongo, each question runs the /pdf/ask
+retrieval (semantic_search with scores, junk filter, dedup) and the
+full cross-encoder pass over every candidate. Since cross-encoder
+scores are per pair, the cascade for any threshold can be replayed
+from those scores, so a sweep over --skip-margins costs nothing extra.
+Per margin the script reports:
+- share of questions skipped / shrunk / fully reranked
+- share of cross-encoder pairs saved
+- prompt overlap: share of the ASK_PROMPT_CHUNKS chunks the cascade
+  puts in the prompt that the full rerank also puts there, and how
+  often the prompt is identical
+
+With --answers, both prompts are sent to Ollama wherever they differ
+at --answer-margin (default RERANK_SKIP_MARGIN), and answer token-F1
+is reported.
+
+Usage:
+    cd backend && python -m scripts.bench_rerank_cascade --docs 20 --skip-margins 0.02 0.05 0.08 0.12
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import numpy as np
+from pymongo import MongoClient
+
+from app.chroma_store import semantic_search
+from app.config import settings
+from routers.pdf_chunking import ASK_PROMPT_CHUNKS, build_ask_prompt
+from scripts.bench_section_retrieval import ASK_QUERIES
+from services.pdf_service import deduplicate_chunks, is_junk_chunk
+from services.reranker import get_reranker, plan_cascade, score_pairs
+
+
+def candidates(query: str, document: dict):
+    owner = document.get("owner")
+    scored = semantic_search(
+        query=query,
+        metadata_id=str(document["_id"]),
+        n_results=20,
+        user_id=str(owner) if owner else None,
+        section_weights=settings.SECTION_WEIGHTS_ASK,
+        index_version=document.get("index_version", 0),
+        with_scores=True,
+    )
+
+    scores = {id(c): s for c, s in scored}
+    valid = [c for c, _ in scored if c.page_content and not is_junk_chunk(c.page_content)]
+
+    return [(c, scores[id(c)]) for c in deduplicate_chunks(valid, 20)]
+
+
+def replay(vector_scores, rerank_scores, margin: float):
+    """Prompt chunk indices the cascade would pick, and its decision."""
+    decision = plan_cascade(
+        vector_scores,
+        ASK_PROMPT_CHUNKS,
+        margin,
+        settings.RERANK_SHRINK_WINDOW,
+        settings.RERANK_MIN_CANDIDATES,
+    )
+    head = sorted(range(decision.candidates), key=lambda i: -rerank_scores[i])
+    order = head + list(range(decision.candidates, len(vector_scores)))
+
+    return order[:ASK_PROMPT_CHUNKS], decision
+
+
+def token_f1(a: str, b: str) -> float:
+    x, y = Counter(a.lower().split()), Counter(b.lower().split())
+    common = sum((x & y).values())
+
+    if not common:
+        return 0.0
+
+    precision, recall = common / sum(y.values()), common / sum(x.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+async def compare_answers(prompts) -> list[float]:
+    from app.llm_inference import close_http_client, generate_text
+
+    try:
+        scores = []
+        for full, cascade in prompts:
+            scores.append(token_f1(await generate_text(full), await generate_text(cascade)))
+        return scores
+    finally:
+        await close_http_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument(
+        "--skip-margins",
+        type=float,
+        nargs="+",
+        default=[0.02, 0.05, settings.RERANK_SKIP_MARGIN, 0.12],
+    )
+    parser.add_argument("--answers", action="store_true", help="also compare LLM answers")
+    parser.add_argument("--answer-margin", type=float, default=settings.RERANK_SKIP_MARGIN)
+    args = parser.parse_args()
+
+    db = MongoClient(settings.MONGO_URL)[settings.DB_NAME]
+    documents = list(db.documents.find({"type": "pdf", "indexed": True}).limit(args.docs))
+
+    if not documents:
+        print("No indexed PDFs; index some first (scripts/preindex_arxiv.py)")
+        return
+
+    model = get_reranker()
+    questions = []   # (query, chunks, vector scores, rerank scores)
+    full_latency = []
+
+    for document in documents:
+        for query in ASK_QUERIES:
+            scored = candidates(query, document)
+            if not scored:
+                continue
+
+            chunks = [c for c, _ in scored]
+            start = time.perf_counter()
+            rerank_scores = score_pairs(model, [(query, c.page_content) for c in chunks])
+            full_latency.append(time.perf_counter() - start)
+
+            questions.append((query, chunks, [s for _, s in scored], rerank_scores))
+
+    ms = np.asarray(full_latency) * 1000
+    print(
+        f"\n{len(questions)} questions; full rerank p50 {np.percentile(ms, 50):.1f} ms, "
+        f"p95 {np.percentile(ms, 95):.1f} ms"
+    )
+    print(
+        f"\n{'margin':>7} {'skip':>6} {'shrink':>7} {'full':>6} {'pairs saved':>12} "
+        f"{'prompt overlap':>15} {'same prompt':>12}"
+    )
+
+    for margin in args.skip_margins:
+        actions = Counter()
+        pairs_total = pairs_saved = 0
+        overlaps, same = [], 0
+
+        for query, chunks, vector_scores, rerank_scores in questions:
+            full = list(np.argsort(-rerank_scores)[:ASK_PROMPT_CHUNKS])
+            picked, decision = replay(vector_scores, rerank_scores, margin)
+
+            actions[decision.action] += 1
+            pairs_total += len(chunks)
+            pairs_saved += len(chunks) - decision.candidates
+            overlaps.append(len(set(full) & set(picked)) / len(full))
+            same += set(full) == set(picked)
+
+        n = len(questions)
+        print(
+            f"{margin:>7.3f} {actions['skip'] / n:>6.0%} {actions['shrink'] / n:>7.0%} "
+            f"{actions['full'] / n:>6.0%} {pairs_saved / max(1, pairs_total):>12.0%} "
+            f"{np.mean(overlaps):>15.3f} {same / n:>12.0%}"
+        )
+
+    if not args.answers:
+        return
+
+    differing = []
+
+    for query, chunks, vector_scores, rerank_scores in questions:
+        full = list(np.argsort(-rerank_scores)[:ASK_PROMPT_CHUNKS])
+        picked, _ = replay(vector_scores, rerank_scores, args.answer_margin)
+
+        if set(full) != set(picked):
+            differing.append((
+                build_ask_prompt(query, [chunks[i] for i in full]),
+                build_ask_prompt(query, [chunks[i] for i in picked]),
+            ))
+
+    if not differing:
+        print(f"\nPrompts never differ at margin {args.answer_margin}")
+        return
+
+    f1 = asyncio.run(compare_answers(differing))
+    print(
+        f"\nAnswers where prompts differ (margin {args.answer_margin}): "
+        f"{len(f1)} questions, token-F1 mean {np.mean(f1):.3f}, min {np.min(f1):.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
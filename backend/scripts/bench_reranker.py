@@ -0,0 +1,150 @@
+"""
+Reranker latency and ranking agreement per backend.
+
+Questions are sentences sampled from the PDFs in --corpus (synthetic
+PDFs are generated when it is empty); each comes with --candidates
+chunks of its document, as /pdf/ask reranks them. The reference is
+the previous reranker: PyTorch fp32 CrossEncoder with batch_size=8.
+For every backend in --backends (length-aware batches) the script
+reports:
+- latency per question (p50 / p95)
+- Kendall tau of the scores against the reference (mean / min)
+- overlap of the top-k kept for the prompt
+- throughput with --concurrency threads sharing one rerank batcher,
+  against the same questions scored one at a time
+
+Usage:
+    cd backend && python -m scripts.bench_reranker --backends torch onnx onnx-int8
+"""
+
+import argparse
+import glob
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.config import settings
+from app.onnx_encoder import kendall_tau
+from scripts.bench_chunkers import normalize, sample_queries
+from scripts.make_synthetic_pdfs import make_corpus
+from services.pdf_extractors import count_pages, extract_page_range, extractor_chain
+from services.pdf_service import get_chunk_splitter, iter_chunks, iter_section_lines, with_headings
+from services.reranker import load_reranker, rerank_batcher, score_pairs
+
+
+def build_questions(paths, per_doc: int, candidates: int, rng: random.Random):
+    """[(query, [chunk, ...])] with the query's own chunk among the candidates."""
+    backends = extractor_chain(settings.PDF_EXTRACTOR)
+    questions = []
+
+    for path in paths:
+        pages = extract_page_range(path, 0, count_pages(path, backends), backends)
+        chunks = [
+            text
+            for _, text in iter_chunks(
+                iter_section_lines(with_headings(p for p in pages if p.text)),
+                settings.INGEST_CHUNK_WINDOW_CHARS,
+                splitter=get_chunk_splitter(),
+            )
+        ]
+
+        for query in sample_queries(pages, per_doc, rng):
+            relevant = [c for c in chunks if normalize(query) in normalize(c)]
+            others = [c for c in chunks if c not in relevant]
+            picked = relevant[:1] + rng.sample(others, min(candidates - 1, len(others)))
+            rng.shuffle(picked)
+            questions.append((query, picked))
+
+    return questions
+
+
+def top_overlap(reference, scores, k: int) -> float:
+    a = set(np.argsort(-np.asarray(reference))[:k])
+    b = set(np.argsort(-np.asarray(scores))[:k])
+    return len(a & b) / max(1, len(a))
+
+
+def throughput(score_fn, questions, concurrency: int, batched: bool) -> float:
+    if batched:
+        run = rerank_batcher(score_fn).submit
+        workers = concurrency
+    else:
+        run = score_fn
+        workers = 1
+
+    pairs = [[(q, c) for c in chunks] for q, chunks in questions]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run, pairs))
+
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "synthetic_pdfs"))
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 30])
+    parser.add_argument("--questions", type=int, default=20, help="per document")
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.pdf")))
+    if not paths:
+        paths = make_corpus(args.corpus, args.pages)
+
+    questions = build_questions(paths, args.questions, args.candidates, random.Random(0))
+    print(f"\n{len(questions)} questions × {args.candidates} candidates")
+
+    # Reference: the previous fixed batch_size=8 fp32 path
+    reference_model = load_reranker("torch")
+    reference, latency = [], []
+
+    for query, chunks in questions:
+        start = time.perf_counter()
+        reference.append(reference_model.predict([(query, c) for c in chunks], batch_size=8))
+        latency.append(time.perf_counter() - start)
+
+    ms = np.asarray(latency) * 1000
+    print(
+        f"\n{'backend':<16} {'p50 ms':>7} {'p95 ms':>7} {'tau mean':>9} {'tau min':>8} "
+        f"{'top-' + str(args.top_k):>6} {'serial q/s':>11} {'batched q/s':>12}"
+    )
+    print(
+        f"{'torch bs=8 (ref)':<16} {np.percentile(ms, 50):>7.1f} {np.percentile(ms, 95):>7.1f} "
+        f"{1.0:>9.3f} {1.0:>8.3f} {1.0:>6.2f}"
+    )
+
+    for backend in args.backends:
+        model = load_reranker(backend)
+        score_fn = lambda pairs: score_pairs(model, pairs)
+        latency, taus, overlaps = [], [], []
+
+        for (query, chunks), ref in zip(questions, reference):
+            start = time.perf_counter()
+            scores = score_fn([(query, c) for c in chunks])
+            latency.append(time.perf_counter() - start)
+
+            taus.append(kendall_tau(ref, scores))
+            overlaps.append(top_overlap(ref, scores, args.top_k))
+
+        ms = np.asarray(latency) * 1000
+        serial = throughput(score_fn, questions, args.concurrency, batched=False)
+        batched = throughput(score_fn, questions, args.concurrency, batched=True)
+
+        print(
+            f"{backend:<16} {np.percentile(ms, 50):>7.1f} {np.percentile(ms, 95):>7.1f} "
+            f"{np.mean(taus):>9.3f} {np.min(taus):>8.3f} {np.mean(overlaps):>6.2f} "
+            f"{serial:>11.1f} {batched:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
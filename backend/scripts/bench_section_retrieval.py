@@ -0,0 +1,175 @@
+"""
+Two-pass section-priority retrieval vs one section-weighted search.
+
+The old `semantic_search(section_priority=True)` queried the abstract
+and introduction first and, when that returned fewer than n_results,
+threw the results away and searched again without the section filter.
+The current search runs once, over-fetching RETRIEVAL_OVERFETCH ×
+n_results, and re-scores by similarity × section weight.
+
+For indexed documents in Mongo, both are run with the ask and summary
+settings (n_results, section weights). The script reports:
+- latency per retrieval (p50 / p95), including query embedding
+- similarity searches per retrieval
+- candidate recall: the share of the cross-encoder's top --judge-k
+  chunks (scored over ALL chunks of the document) that the retrieval
+  hands to the reranker
+- share of candidates from abstract / introduction
+
+Usage:
+    cd backend && python -m scripts.bench_section_retrieval --docs 20 --repeat 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+from pymongo import MongoClient
+
+from app.chroma_store import (
+    GLOBAL_OWNER,
+    get_chroma_client,
+    get_pdf_vector_store,
+    pdf_partition,
+    semantic_search,
+)
+from app.config import settings
+from services.reranker import get_reranker
+from services.summary_service import SUMMARY_QUERY
+
+
+ASK_QUERIES = [
+    "What problem does this paper address?",
+    "Which datasets are used for evaluation?",
+    "How does the proposed method work?",
+    "What are the main results compared to baselines?",
+    "What limitations do the authors mention?",
+]
+
+# endpoint → (queries, n_results, section weights)
+ENDPOINTS = {
+    "ask": (ASK_QUERIES, 20, settings.SECTION_WEIGHTS_ASK),
+    "summary": ([SUMMARY_QUERY], 15, settings.SECTION_WEIGHTS_SUMMARY),
+}
+
+PRIORITY_SECTIONS = ["abstract", "introduction"]
+
+
+def two_pass_search(query, n_results, metadata_id, user_id):
+    """The previous section_priority=True behavior. Returns (docs, searches)."""
+    store = get_pdf_vector_store(user_id)
+    filters = [{"metadata_id": metadata_id}, {"user_id": user_id}]
+
+    results = store.similarity_search_with_score(
+        query=query,
+        k=n_results,
+        filter={"$and": filters + [{"section": {"$in": PRIORITY_SECTIONS}}]},
+    )
+
+    if len(results) >= n_results:
+        return [doc for doc, _ in results], 1
+
+    results = store.similarity_search_with_score(
+        query=query,
+        k=n_results,
+        filter={"$and": filters},
+    )
+
+    return [doc for doc, _ in results], 2
+
+
+def one_pass_search(query, n_results, metadata_id, user_id, weights):
+    docs = semantic_search(
+        query=query,
+        n_results=n_results,
+        metadata_id=metadata_id,
+        user_id=user_id,
+        section_weights=weights,
+    )
+    return docs, 1
+
+
+def judge_top(query: str, chunks: list[str], k: int) -> set[str]:
+    scores = get_reranker().predict(
+        [(query, c) for c in chunks], batch_size=16, show_progress_bar=False
+    )
+    order = np.argsort(-np.asarray(scores))
+    return {chunks[i] for i in order[:k]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per query")
+    parser.add_argument("--judge-k", type=int, default=8)
+    args = parser.parse_args()
+
+    db = MongoClient(settings.MONGO_URL)[settings.DB_NAME]
+    documents = list(db.documents.find({"type": "pdf", "indexed": True}).limit(args.docs))
+
+    if not documents:
+        print("No indexed PDFs; index some first (scripts/preindex_arxiv.py)")
+        return
+
+    semantic_search("warm-up", n_results=1)
+    get_reranker()
+
+    results = {
+        (endpoint, mode): {"latency": [], "searches": [], "recall": [], "priority": []}
+        for endpoint in ENDPOINTS
+        for mode in ("two-pass", "one-pass")
+    }
+
+    for document in documents:
+        metadata_id = str(document["_id"])
+        user_id = str(document["owner"]) if document.get("owner") else GLOBAL_OWNER
+        collection = get_chroma_client().get_collection(pdf_partition(user_id)[0])
+        chunks = collection.get(where={"metadata_id": metadata_id}, include=["documents"])["documents"]
+
+        if not chunks:
+            continue
+
+        for endpoint, (queries, n_results, weights) in ENDPOINTS.items():
+            for query in queries:
+                relevant = judge_top(query, chunks, args.judge_k)
+
+                runs = {
+                    "two-pass": lambda: two_pass_search(query, n_results, metadata_id, user_id),
+                    "one-pass": lambda: one_pass_search(query, n_results, metadata_id, user_id, weights),
+                }
+
+                for mode, run in runs.items():
+                    stats = results[(endpoint, mode)]
+
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        docs, searches = run()
+                        stats["latency"].append(time.perf_counter() - start)
+
+                    texts = {d.page_content for d in docs}
+                    stats["searches"].append(searches)
+                    stats["recall"].append(len(texts & relevant) / len(relevant))
+                    stats["priority"].append(
+                        sum(d.metadata.get("section") in PRIORITY_SECTIONS for d in docs)
+                        / max(1, len(docs))
+                    )
+
+    print(
+        f"\n{'endpoint':<9} {'mode':<9} {'p50 ms':>7} {'p95 ms':>7} "
+        f"{'searches':>9} {'recall@' + str(args.judge_k):>9} {'abs+intro':>10}"
+    )
+
+    for (endpoint, mode), stats in results.items():
+        if not stats["latency"]:
+            continue
+
+        latency = np.asarray(stats["latency"]) * 1000
+        print(
+            f"{endpoint:<9} {mode:<9} {np.percentile(latency, 50):>7.1f} "
+            f"{np.percentile(latency, 95):>7.1f} {np.mean(stats['searches']):>9.2f} "
+            f"{np.mean(stats['recall']):>9.3f} {np.mean(stats['priority']):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Time-to-first-token benchmark for the Ollama client.
+
+Compares the blocking `generate_text` call with the streaming
+`stream_text` generator against whatever OLLAMA_BASE_URL points to
+(a real Ollama or scripts/fake_ollama.py).
+
+Usage:
+    cd backend && OLLAMA_BASE_URL=http://localhost:11500 python -m scripts.bench_ttft
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.llm_inference import generate_text, stream_text, close_http_client
+
+
+PROMPT = "Explain retrieval-augmented generation in two sentences."
+
+
+async def measure_blocking(runs):
+    totals = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await generate_text(PROMPT)
+        totals.append(time.perf_counter() - start)
+    return totals
+
+
+async def measure_streaming(runs):
+    ttfts, totals = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        first = None
+        async for _token in stream_text(PROMPT):
+            if first is None:
+                first = time.perf_counter() - start
+        totals.append(time.perf_counter() - start)
+        ttfts.append(first if first is not None else totals[-1])
+    return ttfts, totals
+
+
+async def run(args):
+    blocking = await measure_blocking(args.runs)
+    ttfts, totals = await measure_streaming(args.runs)
+    await close_http_client()
+
+    print(f"\nblocking   first byte = total = {statistics.mean(blocking) * 1000:8.1f} ms")
+    print(f"streaming  TTFT               = {statistics.mean(ttfts) * 1000:8.1f} ms")
+    print(f"streaming  total              = {statistics.mean(totals) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
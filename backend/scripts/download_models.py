@@ -3,12 +3,19 @@ Download and verify required ML models for the backend.
 
 Current setup:
 - Embeddings: BAAI/bge-base-en-v1.5 (HuggingFace)
+- Reranker: cross-encoder/ms-marco-MiniLM-L-6-v2 (HuggingFace)
 - Generation: llama3:8b via Ollama (handled separately)
 
+Run from backend/, like the API, so --onnx exports land in the
+EMBED_ONNX_DIR the API reads (and `app` is importable).
+
 Usage:
-    python backend/scripts/download_models.py
+    cd backend && python -m scripts.download_models
+    cd backend && python -m scripts.download_models --onnx   # also export ONNX fp32 + int8
+                                                             # (embedder and reranker)
 """
 
+import argparse
 import sys
 from pathlib import Path
 from huggingface_hub import snapshot_download
@@ -20,6 +27,29 @@ from sentence_transformers import SentenceTransformer
 # ============================================================
 
 EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Minimum mean cosine similarity against the PyTorch vectors
+PARITY_THRESHOLDS = {
+    "onnx": 0.999,
+    "onnx-int8": 0.98,
+}
+
+# Minimum mean Kendall tau of reranker scores against PyTorch
+RERANK_PARITY_THRESHOLDS = {
+    "onnx": 0.99,
+    "onnx-int8": 0.75,
+}
+
+RERANK_PARITY_QUERY = "how does the retriever select passages"
+
+PARITY_TEXTS = [
+    "passage: We propose a retrieval-augmented model for scientific QA.",
+    "passage: Results show a 4.2 point gain over the strongest baseline.",
+    "passage: The dataset contains 12,000 annotated abstracts from arXiv.",
+    "query: What are the limitations of the proposed method?",
+    "query: how is the reranker trained",
+]
 
 
 # ============================================================
@@ -49,11 +79,164 @@ def load_embedding_model():
     print("✅ Embedding model ready")
 
 
+# ============================================================
+# ONNX export (fp32 + dynamic int8) with parity check
+# ============================================================
+
+def export_onnx(repo_id: str, out_dir: Path):
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    snapshot = ensure_model_cached(repo_id)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"📦 Exporting {repo_id} to ONNX → {out_dir}")
+
+    tokenizer = AutoTokenizer.from_pretrained(snapshot)
+    model = AutoModel.from_pretrained(snapshot)
+    model.eval()
+
+    tokenizer.save_pretrained(out_dir)
+
+    pooling = snapshot / "1_Pooling" / "config.json"
+    if pooling.exists():
+        (out_dir / "pooling.json").write_text(pooling.read_text())
+
+    dummy = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [
+        name for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in dummy
+    ]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            str(out_dir / "model.onnx"),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic,
+            opset_version=17,
+        )
+
+    print("🔧 Quantizing to dynamic int8")
+    quantize_dynamic(
+        str(out_dir / "model.onnx"),
+        str(out_dir / "model_int8.onnx"),
+        weight_type=QuantType.QInt8,
+    )
+
+
+def verify_onnx_parity(repo_id: str, out_dir: Path) -> bool:
+    from app.onnx_encoder import OnnxSentenceEncoder, cosine_parity
+
+    reference = SentenceTransformer(repo_id).encode(
+        PARITY_TEXTS, normalize_embeddings=True
+    )
+
+    ok = True
+
+    for backend, threshold in PARITY_THRESHOLDS.items():
+        encoder = OnnxSentenceEncoder(str(out_dir), backend=backend)
+        parity = cosine_parity(reference, encoder.encode(PARITY_TEXTS))
+        passed = parity["mean"] >= threshold
+        ok = ok and passed
+
+        print(
+            f"{'✅' if passed else '❌'} {backend:<10} "
+            f"cosine mean={parity['mean']:.5f} min={parity['min']:.5f} "
+            f"(threshold {threshold})"
+        )
+
+    return ok
+
+
+# ============================================================
+# Reranker ONNX export (fp32 + dynamic int8) with rank parity
+# ============================================================
+
+def export_reranker_onnx(repo_id: str, out_dir: Path):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    snapshot = ensure_model_cached(repo_id)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"📦 Exporting {repo_id} to ONNX → {out_dir}")
+
+    tokenizer = AutoTokenizer.from_pretrained(snapshot)
+    model = AutoModelForSequenceClassification.from_pretrained(snapshot)
+    model.eval()
+
+    tokenizer.save_pretrained(out_dir)
+
+    dummy = tokenizer(["export query"], ["export passage"], return_tensors="pt")
+    input_names = [
+        name for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in dummy
+    ]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic["logits"] = {0: "batch"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            str(out_dir / "model.onnx"),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic,
+            opset_version=17,
+        )
+
+    print("🔧 Quantizing to dynamic int8")
+    quantize_dynamic(
+        str(out_dir / "model.onnx"),
+        str(out_dir / "model_int8.onnx"),
+        weight_type=QuantType.QInt8,
+    )
+
+
+def verify_reranker_parity(repo_id: str, out_dir: Path) -> bool:
+    from sentence_transformers import CrossEncoder
+    from app.onnx_encoder import OnnxCrossEncoder, kendall_tau
+
+    pairs = [(RERANK_PARITY_QUERY, text.split(": ", 1)[1]) for text in PARITY_TEXTS]
+    reference = CrossEncoder(repo_id, max_length=512).predict(pairs)
+
+    ok = True
+
+    for backend, threshold in RERANK_PARITY_THRESHOLDS.items():
+        encoder = OnnxCrossEncoder(str(out_dir), backend=backend)
+        tau = kendall_tau(reference, encoder.predict(pairs))
+        passed = tau >= threshold
+        ok = ok and passed
+
+        print(
+            f"{'✅' if passed else '❌'} reranker {backend:<10} "
+            f"kendall tau={tau:.3f} (threshold {threshold})"
+        )
+
+    return ok
+
+
 # ============================================================
 # Main
 # ============================================================
 
 def main():
+    parser = argparse.ArgumentParser(description="Download and verify backend models")
+    parser.add_argument(
+        "--onnx",
+        action="store_true",
+        help="also export ONNX fp32 / int8 embedding and reranker models",
+    )
+    args = parser.parse_args()
+
     print("\n🚀 Verifying embedding model (cache-aware)...\n")
 
     try:
@@ -62,6 +245,34 @@ def main():
         print(f"\n❌ Failed to load embedding model: {e}")
         sys.exit(1)
 
+    if args.onnx:
+        from app.config import settings
+        from app.onnx_encoder import onnx_model_dir
+
+        out_dir = Path(onnx_model_dir(settings.EMBED_ONNX_DIR, EMBEDDING_MODEL))
+
+        try:
+            export_onnx(EMBEDDING_MODEL, out_dir)
+        except Exception as e:
+            print(f"\n❌ ONNX export failed: {e}")
+            sys.exit(1)
+
+        if not verify_onnx_parity(EMBEDDING_MODEL, out_dir):
+            print("\n❌ ONNX parity check failed")
+            sys.exit(1)
+
+        rerank_dir = Path(onnx_model_dir(settings.EMBED_ONNX_DIR, RERANK_MODEL))
+
+        try:
+            export_reranker_onnx(RERANK_MODEL, rerank_dir)
+        except Exception as e:
+            print(f"\n❌ Reranker ONNX export failed: {e}")
+            sys.exit(1)
+
+        if not verify_reranker_parity(RERANK_MODEL, rerank_dir):
+            print("\n❌ Reranker ONNX parity check failed")
+            sys.exit(1)
+
     print("\n" + "-" * 45)
     print("🎉 EMBEDDING MODEL READY")
     print("\n⚠️  IMPORTANT:")
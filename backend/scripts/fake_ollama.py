@@ -0,0 +1,80 @@
+"""
+Minimal stand-in for the Ollama /api/generate endpoint.
+
+Streams a canned answer token by token with a configurable delay so
+streaming endpoints, time-to-first-token and connection pooling can be
+exercised without a real model.
+
+Usage:
+    python backend/scripts/fake_ollama.py --port 11500 --token-delay 0.05
+    OLLAMA_BASE_URL=http://localhost:11500 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+CANNED_ANSWER = (
+    "The paper proposes a retrieval-augmented method that grounds answers "
+    "in section-aware chunks and reports consistent gains over baselines."
+)
+
+app = FastAPI(title="Fake Ollama")
+app.state.token_delay = 0.05
+app.state.first_token_delay = 0.2
+
+
+def _tokens():
+    return [w + " " for w in CANNED_ANSWER.split()]
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    delay = app.state.token_delay
+
+    if not body.get("stream", True):
+        await asyncio.sleep(app.state.first_token_delay + delay * len(_tokens()))
+        return {
+            "model": model,
+            "response": CANNED_ANSWER,
+            "done": True,
+            "context": [1, 2, 3],
+        }
+
+    async def lines():
+        await asyncio.sleep(app.state.first_token_delay)
+        for token in _tokens():
+            yield json.dumps({"model": model, "response": token, "done": False}) + "\n"
+            await asyncio.sleep(delay)
+        yield json.dumps({
+            "model": model,
+            "response": "",
+            "done": True,
+            "context": [1, 2, 3],
+        }) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    app.state.token_delay = args.token_delay
+    app.state.first_token_delay = args.first_token_delay
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
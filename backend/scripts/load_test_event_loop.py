@@ -0,0 +1,131 @@
+"""
+Event-loop responsiveness load test.
+
+Fires long-running /pdf/ask requests in the background and samples the
+latency of lightweight endpoints (/ and /health) at the same time.
+If blocking work leaks onto the event loop, the p99 of the lightweight
+endpoints grows with the number of in-flight generations.
+
+Usage:
+    python backend/scripts/load_test_event_loop.py \\
+        --base-url http://localhost:8001 \\
+        --token <JWT> --document-id <id> --concurrency 8
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+# ============================================================
+# Helpers
+# ============================================================
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    ms = [s * 1000 for s in samples]
+    print(
+        f"{label:<28} n={len(ms):<5} "
+        f"p50={percentile(ms, 50):7.1f}ms "
+        f"p95={percentile(ms, 95):7.1f}ms "
+        f"p99={percentile(ms, 99):7.1f}ms "
+        f"max={max(ms, default=0):7.1f}ms"
+    )
+
+
+async def sample_endpoint(client, path, duration, interval):
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get(path)
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+    return samples
+
+
+async def ask_forever(client, headers, document_id, stop, latencies):
+    payload = {
+        "document_id": document_id,
+        "query": "What are the main limitations of the proposed method?",
+    }
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.post("/pdf/ask", json=payload, headers=headers)
+        except httpx.HTTPError as e:
+            print("⚠️ ask failed:", e)
+        latencies.append(time.perf_counter() - start)
+
+
+# ============================================================
+# Scenarios
+# ============================================================
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {args.token}"}
+    timeout = httpx.Timeout(600.0)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+
+        print("\n📏 Baseline (no generations in flight)")
+        for path in ("/", "/health"):
+            samples = await sample_endpoint(
+                client, path, args.duration, args.interval
+            )
+            report(f"{path} idle", samples)
+
+        print(f"\n🔥 Under load ({args.concurrency} concurrent /pdf/ask)")
+        stop = asyncio.Event()
+        ask_latencies = []
+        workers = [
+            asyncio.create_task(
+                ask_forever(client, headers, args.document_id, stop, ask_latencies)
+            )
+            for _ in range(args.concurrency)
+        ]
+
+        # Give the asks time to reach retrieval / generation
+        await asyncio.sleep(args.warmup)
+
+        for path in ("/", "/health"):
+            samples = await sample_endpoint(
+                client, path, args.duration, args.interval
+            )
+            report(f"{path} under load", samples)
+
+        stop.set()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        if ask_latencies:
+            report("/pdf/ask", ask_latencies)
+            print(f"mean /pdf/ask: {statistics.mean(ask_latencies):.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--document-id", required=True)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Synthetic paper-like PDFs for the extraction benchmarks.
+
+Each PDF has numbered section headings (Abstract, Introduction, ...,
+References) followed by filler paragraphs, so both throughput and
+section detection can be measured without shipping real papers.
+Output is deterministic for a given page count.
+
+Usage:
+    cd backend && python -m scripts.make_synthetic_pdfs --pages 10 100 300 --out /tmp/pdfs
+"""
+
+import argparse
+import os
+import random
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+
+# IEEE-style headings, which SECTION_REGEX recognizes
+SECTIONS = [
+    "Abstract",
+    "I. Introduction",
+    "II. Related Work",
+    "III. Methodology",
+    "IV. Results",
+    "V. Discussion",
+    "VI. Conclusion",
+    "References",
+]
+
+WORDS = (
+    "model retrieval transformer dataset baseline evaluation encoder "
+    "attention training loss accuracy benchmark corpus ablation latency "
+    "embedding section document query passage results proposed method"
+).split()
+
+LINES_PER_PAGE = 48
+
+
+def filler_line(rng: random.Random) -> str:
+    # "The ..." so filler never starts like a section heading
+    return "The " + " ".join(rng.choice(WORDS) for _ in range(12)) + "."
+
+
+def write_pdf(path: str, pages: int, seed: int = 0):
+    rng = random.Random(seed + pages)
+    pdf = canvas.Canvas(path, pagesize=letter)
+    width, height = letter
+
+    # Spread section headings evenly over the document
+    heading_every = max(1, pages * LINES_PER_PAGE // len(SECTIONS))
+    line_no = 0
+    headings = iter(SECTIONS)
+
+    for _ in range(pages):
+        y = height - 60
+        for _ in range(LINES_PER_PAGE):
+            heading = next(headings, None) if line_no % heading_every == 0 else None
+            pdf.drawString(60, y, heading or filler_line(rng))
+            y -= 14
+            line_no += 1
+        pdf.showPage()
+
+    pdf.save()
+
+
+def make_corpus(out_dir: str, page_counts) -> list[str]:
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+
+    for pages in page_counts:
+        path = os.path.join(out_dir, f"synthetic_{pages}p.pdf")
+        if not os.path.exists(path):
+            write_pdf(path, pages)
+        paths.append(path)
+
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--out", default="synthetic_pdfs")
+    args = parser.parse_args()
+
+    for path in make_corpus(args.out, args.pages):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Move existing PDF chunks into the PDF_PARTITIONING layout.
+
+Reads every pdf_chunks* collection and upserts each chunk (same id,
+embedding, document, metadata; nothing is re-embedded) into the
+collection its owner routes to under --to. Ids are unchanged, so the
+migration can be interrupted and re-run. Chunks are only removed from
+their old collection with --delete-source, after every source has been
+copied and the counts check out; collections left empty are dropped.
+
+Set PDF_PARTITIONING to the new layout and restart the API after the
+copy, then run again with --delete-source to reclaim space.
+
+Usage:
+    cd backend && python -m scripts.migrate_pdf_partitions --to owner [--dry-run]
+    cd backend && python -m scripts.migrate_pdf_partitions --to owner --delete-source
+"""
+
+import argparse
+import time
+from collections import Counter, defaultdict
+
+from app.chroma_store import GLOBAL_OWNER, get_chroma_client, pdf_partition
+
+
+def pdf_collections(client) -> list[str]:
+    names = [getattr(c, "name", c) for c in client.list_collections()]
+    return sorted(n for n in names if n == "pdf_chunks" or n.startswith("pdf_chunks_"))
+
+
+def copy_collection(client, name: str, layout: str, batch_size: int, dry_run: bool) -> tuple[Counter, dict]:
+    """
+    Copies the chunks of `name` that belong elsewhere under `layout`.
+    Returns (chunks per target collection, moved ids per source).
+    """
+    source = client.get_collection(name)
+    copied = Counter()
+    moved = []
+    offset = 0
+
+    while True:
+        page = source.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=batch_size,
+            offset=offset,
+        )
+
+        if not page["ids"]:
+            break
+
+        offset += len(page["ids"])
+        targets = defaultdict(lambda: {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+
+        for i, chunk_id in enumerate(page["ids"]):
+            owner = page["metadatas"][i].get("user_id") or GLOBAL_OWNER
+            target, _ = pdf_partition(owner, layout)
+
+            if target == name:
+                continue
+
+            batch = targets[target]
+            batch["ids"].append(chunk_id)
+            batch["embeddings"].append(page["embeddings"][i])
+            batch["documents"].append(page["documents"][i])
+            batch["metadatas"].append(page["metadatas"][i])
+
+        for target, batch in targets.items():
+            if not dry_run:
+                client.get_or_create_collection(target).upsert(**batch)
+
+            copied[target] += len(batch["ids"])
+            moved.extend(batch["ids"])
+
+    return copied, moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--to", choices=["single", "owner", "sharded"], required=True)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="count only, write nothing")
+    parser.add_argument(
+        "--delete-source",
+        action="store_true",
+        help="remove migrated chunks from their old collections",
+    )
+    args = parser.parse_args()
+
+    client = get_chroma_client()
+    sources = pdf_collections(client)
+    start = time.perf_counter()
+
+    print(f"🔀 Migrating {len(sources)} collections to the '{args.to}' layout...")
+
+    totals = Counter()
+    moved = {}
+
+    for name in sources:
+        copied, ids = copy_collection(client, name, args.to, args.batch, args.dry_run)
+        totals.update(copied)
+        moved[name] = ids
+        print(f"  {name}: {len(ids)} chunks to {len(copied)} collections")
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ {sum(totals.values())} chunks into {len(totals)} collections "
+        f"in {elapsed:.1f}s"
+    )
+
+    if args.dry_run or not args.delete_source:
+        return
+
+    # Every moved id must now exist in its target before anything is removed
+    for name, ids in moved.items():
+        for i in range(0, len(ids), args.batch):
+            batch = ids[i:i + args.batch]
+            owners = client.get_collection(name).get(ids=batch, include=["metadatas"])
+
+            found = 0
+            for target in {pdf_partition(m.get("user_id") or GLOBAL_OWNER, args.to)[0] for m in owners["metadatas"]}:
+                found += len(client.get_collection(target).get(ids=batch, include=[])["ids"])
+
+            if found < len(batch):
+                raise SystemExit(f"❌ {name}: {len(batch) - found} chunks missing in targets, nothing deleted")
+
+    for name, ids in moved.items():
+        source = client.get_collection(name)
+
+        for i in range(0, len(ids), args.batch):
+            source.delete(ids=ids[i:i + args.batch])
+
+        if source.count() == 0:
+            client.delete_collection(name)
+            print(f"🧹 Dropped empty {name}")
+
+    print("🧹 Old copies removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Bulk pre-indexing of research_papers PDFs.
+
+Downloads each paper's PDF over the pooled download session (bounded
+concurrency, per-host rate limit, Retry-After on 429) while earlier
+downloads are extracted and embedded, so the network, the extraction
+processes and the embedder are busy at the same time. Progress is
+checkpointed: re-running after a crash or Ctrl-C skips papers that
+are already finished.
+
+Papers are claimed as running ingestion jobs, so an API started at
+the same time does not process them twice.
+
+Usage:
+    cd backend && python -m scripts.preindex_arxiv [--limit N] [--source arxiv]
+
+Local test against fixture PDFs:
+    cd backend && python -m scripts.serve_fixture_pdfs --seed 20 &
+    cd backend && python -m scripts.preindex_arxiv --source fixture --rate 5
+"""
+
+import argparse
+import asyncio
+import os
+
+from app.config import settings
+from app.executors import shutdown_executors
+from services.arxiv_preindex import build_preindexer
+from services.ingestion_queue import UPLOAD_DIR, close_download_session
+
+
+async def run(args):
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+    preindexer = build_preindexer(
+        checkpoint_path=args.checkpoint,
+        download_concurrency=args.downloads,
+        index_concurrency=args.indexers,
+        rate_per_host=args.rate,
+        source=args.source,
+        limit=args.limit,
+        retry_failed=args.retry_failed,
+    )
+
+    try:
+        stats = await preindexer.run()
+    finally:
+        await close_download_session()
+
+    seconds = stats.get("seconds", 0.0) or 1e-9
+    indexed = int(stats.get("indexed", 0))
+
+    print("\n✅ Pre-indexing finished")
+    print(f"Indexed:          {indexed}")
+    print(f"Already indexed:  {int(stats.get('already_indexed', 0))}")
+    print(f"Skipped (ckpt):   {int(stats.get('skipped', 0))}")
+    print(f"Busy elsewhere:   {int(stats.get('busy', 0))}")
+    print(f"Failed:           {int(stats.get('failed', 0))}")
+    print(f"Throttled (429):  {int(stats.get('throttled', 0))}")
+    print(f"Downloaded:       {stats.get('bytes', 0) / 1e6:.1f} MB")
+    print(f"Time:             {seconds:.1f}s ({indexed / seconds:.2f} papers/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default="arxiv")
+    parser.add_argument("--limit", type=int, default=0, help="0 = all papers")
+    parser.add_argument("--checkpoint", default=settings.ARXIV_PREINDEX_CHECKPOINT)
+    parser.add_argument("--downloads", type=int, default=settings.ARXIV_DOWNLOAD_CONCURRENCY)
+    parser.add_argument("--indexers", type=int, default=settings.ARXIV_INDEX_CONCURRENCY)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=settings.ARXIV_RATE_PER_HOST,
+        help="download starts per second per host",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="retry papers the checkpoint recorded as failed",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Rebuild PDF chunks for the whole corpus from the extracted-text cache.
+
+After a change to the chunker, SECTION_REGEX or the embedding model,
+this re-chunks every indexed PDF from TEXT_CACHE_DIR without opening
+a single PDF:
+- default:   content-hash diff, embedding only new chunks and deleting
+             the vanished ones
+- --reembed: upsert every chunk again (embedding model changed)
+- --dry-run: chunk only, nothing written (measures the chunking stage)
+
+Documents without cached text (extracted before the cache existed, or
+with another PDF_EXTRACTOR) are skipped; queue them with
+scripts/reindex_documents.py instead.
+
+Usage:
+    cd backend && python -m scripts.rechunk_corpus [--reembed | --dry-run] [--limit N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.chroma_store import (
+    GLOBAL_OWNER,
+    add_chunks_to_chroma,
+    chunk_id,
+    delete_chunks,
+    get_chunk_ids,
+)
+from app.config import settings
+from app.db import db
+from services.pdf_extractors import extractor_chain
+from services.pdf_service import SECTION_FINGERPRINT, index_pages
+from services.summary_service import invalidate_summaries
+from services.text_cache import extractor_version, text_cache
+
+
+def dry_run_write(batch, document_id, skip_ids):
+    return [
+        chunk_id(document_id, c.metadata["section"], c.page_content.strip())
+        for c in batch
+    ]
+
+
+def rechunk_document(document: dict, version: str, reembed: bool, dry_run: bool) -> dict:
+    document_id = str(document["_id"])
+    owner_value = str(document["owner"]) if document.get("owner") else GLOBAL_OWNER
+
+    page_count = text_cache.read_header(document_id, version)["page_count"]
+    existing = set() if dry_run else get_chunk_ids(document_id, owner_value)
+
+    produced, stats = index_pages(
+        text_cache.iter_pages(document_id, version, SECTION_FINGERPRINT),
+        page_count,
+        document_id,
+        owner_value,
+        existing_ids=set() if reembed else existing,
+        write=dry_run_write if dry_run else add_chunks_to_chroma,
+    )
+
+    stale = existing - produced
+
+    if not dry_run:
+        delete_chunks(stale, owner_value)
+
+    stats["chunks_deleted"] = len(stale)
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--reembed", action="store_true")
+    mode.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+
+    version = extractor_version(
+        extractor_chain(settings.PDF_EXTRACTOR, settings.PDF_EXTRACTOR_FALLBACK)
+    )
+
+    print(f"🔁 Re-chunking from cached text ({version})...")
+
+    totals = {"documents": 0, "skipped": 0, "pages": 0, "chunks": 0, "embedded": 0, "deleted": 0}
+    start = time.perf_counter()
+
+    cursor = db.documents.find({"type": "pdf", "indexed": True})
+    if args.limit:
+        cursor = cursor.limit(args.limit)
+
+    async for document in cursor:
+        if not text_cache.has(str(document["_id"]), version):
+            totals["skipped"] += 1
+            continue
+
+        stats = await asyncio.to_thread(
+            rechunk_document, document, version, args.reembed, args.dry_run
+        )
+
+        totals["documents"] += 1
+        totals["pages"] += stats["page_count"]
+        totals["chunks"] += stats["chunk_count"]
+        totals["embedded"] += stats["chunks_added"]
+        totals["deleted"] += stats["chunks_deleted"]
+
+        if args.dry_run:
+            continue
+
+        changed = stats["chunks_added"] or stats["chunks_deleted"]
+        update = {"$set": {
+            "chunk_count": stats["chunk_count"],
+            "chunks_added": stats["chunks_added"],
+            "chunks_deleted": stats["chunks_deleted"],
+        }}
+
+        if changed:
+            update["$inc"] = {"index_version": 1}
+
+        await db.documents.update_one({"_id": document["_id"]}, update)
+
+        if changed:
+            await invalidate_summaries(document["_id"])
+
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"✅ {totals['documents']} documents ({totals['skipped']} without cached text) "
+        f"in {elapsed:.1f}s"
+    )
+    print(
+        f"   {totals['pages']} pages ({totals['pages'] / max(elapsed, 1e-9):.0f}/s), "
+        f"{totals['chunks']} chunks ({totals['chunks'] / max(elapsed, 1e-9):.0f}/s), "
+        f"{totals['embedded']} embedded, {totals['deleted']} deleted"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
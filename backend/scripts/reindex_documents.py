@@ -0,0 +1,39 @@
+# backend/scripts/reindex_documents.py
+#
+# Queues indexed PDFs for an incremental re-index (after a chunker or
+# extractor change). The API's ingestion worker picks the jobs up and
+# embeds only chunks whose content changed.
+#
+#   cd backend && python -m scripts.reindex_documents            # all
+#   cd backend && python -m scripts.reindex_documents <id> <id>  # some
+
+import asyncio
+import sys
+
+from bson import ObjectId
+
+from app.db import db
+from services.ingestion_queue import enqueue_ingestion
+
+
+async def main(document_ids: list[str]):
+    query = {"type": "pdf", "indexed": True}
+
+    if document_ids:
+        query["_id"] = {"$in": [ObjectId(i) for i in document_ids]}
+
+    print("🔁 Queueing documents for re-indexing...")
+
+    queued = skipped = 0
+
+    async for document in db.documents.find(query, {"_id": 1}):
+        if await enqueue_ingestion(document["_id"], reindex=True):
+            queued += 1
+        else:
+            skipped += 1
+
+    print(f"✅ Queued {queued} documents ({skipped} already processing)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
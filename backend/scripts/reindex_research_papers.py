@@ -3,7 +3,7 @@
 from pymongo import MongoClient
 from app.config import settings
 from app.chroma_store import add_research_abstracts
-from app.chroma_store import research_vector_store
+from app.chroma_store import get_research_vector_store
 
 def main():
     print("🔁 Re-indexing research papers into Chroma...")
@@ -18,7 +18,7 @@ def main():
         return
 
     print("🧹 Clearing existing research_papers collection...")
-    research_vector_store.delete(where={})
+    get_research_vector_store().delete(where={})
 
     abstracts, metadatas, ids = [], [], []
 
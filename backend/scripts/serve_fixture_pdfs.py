@@ -0,0 +1,159 @@
+"""
+Local HTTP server for fixture PDFs, to exercise bulk pre-indexing
+without touching arXiv.
+
+Serves every *.pdf in --dir at /pdf/<name> (by default a fresh set of
+synthetic papers, one per page count) with optional latency, and
+answers 429 + Retry-After when one client starts requests faster than
+--max-rate. GET /stats reports the request rate each client actually
+achieved, which should stay at or under ARXIV_RATE_PER_HOST.
+
+--seed N inserts N research_papers (source "fixture") pointing at this
+server, for scripts/preindex_arxiv.py --source fixture. --unseed removes
+them again.
+
+Usage:
+    cd backend && python -m scripts.serve_fixture_pdfs --seed 20 --max-rate 2
+    cd backend && python -m scripts.preindex_arxiv --source fixture --rate 2
+    curl localhost:8765/stats
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse
+from pymongo import MongoClient
+
+from app.config import settings
+from scripts.make_synthetic_pdfs import make_corpus
+
+
+app = FastAPI(title="Fixture PDFs")
+app.state.dir = "fixture_pdfs"
+app.state.latency = 0.0
+app.state.max_rate = 0.0
+app.state.retry_after = 2
+
+# client → recent request start times
+_requests: dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+_stats = defaultdict(lambda: {"served": 0, "throttled": 0, "max_per_second": 0, "min_gap_ms": None})
+
+
+def _record(client: str) -> int:
+    """Stores one request start; returns starts in the last second."""
+    now = time.monotonic()
+    history = _requests[client]
+    stats = _stats[client]
+
+    if history:
+        gap = (now - history[-1]) * 1000
+        if stats["min_gap_ms"] is None or gap < stats["min_gap_ms"]:
+            stats["min_gap_ms"] = round(gap, 1)
+
+    history.append(now)
+    return sum(1 for t in history if now - t < 1.0)
+
+
+@app.get("/pdf/{name}")
+async def serve_pdf(name: str, request: Request):
+    client = request.client.host if request.client else "unknown"
+    per_second = _record(client)
+    stats = _stats[client]
+    stats["max_per_second"] = max(stats["max_per_second"], per_second)
+
+    if app.state.max_rate and per_second > app.state.max_rate:
+        stats["throttled"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "rate limited"},
+            headers={"Retry-After": str(app.state.retry_after)},
+        )
+
+    path = os.path.join(app.state.dir, os.path.basename(name))
+
+    if not os.path.isfile(path):
+        raise HTTPException(404, "No such fixture")
+
+    if app.state.latency:
+        await asyncio.sleep(app.state.latency)
+
+    stats["served"] += 1
+    return FileResponse(path, media_type="application/pdf")
+
+
+@app.get("/stats")
+async def stats():
+    return dict(_stats)
+
+
+def seed_papers(base_url: str, names: list[str]):
+    db = MongoClient(settings.MONGO_URL)[settings.DB_NAME]
+    now = datetime.utcnow()
+
+    for name in names:
+        db.research_papers.update_one(
+            {"source": "fixture", "arxiv_id": f"fixture-{name}"},
+            {
+                "$set": {
+                    "title": f"Fixture paper {name}",
+                    "abstract": "Synthetic paper served by serve_fixture_pdfs.",
+                    "pdf_url": f"{base_url}/pdf/{name}",
+                },
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True,
+        )
+
+    print(f"🌱 Seeded {len(names)} fixture papers")
+
+
+def unseed_papers():
+    db = MongoClient(settings.MONGO_URL)[settings.DB_NAME]
+    removed = db.research_papers.delete_many({"source": "fixture"}).deleted_count
+    print(f"🧹 Removed {removed} fixture papers")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dir", default="fixture_pdfs")
+    parser.add_argument("--seed", type=int, default=0, help="papers to insert (0 = none)")
+    parser.add_argument("--unseed", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--max-rate", type=float, default=0.0, help="requests/s per client before 429 (0 = off)")
+    parser.add_argument("--retry-after", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.unseed:
+        unseed_papers()
+        return
+
+    if args.seed:
+        # Distinct page counts → distinct content, so dedup does not
+        # short-circuit extraction
+        paths = make_corpus(args.dir, range(4, 4 + args.seed))
+        seed_papers(
+            f"http://{args.host}:{args.port}",
+            [os.path.basename(p) for p in paths],
+        )
+
+    names = [n for n in os.listdir(args.dir) if n.endswith(".pdf")]
+
+    app.state.dir = args.dir
+    app.state.latency = args.latency
+    app.state.max_rate = args.max_rate
+    app.state.retry_after = args.retry_after
+
+    print(f"📄 Serving {len(names)} PDFs from {args.dir}")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config import settings
+
+
+# ==================================================
+# 🧠 Semantic Answer Cache
+# ==================================================
+
+@dataclass
+class CachedAnswer:
+    scope: tuple
+    embedding: np.ndarray
+    query: str
+    answer: str
+    followups: list[str] | None
+    cost_seconds: float
+    created_at: float
+
+
+def answer_scope(document: dict) -> tuple:
+    """
+    Cache partition for a document.
+
+    Answers are tied to the document's index version, so a re-index
+    starts from an empty partition. arXiv documents (no owner) are
+    shared by everyone; uploads are only visible to their owner.
+    """
+    owner = document.get("owner")
+
+    return (
+        str(document["_id"]),
+        document.get("index_version", 0),
+        str(owner) if owner else "GLOBAL",
+    )
+
+
+class SemanticAnswerCache:
+    """
+    In-memory answer cache keyed by document scope + query embedding.
+
+    A lookup hits when a cached question in the same scope has cosine
+    similarity >= `threshold` with the new one (embeddings are
+    normalized, so this is a dot product). Entries expire after
+    `ttl_seconds` and the least recently used are evicted past
+    `max_entries`.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, ttl_seconds: float):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._ids = itertools.count()
+        self._entries: OrderedDict[int, CachedAnswer] = OrderedDict()
+        self._scopes: dict[tuple, set[int]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def _drop(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+
+        ids = self._scopes.get(entry.scope)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._scopes[entry.scope]
+
+    def lookup(self, scope: tuple, embedding) -> CachedAnswer | None:
+        now = time.time()
+        ids = list(self._scopes.get(scope, ()))
+
+        for entry_id in ids:
+            if now - self._entries[entry_id].created_at > self.ttl_seconds:
+                self._drop(entry_id)
+
+        ids = list(self._scopes.get(scope, ()))
+
+        if not ids:
+            self.misses += 1
+            return None
+
+        query = np.asarray(embedding, dtype=np.float32)
+        matrix = np.stack([self._entries[i].embedding for i in ids])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        entry_id = ids[best]
+        self._entries.move_to_end(entry_id)
+
+        entry = self._entries[entry_id]
+        self.hits += 1
+        self.saved_seconds += entry.cost_seconds
+        return entry
+
+    def store(
+        self,
+        scope: tuple,
+        embedding,
+        query: str,
+        answer: str,
+        followups: list[str] | None,
+        cost_seconds: float,
+    ):
+        # A failed generation must never be served to later questions
+        if not answer or not answer.strip():
+            return
+
+        entry_id = next(self._ids)
+
+        self._entries[entry_id] = CachedAnswer(
+            scope=scope,
+            embedding=np.asarray(embedding, dtype=np.float32),
+            query=query,
+            answer=answer,
+            followups=followups,
+            cost_seconds=cost_seconds,
+            created_at=time.time(),
+        )
+        self._scopes.setdefault(scope, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 1),
+        }
+
+
+answer_cache = SemanticAnswerCache(
+    threshold=settings.ANSWER_CACHE_THRESHOLD,
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,352 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from app.db import db
+from app.config import settings
+from services.document_service import get_or_create_arxiv_document
+from services.ingestion_queue import (
+    DownloadThrottled,
+    claim_for_direct_run,
+    download_pdf,
+    finish_job,
+    heartbeat,
+    release_direct_run,
+    set_job_stage,
+)
+from services.pdf_service import extract_and_index_pdf
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==================================================
+# 🚦 Per-host Rate Limit
+# ==================================================
+
+class HostRateLimiter:
+    """
+    Spaces request starts to the same host at least 1 / `per_second`
+    apart. A throttled host (429 / Retry-After) is paused for everyone.
+    """
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next_slot: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def wait(self, url: str):
+        host = urlsplit(url).hostname or ""
+
+        async with self._locks[host]:
+            # Re-check after sleeping: pause() may have pushed the slot
+            while (delay := self._next_slot.get(host, 0.0) - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+
+            self._next_slot[host] = time.monotonic() + self.interval
+
+    def pause(self, url: str, seconds: float):
+        host = urlsplit(url).hostname or ""
+        resume = time.monotonic() + seconds
+        self._next_slot[host] = max(self._next_slot.get(host, 0.0), resume)
+
+
+# ==================================================
+# 📌 Checkpoint
+# ==================================================
+
+class PreindexCheckpoint:
+    """
+    Paper ids that are finished (indexed, or failed for good), saved as
+    JSON so an interrupted run resumes where it stopped. Writes are
+    atomic (temp file + rename).
+    """
+
+    def __init__(self, path: str, flush_every: int = 10):
+        self.path = path
+        self.flush_every = flush_every
+        self.done: set[str] = set()
+        self.failed: dict[str, str] = {}
+        self._dirty = 0
+
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.done = set(data.get("done", []))
+            self.failed = data.get("failed", {})
+
+    def finished(self, paper_id: str) -> bool:
+        return paper_id in self.done or paper_id in self.failed
+
+    def mark_done(self, paper_id: str):
+        self.done.add(paper_id)
+        self.failed.pop(paper_id, None)
+        self._touch()
+
+    def mark_failed(self, paper_id: str, error: str):
+        self.failed[paper_id] = error
+        self._touch()
+
+    def _touch(self):
+        self._dirty += 1
+        if self._dirty >= self.flush_every:
+            self.save()
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+
+        with open(temp_path, "w") as f:
+            json.dump({"done": sorted(self.done), "failed": self.failed}, f)
+
+        os.replace(temp_path, self.path)
+        self._dirty = 0
+
+
+# ==================================================
+# 🏭 Pre-indexing Pipeline
+# ==================================================
+#
+#   research_papers → download workers → index queue → index workers
+#
+# Downloads (I/O, rate limited per host) and extraction + embedding
+# (process pool + embed executor) run concurrently on different
+# papers; the bounded queue between them keeps downloads from racing
+# far ahead of indexing.
+#
+
+class ArxivPreindexer:
+
+    def __init__(
+        self,
+        checkpoint_path: str,
+        download_concurrency: int,
+        index_concurrency: int,
+        rate_per_host: float,
+        max_attempts: int,
+        source: str = "arxiv",
+        limit: int = 0,
+        retry_failed: bool = False,
+    ):
+        self.checkpoint = PreindexCheckpoint(checkpoint_path)
+        self.download_concurrency = download_concurrency
+        self.index_concurrency = index_concurrency
+        self.rate_limiter = HostRateLimiter(rate_per_host)
+        self.max_attempts = max_attempts
+        self.source = source
+        self.limit = limit
+
+        if retry_failed:
+            self.checkpoint.failed.clear()
+
+        self.stats = defaultdict(float)
+        self._task: asyncio.Task | None = None
+
+    # ---------- stages ----------
+
+    async def _produce(self, downloads: asyncio.Queue):
+        query = {"source": self.source, "pdf_url": {"$ne": None}}
+        cursor = db.research_papers.find(query).sort("_id", 1)
+        queued = 0
+
+        async for paper in cursor:
+            if self.checkpoint.finished(str(paper["_id"])):
+                self.stats["skipped"] += 1
+                continue
+
+            await downloads.put(paper)
+            queued += 1
+
+            if self.limit and queued >= self.limit:
+                break
+
+    async def _download_worker(self, downloads: asyncio.Queue, indexing: asyncio.Queue):
+        while True:
+            paper = await downloads.get()
+
+            try:
+                await self._download(paper, indexing)
+            except Exception as e:
+                logger.error("Pre-index download of %s failed: %s", paper["_id"], e)
+            finally:
+                downloads.task_done()
+
+    async def _download(self, paper: dict, indexing: asyncio.Queue):
+        paper_id = str(paper["_id"])
+        document = await get_or_create_arxiv_document(paper)
+
+        if document.get("indexed"):
+            self.checkpoint.mark_done(paper_id)
+            self.stats["already_indexed"] += 1
+            return
+
+        job = await claim_for_direct_run(document["_id"], pdf_url=paper["pdf_url"])
+
+        if job is None:
+            # Being processed by the API's ingestion worker
+            self.stats["busy"] += 1
+            return
+
+        beat = asyncio.create_task(heartbeat(job["_id"]))
+
+        try:
+            await set_job_stage(job["_id"], "downloading", 5)
+            path, size_bytes, sha256 = await self._fetch(paper["pdf_url"], document["_id"])
+
+            await db.documents.update_one(
+                {"_id": document["_id"]},
+                {"$set": {"path": path, "size_bytes": size_bytes, "sha256": sha256}},
+            )
+            document.update(path=path, size_bytes=size_bytes, sha256=sha256)
+
+            self.stats["downloaded"] += 1
+            self.stats["bytes"] += size_bytes
+
+            await set_job_stage(job["_id"], "waiting_for_indexer", 10)
+            await indexing.put((paper_id, document, job, beat))
+
+        except asyncio.CancelledError:
+            await self._release(job, beat)
+            raise
+
+        except Exception as e:
+            beat.cancel()
+            await finish_job(job, "failed", f"{type(e).__name__}: {e}")
+            self.checkpoint.mark_failed(paper_id, str(e))
+            self.stats["failed"] += 1
+
+    async def _fetch(self, url: str, document_id):
+        for attempt in range(1, self.max_attempts + 1):
+            await self.rate_limiter.wait(url)
+
+            try:
+                return await download_pdf(url, document_id)
+
+            except DownloadThrottled as e:
+                self.stats["throttled"] += 1
+                self.rate_limiter.pause(url, e.retry_after)
+                if attempt == self.max_attempts:
+                    raise
+
+            except Exception:
+                if attempt == self.max_attempts:
+                    raise
+                await asyncio.sleep(settings.INGEST_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+
+    async def _index_worker(self, indexing: asyncio.Queue):
+        while True:
+            paper_id, document, job, beat = await indexing.get()
+
+            async def progress(stage: str, percent: int):
+                await set_job_stage(job["_id"], stage, percent)
+
+            try:
+                # Bulk: no eager summaries flooding the LLM queue
+                await extract_and_index_pdf(
+                    document, progress=progress, eager_summary=False
+                )
+                refreshed = await db.documents.find_one({"_id": document["_id"]})
+
+                if refreshed and refreshed.get("index_failed"):
+                    raise RuntimeError("no extractable text")
+
+                await finish_job(job, "done")
+                self.checkpoint.mark_done(paper_id)
+                self.stats["indexed"] += 1
+
+            except asyncio.CancelledError:
+                await self._release(job, beat)
+                raise
+
+            except Exception as e:
+                logger.error("Pre-indexing %s failed: %s", paper_id, e)
+                await finish_job(job, "failed", f"{type(e).__name__}: {e}")
+                self.checkpoint.mark_failed(paper_id, str(e))
+                self.stats["failed"] += 1
+
+            finally:
+                beat.cancel()
+                indexing.task_done()
+
+    async def _release(self, job: dict, beat: asyncio.Task):
+        """Stopped mid-paper: the API's ingestion worker finishes it."""
+        beat.cancel()
+
+        try:
+            await release_direct_run(job)
+            self.stats["released"] += 1
+        except Exception as e:
+            # Recovery requeues it once the heartbeat goes stale
+            logger.error("Releasing pre-index job %s failed: %s", job["_id"], e)
+
+    # ---------- driver ----------
+
+    async def run(self) -> dict:
+        start = time.perf_counter()
+
+        downloads = asyncio.Queue(maxsize=self.download_concurrency * 2)
+        indexing = asyncio.Queue(maxsize=self.index_concurrency * 2)
+
+        workers = [
+            asyncio.create_task(self._download_worker(downloads, indexing))
+            for _ in range(self.download_concurrency)
+        ] + [
+            asyncio.create_task(self._index_worker(indexing))
+            for _ in range(self.index_concurrency)
+        ]
+
+        try:
+            await self._produce(downloads)
+            await downloads.join()
+            await indexing.join()
+
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+            # Downloaded but never picked up by an index worker
+            while not indexing.empty():
+                _, _, job, beat = indexing.get_nowait()
+                await self._release(job, beat)
+
+            self.checkpoint.save()
+
+        self.stats["seconds"] = time.perf_counter() - start
+        return dict(self.stats)
+
+    # ---------- background (API) ----------
+
+    def start(self):
+        self._task = asyncio.create_task(self._run_logged())
+
+    async def _run_logged(self):
+        try:
+            stats = await self.run()
+            logger.info("arXiv pre-indexing finished: %s", stats)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("arXiv pre-indexing stopped: %s", e)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+def build_preindexer(**overrides) -> ArxivPreindexer:
+    options = {
+        "checkpoint_path": settings.ARXIV_PREINDEX_CHECKPOINT,
+        "download_concurrency": settings.ARXIV_DOWNLOAD_CONCURRENCY,
+        "index_concurrency": settings.ARXIV_INDEX_CONCURRENCY,
+        "rate_per_host": settings.ARXIV_RATE_PER_HOST,
+        "max_attempts": settings.ARXIV_MAX_ATTEMPTS,
+    }
+    options.update(overrides)
+
+    return ArxivPreindexer(**options)
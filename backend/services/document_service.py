@@ -1,5 +1,13 @@
+import hashlib
+import os
+import uuid
 from datetime import datetime
+
+import aiofiles
+import aiofiles.os
 from bson import ObjectId
+from fastapi import UploadFile
+
 from app.db import db
 
 
@@ -56,6 +64,8 @@ async def get_or_create_arxiv_document(paper: dict) -> dict:
 async def create_uploaded_document(
     filename: str,
     user_id: ObjectId,
+    sha256: str | None = None,
+    size_bytes: int | None = None,
 ) -> dict:
 
     doc = {
@@ -64,6 +74,8 @@ async def create_uploaded_document(
         "title": filename,
         "external_id": None,
         "path": None,
+        "sha256": sha256,
+        "size_bytes": size_bytes,
         "owner": user_id,
         "indexed": False,
         "processing": False,
@@ -73,4 +85,65 @@ async def create_uploaded_document(
 
     result = await db.documents.insert_one(doc)
     doc["_id"] = result.inserted_id
-    return doc
\ No newline at end of file
+    return doc
+
+# ==================================================
+# 💾 Upload storage (hashed, size-capped)
+# ==================================================
+
+class UploadTooLarge(ValueError):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+async def save_upload(
+    file: UploadFile,
+    directory: str,
+    max_bytes: int,
+    chunk_bytes: int,
+) -> tuple[str, int, str]:
+    """
+    Copies the upload to a temporary file in `directory`, one chunk at
+    a time, hashing as it goes, with async reads and writes.
+
+    Starlette has already received the whole multipart body by now
+    (spooled to a temp file past 1 MB), so `max_bytes` only stops the
+    copy. The request itself is bounded by the Content-Length check in
+    the route and the reverse proxy's body limit.
+
+    Returns (temp_path, size_bytes, sha256). Raises UploadTooLarge once
+    `max_bytes` is passed; the partial file is removed.
+    """
+
+    temp_path = os.path.join(directory, f".upload-{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while chunk := await file.read(chunk_bytes):
+                size += len(chunk)
+
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+
+                digest.update(chunk)
+                await out.write(chunk)
+
+    except BaseException:
+        await discard_upload(temp_path)
+        raise
+
+    return temp_path, size, digest.hexdigest()
+
+
+async def store_upload(temp_path: str, path: str):
+    await aiofiles.os.replace(temp_path, path)
+
+
+async def discard_upload(temp_path: str):
+    try:
+        await aiofiles.os.remove(temp_path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,479 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+
+import aiofiles
+import aiohttp
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.db import db
+from app.config import settings
+from services.pdf_service import extract_and_index_pdf
+
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = "pdf_uploads"
+
+HEARTBEAT_SECONDS = 30
+# A running job without a heartbeat for this long belonged to a dead worker
+STALE_AFTER_SECONDS = 4 * HEARTBEAT_SECONDS
+RECOVERY_INTERVAL_SECONDS = 60
+
+
+# ==================================================
+# 📥 Enqueue
+# ==================================================
+
+async def enqueue_ingestion(
+    document_id,
+    pdf_url: str | None = None,
+    reindex: bool = False,
+) -> bool:
+    """
+    Marks the document as processing and queues one ingestion job.
+    `reindex` re-processes an indexed document, embedding only the
+    chunks that changed; it is marked `reindexing` instead and keeps
+    serving chat from its current chunks. Returns False when the
+    document is already being processed.
+    """
+
+    if not await _lock_document(document_id, reindex):
+        return False
+
+    await _queue_job(document_id, pdf_url, reindex)
+    return True
+
+
+async def claim_for_direct_run(document_id, pdf_url: str | None = None) -> dict | None:
+    """
+    Locks the document like enqueue_ingestion, but records the job as
+    already running for a caller that processes it itself (bulk
+    pre-indexing). The caller must keep it alive with `heartbeat` and
+    close it with `finish_job`; if it dies, recovery requeues the
+    document here. Returns None when the document is already taken.
+    """
+
+    if not await _lock_document(document_id):
+        return None
+
+    now = datetime.utcnow()
+
+    return await db.ingestion_jobs.find_one_and_update(
+        {"document_id": document_id},
+        {
+            "$set": {
+                "status": "running",
+                "stage": "claimed",
+                "progress": 0,
+                "attempts": 1,
+                "pdf_url": pdf_url,
+                "reindex": False,
+                "error": None,
+                "started_at": now,
+                "heartbeat_at": now,
+                "next_run_at": now,
+                "updated_at": now,
+            },
+            "$setOnInsert": {"created_at": now},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def release_direct_run(job: dict):
+    """
+    Hands a job taken with claim_for_direct_run back to the ingestion
+    worker when its caller stops before finishing it. The document
+    stays locked for the queued job.
+    """
+    await _queue_job(job["document_id"], job.get("pdf_url"))
+
+
+async def _lock_document(document_id, reindex: bool = False) -> bool:
+    flag = "reindexing" if reindex else "processing"
+
+    locked = await db.documents.find_one_and_update(
+        {
+            "_id": document_id,
+            "processing": {"$ne": True},
+            "reindexing": {"$ne": True},
+        },
+        {"$set": {flag: True, "index_failed": False}},
+    )
+
+    return locked is not None
+
+
+async def _queue_job(document_id, pdf_url: str | None, reindex: bool = False):
+    now = datetime.utcnow()
+
+    await db.ingestion_jobs.update_one(
+        {"document_id": document_id},
+        {
+            "$set": {
+                "status": "queued",
+                "stage": "queued",
+                "progress": 0,
+                "attempts": 0,
+                "pdf_url": pdf_url,
+                "reindex": reindex,
+                "error": None,
+                "next_run_at": now,
+                "updated_at": now,
+            },
+            "$setOnInsert": {"created_at": now},
+        },
+        upsert=True,
+    )
+
+
+async def get_ingestion_job(document_id) -> dict | None:
+    return await db.ingestion_jobs.find_one({"document_id": document_id})
+
+
+async def set_job_stage(job_id, stage: str, percent: int):
+    await db.ingestion_jobs.update_one(
+        {"_id": job_id},
+        {
+            "$set": {
+                "stage": stage,
+                "progress": percent,
+                "updated_at": datetime.utcnow(),
+            }
+        },
+    )
+
+
+# ==================================================
+# ⬇️ Download (arXiv)
+# ==================================================
+
+class DownloadThrottled(RuntimeError):
+    """The host answered 429 / 503; retry after `retry_after` seconds."""
+
+    def __init__(self, url: str, status: int, retry_after: float):
+        super().__init__(f"HTTP {status} from {url}, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+_download_session: aiohttp.ClientSession | None = None
+
+
+def get_download_session() -> aiohttp.ClientSession:
+    """
+    One pooled session for every PDF download (keep-alive, DNS cache,
+    bounded connections), instead of a new session per paper.
+    """
+    global _download_session
+
+    if _download_session is None or _download_session.closed:
+        _download_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.DOWNLOAD_MAX_CONNECTIONS,
+                limit_per_host=settings.DOWNLOAD_MAX_CONNECTIONS_PER_HOST,
+            ),
+            timeout=aiohttp.ClientTimeout(total=settings.DOWNLOAD_TIMEOUT_SECONDS),
+        )
+
+    return _download_session
+
+
+async def close_download_session():
+    global _download_session
+
+    if _download_session is not None:
+        await _download_session.close()
+        _download_session = None
+
+
+async def download_pdf(url: str, document_id) -> tuple[str, int, str]:
+    """
+    Streams the PDF to disk, hashing as it arrives.
+    Returns (path, size_bytes, sha256).
+    """
+    path = os.path.join(UPLOAD_DIR, f"{document_id}.pdf")
+    digest = hashlib.sha256()
+    size = 0
+
+    async with get_download_session().get(url) as resp:
+        if resp.status in (429, 503):
+            retry_after = resp.headers.get("Retry-After", "")
+            raise DownloadThrottled(
+                url,
+                resp.status,
+                float(retry_after) if retry_after.isdigit() else 30.0,
+            )
+
+        if resp.status != 200:
+            raise RuntimeError(f"PDF download failed with HTTP {resp.status}")
+
+        async with aiofiles.open(path, "wb") as out:
+            async for chunk in resp.content.iter_chunked(settings.UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+
+                if size > settings.UPLOAD_MAX_BYTES:
+                    raise RuntimeError("PDF exceeds UPLOAD_MAX_BYTES")
+
+                digest.update(chunk)
+                await out.write(chunk)
+
+    return path, size, digest.hexdigest()
+
+
+# ==================================================
+# ⚙️ Job Execution
+# ==================================================
+
+async def _claim_next_job() -> dict | None:
+    now = datetime.utcnow()
+
+    return await db.ingestion_jobs.find_one_and_update(
+        {"status": "queued", "next_run_at": {"$lte": now}},
+        {
+            "$set": {
+                "status": "running",
+                "started_at": now,
+                "heartbeat_at": now,
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("next_run_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def finish_job(job: dict, status: str, error: str | None = None):
+    now = datetime.utcnow()
+
+    await db.ingestion_jobs.update_one(
+        {"_id": job["_id"]},
+        {
+            "$set": {
+                "status": status,
+                "stage": status,
+                "progress": 100 if status == "done" else job.get("progress", 0),
+                "error": error,
+                "finished_at": now,
+                "updated_at": now,
+            }
+        },
+    )
+
+    update = {"processing": False, "reindexing": False}
+    if status == "failed":
+        update["index_failed"] = True
+
+    await db.documents.update_one({"_id": job["document_id"]}, {"$set": update})
+
+
+async def _retry_or_fail(job: dict, error: str, min_delay: float = 0.0):
+    attempts = job.get("attempts", 1)
+
+    if attempts >= settings.INGEST_MAX_ATTEMPTS:
+        logger.error("Ingestion of %s failed for good: %s", job["document_id"], error)
+        await finish_job(job, "failed", error)
+        return
+
+    delay = max(min_delay, settings.INGEST_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    logger.warning(
+        "Ingestion of %s failed (attempt %s), retrying in %.0fs: %s",
+        job["document_id"], attempts, delay, error,
+    )
+
+    await db.ingestion_jobs.update_one(
+        {"_id": job["_id"]},
+        {
+            "$set": {
+                "status": "queued",
+                "stage": "retry_wait",
+                "error": error,
+                "next_run_at": datetime.utcnow() + timedelta(seconds=delay),
+                "updated_at": datetime.utcnow(),
+            }
+        },
+    )
+
+
+async def heartbeat(job_id):
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        await db.ingestion_jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"heartbeat_at": datetime.utcnow()}},
+        )
+
+
+async def run_job(job: dict):
+    document = await db.documents.find_one({"_id": job["document_id"]})
+
+    if not document:
+        await finish_job(job, "failed", "document no longer exists")
+        return
+
+    async def progress(stage: str, percent: int):
+        await set_job_stage(job["_id"], stage, percent)
+
+    beat = asyncio.create_task(heartbeat(job["_id"]))
+
+    try:
+        if not document.get("path"):
+            if not job.get("pdf_url"):
+                await finish_job(job, "failed", "no PDF path or URL")
+                return
+
+            await progress("downloading", 5)
+            path, size_bytes, sha256 = await download_pdf(
+                job["pdf_url"], document["_id"]
+            )
+            document["path"] = path
+            document["sha256"] = sha256
+
+            await db.documents.update_one(
+                {"_id": document["_id"]},
+                {
+                    "$set": {
+                        "path": path,
+                        "size_bytes": size_bytes,
+                        "sha256": sha256,
+                    }
+                },
+            )
+
+        await extract_and_index_pdf(
+            document,
+            progress=progress,
+            reindex=job.get("reindex", False),
+        )
+
+    except Exception as e:
+        await _retry_or_fail(
+            job,
+            f"{type(e).__name__}: {e}",
+            min_delay=getattr(e, "retry_after", 0.0),
+        )
+        return
+
+    finally:
+        beat.cancel()
+
+    refreshed = await db.documents.find_one({"_id": document["_id"]})
+
+    if refreshed and refreshed.get("index_failed"):
+        # Nothing extractable: retrying will not help
+        await finish_job(job, "failed", "no extractable text")
+    else:
+        await finish_job(job, "done")
+
+
+# ==================================================
+# 🩹 Crash Recovery
+# ==================================================
+
+async def recover_stuck_jobs():
+    """
+    Requeues work abandoned by a crashed or restarted worker:
+    - running jobs whose heartbeat stopped
+    - documents left with processing=True (or reindexing=True)
+      and no live job
+    """
+
+    stale = datetime.utcnow() - timedelta(seconds=STALE_AFTER_SECONDS)
+
+    async for job in db.ingestion_jobs.find(
+        {"status": "running", "heartbeat_at": {"$lt": stale}}
+    ):
+        await _retry_or_fail(job, "worker stopped while processing")
+
+    async for document in db.documents.find(
+        {"$or": [{"processing": True}, {"reindexing": True}]}
+    ):
+        job = await db.ingestion_jobs.find_one({
+            "document_id": document["_id"],
+            "status": {"$in": ["queued", "running"]},
+        })
+
+        if job:
+            continue
+
+        pdf_url = None
+
+        if not document.get("path") and document.get("external_id"):
+            paper = await db.research_papers.find_one(
+                {"_id": ObjectId(document["external_id"])}
+            )
+            pdf_url = paper.get("pdf_url") if paper else None
+
+        logger.info("Requeueing stuck document %s", document["_id"])
+        await _queue_job(
+            document["_id"], pdf_url, reindex=bool(document.get("indexed"))
+        )
+
+
+# ==================================================
+# 👷 Worker
+# ==================================================
+
+class IngestionWorker:
+    """
+    Polls `ingestion_jobs` and runs up to `concurrency` jobs at once.
+    CPU-heavy stages go to the ingestion process pool; embedding runs
+    on the embed executor.
+    """
+
+    def __init__(self, concurrency: int, poll_seconds: float):
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        await recover_stuck_jobs()
+
+        self._tasks = [
+            asyncio.create_task(self._loop())
+            for _ in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._recovery_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self):
+        while True:
+            try:
+                job = await _claim_next_job()
+
+                if job is None:
+                    await asyncio.sleep(self.poll_seconds)
+                    continue
+
+                await run_job(job)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Ingestion worker error: %s", e)
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _recovery_loop(self):
+        while True:
+            await asyncio.sleep(RECOVERY_INTERVAL_SECONDS)
+            try:
+                await recover_stuck_jobs()
+            except Exception as e:
+                logger.error("Ingestion recovery failed: %s", e)
+
+
+ingestion_worker = IngestionWorker(
+    concurrency=settings.INGEST_CONCURRENCY,
+    poll_seconds=settings.INGEST_POLL_SECONDS,
+)
@@ -0,0 +1,266 @@
+import re
+from dataclasses import dataclass
+
+
+# ==================================================
+# 📄 Page-level Text Extraction
+# ==================================================
+#
+# Functions here only touch the PDF file, so they are safe to run in
+# ingestion worker processes (spawn): no DB, no models, no settings.
+#
+
+
+@dataclass
+class PageText:
+    number: int             # 0-based page index
+    text: str
+    error: str | None = None
+    backend: str | None = None
+
+
+# ==================================================
+# 🔌 Extraction Backends
+# ==================================================
+#
+# Each backend opens a PDF and exposes len() + page_text(i) + close().
+# Libraries are imported on open so a missing optional one only
+# disables that backend.
+#
+
+class PypdfDocument:
+    """pure Python; the original extractor"""
+
+    def __init__(self, path: str):
+        from pypdf import PdfReader
+
+        self._reader = PdfReader(path)
+
+    def __len__(self):
+        return len(self._reader.pages)
+
+    def page_text(self, number: int) -> str:
+        return self._reader.pages[number].extract_text() or ""
+
+    def close(self):
+        pass
+
+
+class PdfiumDocument:
+    """PDFium bindings; several times faster than pypdf"""
+
+    def __init__(self, path: str):
+        import pypdfium2
+
+        self._pdf = pypdfium2.PdfDocument(path)
+
+    def __len__(self):
+        return len(self._pdf)
+
+    def page_text(self, number: int) -> str:
+        page = self._pdf[number]
+        textpage = page.get_textpage()
+
+        try:
+            return textpage.get_text_range().replace("\r\n", "\n")
+        finally:
+            textpage.close()
+            page.close()
+
+    def close(self):
+        self._pdf.close()
+
+
+class PdfplumberDocument:
+    """pdfminer layout analysis; slow, but best on multi-column layouts"""
+
+    def __init__(self, path: str):
+        import pdfplumber
+
+        self._pdf = pdfplumber.open(path)
+
+    def __len__(self):
+        return len(self._pdf.pages)
+
+    def page_text(self, number: int) -> str:
+        page = self._pdf.pages[number]
+
+        try:
+            return page.extract_text() or ""
+        finally:
+            # Pages cache their layout objects until closed
+            page.close()
+
+    def close(self):
+        self._pdf.close()
+
+
+EXTRACTORS = {
+    "pypdfium2": PdfiumDocument,
+    "pypdf": PypdfDocument,
+    "pdfplumber": PdfplumberDocument,
+}
+
+# Fastest first; "auto" walks this order
+FALLBACK_ORDER = ["pypdfium2", "pypdf", "pdfplumber"]
+
+
+def extractor_chain(name: str, fallback: bool = True) -> list[str]:
+    """
+    Backends to try, in order, for PDF_EXTRACTOR=`name`.
+    """
+    if name == "auto":
+        return list(FALLBACK_ORDER)
+
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor: {name}")
+
+    if not fallback:
+        return [name]
+
+    return [name] + [b for b in FALLBACK_ORDER if b != name]
+
+
+# ==================================================
+# 🧪 Text Quality
+# ==================================================
+
+# Unmapped glyphs come out as "(cid:123)" (pdfminer) or U+FFFD
+_CID = re.compile(r"\(cid:\d+\)")
+_READABLE = re.compile(r"[\w\s.,;:!?'\"()\[\]{}%/+\-=<>*&$#@^~|`]")
+
+
+def text_quality(text: str) -> float:
+    """
+    Share of readable characters, 0.0 - 1.0. Broken font encodings
+    produce CID markers, replacement characters or symbol soup.
+    """
+    if not text:
+        return 0.0
+
+    cleaned = _CID.sub("�", text)
+    readable = len(_READABLE.findall(cleaned))
+
+    return readable / len(cleaned)
+
+
+def is_usable_text(text: str, min_quality: float = 0.85) -> bool:
+    stripped = text.strip()
+
+    if not stripped:
+        return False
+
+    # Too short to judge (page numbers, figure-only pages)
+    if len(stripped) < 40:
+        return True
+
+    return text_quality(stripped) >= min_quality
+
+
+# ==================================================
+# 📑 Page Ranges
+# ==================================================
+
+def count_pages(path: str, backends: list[str] | None = None) -> int:
+    last_error = None
+
+    for name in backends or FALLBACK_ORDER:
+        try:
+            document = EXTRACTORS[name](path)
+        except Exception as e:
+            last_error = e
+            continue
+
+        try:
+            return len(document)
+        finally:
+            document.close()
+
+    raise last_error
+
+
+def page_ranges(page_count: int, pages_per_task: int) -> list[tuple[int, int]]:
+    """
+    Splits [0, page_count) into contiguous (start, stop) ranges.
+    """
+    step = max(1, pages_per_task)
+
+    return [
+        (start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+
+
+def extract_page_range(
+    path: str,
+    start: int,
+    stop: int,
+    backends: list[str] | None = None,
+) -> list[PageText]:
+    """
+    Extracts pages [start, stop) with the first backend in `backends`.
+    A page that raises, comes back empty or looks garbled is retried
+    with the next backend; the best text found is kept. A page that
+    every backend fails on is reported with its error instead of
+    failing the whole range.
+    """
+    backends = backends or FALLBACK_ORDER[:1]
+    opened: dict[str, object] = {}
+
+    def document(name: str):
+        if name not in opened:
+            try:
+                opened[name] = EXTRACTORS[name](path)
+            except Exception:
+                # Don't retry a backend that cannot open the file
+                opened[name] = None
+                raise
+
+        if opened[name] is None:
+            raise RuntimeError(f"{name} could not open the PDF")
+
+        return opened[name]
+
+    pages = []
+
+    try:
+        page_count = None
+
+        for name in backends:
+            try:
+                page_count = len(document(name))
+                break
+            except Exception:
+                continue
+
+        if page_count is None:
+            # No backend could open the file: let the caller retry
+            raise RuntimeError(f"no PDF backend could open {path}")
+
+        for number in range(start, min(stop, page_count)):
+            best = None
+            errors = []
+
+            for name in backends:
+                try:
+                    text = document(name).page_text(number)
+                except Exception as e:
+                    errors.append(f"{name}: {type(e).__name__}: {e}")
+                    continue
+
+                if is_usable_text(text):
+                    best = PageText(number, text, None, name)
+                    break
+
+                # Keep the longest unusable text in case nothing is better
+                if best is None or len(text.strip()) > len(best.text.strip()):
+                    best = PageText(number, text, None, name)
+
+            pages.append(best or PageText(number, "", "; ".join(errors)))
+
+    finally:
+        for opened_document in opened.values():
+            if opened_document is not None:
+                opened_document.close()
+
+    return pages
@@ -1,10 +1,35 @@
+import asyncio
+import hashlib
+import json
+import logging
 import re
+from collections import Counter, deque
+from itertools import islice
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
-from pypdf import PdfReader
 
-from app.chroma_store import add_chunks_to_chroma, GLOBAL_OWNER
+from app.chroma_store import (
+    add_chunks_to_chroma,
+    copy_document_vectors,
+    delete_chunks,
+    get_chunk_ids,
+    GLOBAL_OWNER,
+    get_embedding_tokenizer,
+)
+from app.config import settings
 from app.db import db
+from app.executors import embedding_executor, ingest_process_executor
+from services.pdf_extractors import (
+    PageText,
+    extractor_chain,
+    count_pages,
+    page_ranges,
+    extract_page_range,
+)
+from services.text_cache import text_cache, extractor_version
+
+
+logger = logging.getLogger(__name__)
 
 
 # ==================================================
@@ -19,154 +44,465 @@ SECTION_REGEX = re.compile(
 )
 
 
+SECTION_ALIASES = {
+    "methods": "methodology",
+    "result": "results",
+    "system design": "methodology",
+    "implementation": "methodology",
+    "future work": "conclusion",
+}
+
+# Identifies the detection rules; cached headings are reused only
+# when it matches
+SECTION_FINGERPRINT = hashlib.sha256(
+    json.dumps([SECTION_REGEX.pattern, SECTION_ALIASES], sort_keys=True).encode()
+).hexdigest()[:16]
+
+
 def normalize_section(name: str) -> str:
     name = name.lower().strip()
 
-    mapping = {
-        "methods": "methodology",
-        "result": "results",
-        "system design": "methodology",
-        "implementation": "methodology",
-        "future work": "conclusion",
-    }
+    return SECTION_ALIASES.get(name, name)
+
+
+def detect_headings(text: str) -> list[list]:
+    """
+    [line index, section] for every heading line of one page.
+    """
+    headings = []
 
-    return mapping.get(name, name)
+    for i, line in enumerate(text.split("\n")):
+        match = SECTION_REGEX.search(line.strip())
+
+        if match:
+            headings.append([i, normalize_section(match.group(1))])
+
+    return headings
+
+
+# ==================================================
+# 🧹 Chunk Filters (retrieval side)
+# ==================================================
+
+def is_junk_chunk(text: str) -> bool:
+    text = text.strip()
+    if len(text) < 30:
+        return True
+    if re.fullmatch(r"\[\d+\]", text):
+        return True
+    return False
+
+
+def deduplicate_chunks(chunks, max_chunks):
+    seen = set()
+    unique = []
+
+    for c in chunks:
+        key = c.page_content.strip()[:200]
+        if key not in seen:
+            seen.add(key)
+            unique.append(c)
+        if len(unique) >= max_chunks:
+            break
+
+    return unique
 
 
 # ==================================================
-# 📄 Extract + Index PDF (Structured + Robust)
+# 📄 Extract + Index PDF (Streaming, Bounded Memory)
 # ==================================================
+#
+#   pages → section-tagged lines → chunks → batches → Chroma
+#
+# Every stage is a generator, so only a few page ranges, one chunking
+# window and one embed/write batch are alive at a time, whatever the
+# size of the PDF.
+#
+
+CHUNK_SIZE = 700
+CHUNK_OVERLAP = 150
+MIN_CHUNK_CHARS = 60
 
-async def extract_and_index_pdf(document: dict):
+
+def iter_extracted_pages(ranges, fetch_range, lookahead: int):
     """
-    Extracts text from PDF, detects sections,
-    chunks intelligently, and stores in Chroma.
+    Yields every PageText in page order.
+
+    `fetch_range(start, stop)` returns a future for one page range;
+    at most `lookahead` ranges are in flight. A range that fails as a
+    whole is reported as failed pages rather than failing the document.
     """
 
-    # 🚫 Prevent re-indexing
-    if document.get("indexed"):
-        return
+    ranges = iter(ranges)
+    pending = deque()
 
-    reader = PdfReader(document["path"])
-    full_text = ""
+    def submit_next():
+        page_range = next(ranges, None)
+        if page_range is not None:
+            pending.append((page_range, fetch_range(*page_range)))
 
-    # --------------------------------------------------
-    # 📄 Extract Text
-    # --------------------------------------------------
+    for _ in range(max(1, lookahead)):
+        submit_next()
 
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            full_text += page_text + "\n"
+    while pending:
+        (start, stop), future = pending.popleft()
+        submit_next()
 
-    if not full_text.strip():
-        await db.documents.update_one(
-            {"_id": document["_id"]},
-            {"$set": {"index_failed": True}},
+        try:
+            pages = future.result()
+        except Exception as e:
+            # Whole range lost (e.g. worker crashed): keep the others
+            error = f"{type(e).__name__}: {e}"
+            pages = [PageText(n, "", error) for n in range(start, stop)]
+
+        yield from pages
+
+
+def with_headings(pages):
+    for page in pages:
+        yield page, detect_headings(page.text) if page.text else []
+
+
+def cache_pages(items, writer):
+    """
+    Passes (page, headings) through while saving them. The cache entry
+    is published only once every page has gone by without an error;
+    failed pages may extract fine on the next attempt.
+    """
+
+    completed = True
+
+    try:
+        for page, headings in items:
+            completed = completed and not page.error
+            writer.write(page, headings)
+            yield page, headings
+
+    except BaseException:
+        completed = False
+        raise
+
+    finally:
+        if completed:
+            writer.commit()
+        else:
+            writer.discard()
+
+
+def track_pages(items, stats: dict):
+    """
+    Counts failed / empty pages in `stats` and yields only the pages
+    that have text.
+    """
+
+    for page, headings in items:
+        stats["pages_done"] += 1
+
+        if page.error:
+            stats["pages_failed"].append(page.number)
+        elif not page.text.strip():
+            stats["pages_empty"] += 1
+
+        if page.backend:
+            stats["pages_by_extractor"][page.backend] += 1
+
+        if page.text:
+            yield page, headings
+
+
+def iter_section_lines(items):
+    """
+    Yields (section, line, starts_section) for every line.
+    Text before the first heading belongs to "body".
+    """
+
+    section = "body"
+
+    for page, headings in items:
+        if headings is None:
+            headings = detect_headings(page.text)
+
+        starts = dict(headings)
+
+        for i, line in enumerate(page.text.split("\n")):
+            if i in starts:
+                section = starts[i]
+
+            yield section, line, i in starts
+
+
+def get_chunk_splitter(chunker: str | None = None):
+    """
+    "tokens": packs chunks up to CHUNK_TOKENS counted by the embedding
+    model's own tokenizer, so no chunk is silently truncated by the
+    embedder or the reranker. "chars": the original character splitter.
+    """
+
+    chunker = chunker or settings.CHUNKER
+    separators = ["\n\n", "\n", " ", ""]
+
+    if chunker == "tokens":
+        tokenizer = get_embedding_tokenizer()
+
+        return RecursiveCharacterTextSplitter(
+            chunk_size=settings.CHUNK_TOKENS,
+            chunk_overlap=settings.CHUNK_OVERLAP_TOKENS,
+            length_function=lambda text: len(tokenizer.tokenize(text)),
+            separators=separators,
         )
-        return
 
-    # --------------------------------------------------
-    # 🧠 Structured Section Parsing
-    # --------------------------------------------------
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        separators=separators,
+    )
 
-    lines = full_text.split("\n")
-    sections = []
 
-    current_section = "unknown"
-    buffer = []
+def prompt_excerpt(chunk, max_chars: int) -> str:
+    """
+    Chunk text for an LLM prompt. Token-sized chunks already fit the
+    budget; character chunks keep the historical cut.
+    """
+    if settings.CHUNKER == "tokens":
+        return chunk.page_content
 
-    for line in lines:
-        stripped = line.strip()
-        match = SECTION_REGEX.search(stripped)
+    return chunk.page_content[:max_chars]
 
-        if match:
-            # Save previous section
-            if buffer:
-                sections.append((current_section, "\n".join(buffer)))
-                buffer = []
 
-            detected = normalize_section(match.group(1))
-            current_section = detected
+def iter_chunks(section_lines, window_chars: int, splitter=None):
+    """
+    Yields (section, chunk_text). Chunks never cross a section heading.
+
+    Lines are buffered per section up to `window_chars`; a full window
+    is split, every chunk but the last is emitted, and the last one is
+    carried into the next window so chunk boundaries and overlap match
+    splitting the whole section at once.
+    """
+
+    splitter = splitter or get_chunk_splitter()
+
+    def split(section, buffer, final):
+        # 🚫 Remove references (noise reduction)
+        if section == "references":
+            return ""
+
+        pieces = splitter.split_text("\n".join(buffer))
+        carry = ""
+
+        if not final and len(pieces) > 1:
+            carry = pieces.pop()
+
+        for piece in pieces:
+            cleaned = piece.strip()
+
+            # Skip tiny fragments
+            if len(cleaned) >= MIN_CHUNK_CHARS:
+                yield section, cleaned
+
+        return carry
+
+    current = "body"
+    buffer, size = [], 0
 
+    for section, line, starts_section in section_lines:
+        if starts_section and buffer:
+            yield from split(current, buffer, final=True)
+            buffer, size = [], 0
+
+        current = section
         buffer.append(line)
+        size += len(line) + 1
+
+        if size >= window_chars:
+            carry = yield from split(current, buffer, final=False)
+            buffer = [carry] if carry else []
+            size = len(carry)
 
     if buffer:
-        sections.append((current_section, "\n".join(buffer)))
+        yield from split(current, buffer, final=True)
 
-    # --------------------------------------------------
-    # ⚠️ Fallback if no sections detected
-    # --------------------------------------------------
 
-    detected_sections = {sec for sec, _ in sections}
+def batched(items, size: int):
+    items = iter(items)
 
-    if detected_sections == {"unknown"}:
-        sections = [("body", full_text)]
+    while batch := list(islice(items, size)):
+        yield batch
 
-    # --------------------------------------------------
-    # 🚫 Remove references (noise reduction)
-    # --------------------------------------------------
 
-    sections = [
-        (sec, text)
-        for sec, text in sections
-        if sec.lower() != "references"
-    ]
+def index_pages(
+    items,
+    page_count: int,
+    document_id: str,
+    owner_value: str,
+    existing_ids: set[str] | None = None,
+    write=add_chunks_to_chroma,
+    on_progress=None,
+) -> tuple[set[str], dict]:
+    """
+    Section-tags, chunks and writes a stream of (page, headings).
+    Chunks go to `write(batch, document_id, skip_ids)` in
+    INGEST_BATCH_SIZE batches, which embeds only chunks whose
+    content-hash id is not already stored.
 
-    # --------------------------------------------------
-    # ✂️ Chunking per Section
-    # --------------------------------------------------
+    Returns (ids of all chunks produced, stats). Raises only when no
+    page could be read.
+    """
+
+    stats = {
+        "page_count": page_count,
+        "pages_done": 0,
+        "pages_failed": [],
+        "pages_empty": 0,
+        "pages_by_extractor": Counter(),
+    }
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=700,
-        chunk_overlap=150,
-        separators=["\n\n", "\n", " ", ""],
+    chunks = iter_chunks(
+        iter_section_lines(track_pages(items, stats)),
+        settings.INGEST_CHUNK_WINDOW_CHARS,
+    )
+    documents = (
+        Document(
+            page_content=text,
+            metadata={
+                "metadata_id": document_id,
+                "user_id": owner_value,
+                "section": section,
+            },
+        )
+        for section, text in chunks
     )
 
-    chunks = []
+    known = set(existing_ids or ())
+    produced: set[str] = set()
+    added = 0
 
-    for section_name, section_text in sections:
+    for batch in batched(documents, settings.INGEST_BATCH_SIZE):
+        ids = write(batch, document_id, known)
 
-        if section_name == "unknown":
-            section_name = "body"
+        added += len(set(ids) - known)
+        known.update(ids)
+        produced.update(ids)
 
-        raw_chunks = splitter.split_text(section_text)
+        if on_progress is not None:
+            on_progress(stats["pages_done"], page_count)
 
-        for raw in raw_chunks:
-            cleaned = raw.strip()
+    failed = stats["pages_failed"]
 
-            # Skip tiny fragments
-            if len(cleaned) < 60:
-                continue
-
-            # ✅ FIXED OWNER HANDLING
-            owner_value = (
-                str(document["owner"])
-                if document.get("owner")
-                else GLOBAL_OWNER
-            )
+    if page_count and len(failed) == page_count:
+        raise RuntimeError(f"all {page_count} pages failed to extract")
+
+    if failed:
+        logger.warning("%s: %d/%d pages failed to extract", document_id, len(failed), page_count)
+
+    del stats["pages_done"]
+    stats["pages_by_extractor"] = dict(stats["pages_by_extractor"])
+    stats["chunk_count"] = len(produced)
+    stats["chunks_added"] = added
+
+    return produced, stats
+
+
+def index_pdf_stream(
+    path: str,
+    document_id: str,
+    owner_value: str,
+    backends: list[str],
+    fetch_range,
+    existing_ids: set[str] | None = None,
+    write=add_chunks_to_chroma,
+    on_progress=None,
+    cache=text_cache,
+) -> tuple[set[str], dict]:
+    """
+    Runs the whole pipeline for one PDF (blocking; call from a worker
+    thread).
 
-            chunks.append(
-                Document(
-                    page_content=cleaned,
-                    metadata={
-                        "metadata_id": str(document["_id"]),
-                        "user_id": owner_value,
-                        "section": section_name,
-                    },
-                )
+    Pages come from the extracted-text cache when this document was
+    already extracted with the same backends; otherwise page ranges are
+    extracted through `fetch_range` (the ingestion process pool) and
+    saved to the cache on the way through.
+    """
+
+    version = extractor_version(backends)
+
+    if cache is not None and cache.has(document_id, version):
+        page_count = cache.read_header(document_id, version)["page_count"]
+        items = cache.iter_pages(document_id, version, SECTION_FINGERPRINT)
+        source = "cache"
+
+    else:
+        page_count = count_pages(path, backends)
+        items = with_headings(
+            iter_extracted_pages(
+                page_ranges(page_count, settings.INGEST_PAGES_PER_TASK),
+                fetch_range,
+                settings.INGEST_PROCESS_WORKERS,
             )
+        )
+        source = "pdf"
+
+        writer = cache.writer(
+            document_id, version, page_count, SECTION_FINGERPRINT
+        ) if cache is not None else None
+
+        if writer is not None:
+            items = cache_pages(items, writer)
+
+    produced, stats = index_pages(
+        items,
+        page_count,
+        document_id,
+        owner_value,
+        existing_ids=existing_ids,
+        write=write,
+        on_progress=on_progress,
+    )
 
-    # --------------------------------------------------
-    # 🧠 Add to Vector Store
-    # --------------------------------------------------
+    stats["text_source"] = source
+    return produced, stats
 
-    if chunks:
-        add_chunks_to_chroma(chunks, str(document["_id"]))
 
-    # --------------------------------------------------
-    # ✅ Mark Indexed
-    # --------------------------------------------------
+# ==================================================
+# ♻️ Content-hash Dedup (reuse an indexed copy)
+# ==================================================
+
+# Page stats carried over from the source document
+REUSED_FIELDS = ("page_count", "pages_failed", "pages_empty", "pages_by_extractor")
+
+
+async def find_indexed_duplicate(document: dict) -> dict | None:
+    """
+    Another document with the same PDF bytes that is already indexed
+    (any owner, upload or arXiv).
+    """
+    if not document.get("sha256"):
+        return None
+
+    return await db.documents.find_one({
+        "sha256": document["sha256"],
+        "_id": {"$ne": document["_id"]},
+        "indexed": True,
+        "index_failed": {"$ne": True},
+    })
+
+
+async def reuse_indexed_duplicate(document: dict, source: dict, owner_value: str) -> bool:
+    """
+    Indexes `document` by copying the source's chunks and embeddings
+    with new ownership metadata. Returns False when the source has no
+    vectors to copy, so the caller falls back to a full ingestion.
+    """
+
+    copied = await embedding_executor.run(
+        copy_document_vectors,
+        str(source["_id"]),
+        str(document["_id"]),
+        owner_value,
+        str(source["owner"]) if source.get("owner") else GLOBAL_OWNER,
+    )
+
+    if not copied:
+        return False
 
     await db.documents.update_one(
         {"_id": document["_id"]},
@@ -174,7 +510,151 @@ async def extract_and_index_pdf(document: dict):
             "$set": {
                 "indexed": True,
                 "ready_for_chat": True,
-                "processing": False
-            }
+                "processing": False,
+                "chunk_count": copied,
+                "reused_from": source["_id"],
+                **{f: source[f] for f in REUSED_FIELDS if f in source},
+            },
+            "$inc": {"index_version": 1},
+        },
+    )
+
+    logger.info(
+        "Reused %d chunks of %s for %s", copied, source["_id"], document["_id"]
+    )
+    return True
+
+
+async def extract_and_index_pdf(
+    document: dict,
+    progress=None,
+    reindex: bool = False,
+    eager_summary: bool = True,
+):
+    """
+    Extracts text from PDF, detects sections,
+    chunks intelligently, and stores in Chroma.
+
+    With `reindex`, an indexed document is processed again and diffed
+    against what Chroma holds: only new chunks are embedded, vanished
+    ones are deleted, unchanged ones are left alone.
+
+    `progress(stage, percent)` is awaited between stages when given.
+    `eager_summary=False` skips the background summary (bulk runs).
+    """
+
+    # 🚫 Prevent re-indexing
+    if document.get("indexed") and not reindex:
+        return
+
+    # ✅ FIXED OWNER HANDLING
+    owner_value = (
+        str(document["owner"])
+        if document.get("owner")
+        else GLOBAL_OWNER
+    )
+
+    # ♻️ Same bytes already indexed: copy vectors instead of re-embedding
+    source = None if reindex else await find_indexed_duplicate(document)
+
+    if source and await reuse_indexed_duplicate(document, source, owner_value):
+        await finish_indexing(document, eager_summary)
+        return
+
+    loop = asyncio.get_running_loop()
+    path = document["path"]
+    backends = extractor_chain(
+        settings.PDF_EXTRACTOR, settings.PDF_EXTRACTOR_FALLBACK
+    )
+
+    # Called from the pipeline thread: hand work back to the loop
+
+    def fetch_range(start, stop):
+        return asyncio.run_coroutine_threadsafe(
+            ingest_process_executor.run(
+                extract_page_range, path, start, stop, backends
+            ),
+            loop,
+        )
+
+    def on_progress(pages_done, page_count):
+        if progress is not None:
+            percent = 10 + int(85 * pages_done / max(page_count, 1))
+            asyncio.run_coroutine_threadsafe(progress("indexing", percent), loop)
+
+    if progress is not None:
+        await progress("indexing", 10)
+
+    # --------------------------------------------------
+    # 📄 Extract → 🧠 Section → ✂️ Chunk → Embed + Store
+    # --------------------------------------------------
+
+    existing_ids = await embedding_executor.run(
+        get_chunk_ids, str(document["_id"]), owner_value
+    )
+
+    produced, page_stats = await embedding_executor.run(
+        index_pdf_stream,
+        path,
+        str(document["_id"]),
+        owner_value,
+        backends,
+        fetch_range,
+        existing_ids=existing_ids,
+        on_progress=on_progress,
+    )
+
+    if not produced:
+        # Keep the previous index rather than wiping it
+        await db.documents.update_one(
+            {"_id": document["_id"]},
+            {"$set": {"index_failed": True, **page_stats}},
+        )
+        return
+
+    # --------------------------------------------------
+    # 🧹 Drop chunks that no longer exist
+    # --------------------------------------------------
+
+    stale = existing_ids - produced
+    await embedding_executor.run(delete_chunks, stale, owner_value)
+
+    page_stats["chunks_deleted"] = len(stale)
+    changed = bool(page_stats["chunks_added"] or stale)
+
+    # --------------------------------------------------
+    # ✅ Mark Indexed
+    # --------------------------------------------------
+
+    update = {
+        "$set": {
+            "indexed": True,
+            "ready_for_chat": True,
+            "processing": False,
+            "reindexing": False,
+            "index_failed": False,
+            **page_stats,
         },
-    )
\ No newline at end of file
+    }
+
+    # An unchanged re-index keeps cached answers and summaries valid
+    if changed or not document.get("indexed"):
+        update["$inc"] = {"index_version": 1}
+
+    await db.documents.update_one({"_id": document["_id"]}, update)
+
+    if "$inc" in update:
+        await finish_indexing(document, eager_summary)
+
+
+async def finish_indexing(document: dict, eager_summary: bool = True):
+    """
+    📝 Summaries belong to the previous index: drop them and, with
+    SUMMARY_EAGER, start generating the new one.
+    """
+
+    from services.summary_service import invalidate_summaries, schedule_summary
+
+    await invalidate_summaries(document["_id"])
+    if eager_summary:
+        schedule_summary(document["_id"])
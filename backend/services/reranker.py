@@ -1,6 +1,16 @@
+import logging
 import threading
+from collections import Counter
+from dataclasses import dataclass
 from typing import List
-from sentence_transformers import CrossEncoder
+
+import numpy as np
+
+from app.config import settings
+from app.micro_batcher import MicroBatcher
+
+
+logger = logging.getLogger(__name__)
 
 
 # ==================================================
@@ -9,6 +19,29 @@ from sentence_transformers import CrossEncoder
 
 _lock = threading.Lock()
 _reranker = None
+_batcher = None
+
+
+def load_reranker(backend: str = settings.RERANK_BACKEND):
+    """
+    Cross-encoder with a CrossEncoder-style `predict(pairs, batch_size)`
+    and a `tokenizer`, for the given RERANK_BACKEND.
+    """
+    if backend == "torch":
+        from sentence_transformers import CrossEncoder
+
+        return CrossEncoder(
+            settings.RERANK_MODEL,
+            max_length=settings.RERANK_MAX_LENGTH,
+        )
+
+    from app.onnx_encoder import OnnxCrossEncoder, onnx_model_dir
+
+    return OnnxCrossEncoder(
+        onnx_model_dir(settings.EMBED_ONNX_DIR, settings.RERANK_MODEL),
+        backend=backend,
+        max_length=settings.RERANK_MAX_LENGTH,
+    )
 
 
 def get_reranker():
@@ -23,14 +56,121 @@ def get_reranker():
 
     with _lock:
         if _reranker is None:
-            _reranker = CrossEncoder(
-                "cross-encoder/ms-marco-MiniLM-L-6-v2",
-                max_length=512  # sufficient for chunk reranking
-            )
+            _reranker = load_reranker()
 
     return _reranker
 
 
+def reranker_loaded() -> bool:
+    return _reranker is not None
+
+
+# ==================================================
+# 📏 Length-aware Batching
+# ==================================================
+
+def pair_lengths(model, pairs) -> list[int]:
+    """Token count of each (query, passage) pair after truncation."""
+    encoded = model.tokenizer(
+        [query for query, _ in pairs],
+        [passage for _, passage in pairs],
+        truncation="only_second",
+        max_length=settings.RERANK_MAX_LENGTH,
+    )
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def length_batches(lengths: list[int], max_batch_tokens: int) -> list[list[int]]:
+    """
+    Groups pair indices by length so each batch pads to
+    at most `max_batch_tokens` (batch size × longest pair).
+    """
+    batches, batch = [], []
+
+    # Ascending length: the pair being added is the batch's longest
+    for index in sorted(range(len(lengths)), key=lengths.__getitem__):
+        if batch and lengths[index] * (len(batch) + 1) > max_batch_tokens:
+            batches.append(batch)
+            batch = []
+
+        batch.append(index)
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def score_pairs(model, pairs) -> np.ndarray:
+    """
+    Relevance scores in input order. Short pairs run in large batches
+    and long ones in small batches instead of one fixed batch size.
+    """
+    scores = np.zeros(len(pairs), dtype=np.float32)
+
+    if not pairs:
+        return scores
+
+    lengths = pair_lengths(model, pairs)
+
+    for batch in length_batches(lengths, settings.RERANK_MAX_BATCH_TOKENS):
+        scores[batch] = model.predict(
+            [pairs[i] for i in batch],
+            batch_size=len(batch),
+            show_progress_bar=False,
+        )
+
+    return scores
+
+
+# ==================================================
+# 🧺 Cross-request Batcher
+# ==================================================
+
+def rerank_batcher(score_fn) -> MicroBatcher:
+    """
+    Scores the pairs of concurrent rerank calls in shared model passes
+    of up to RERANK_BATCH_MAX_PAIRS pairs; `submit(pairs)` returns
+    that call's scores.
+    """
+
+    def score_requests(requests):
+        scores = score_fn([pair for pairs in requests for pair in pairs])
+        return np.split(scores, np.cumsum([len(pairs) for pairs in requests])[:-1])
+
+    return MicroBatcher(
+        score_requests,
+        max_size=settings.RERANK_BATCH_MAX_PAIRS,
+        max_wait_ms=settings.RERANK_BATCH_MAX_WAIT_MS,
+        size_fn=len,
+        name="rerank-batcher",
+    )
+
+
+def get_rerank_batcher() -> MicroBatcher:
+    global _batcher
+
+    if _batcher is not None:
+        return _batcher
+
+    with _lock:
+        if _batcher is None:
+            _batcher = rerank_batcher(
+                lambda pairs: score_pairs(get_reranker(), pairs)
+            )
+
+    return _batcher
+
+
+def reranker_stats() -> dict:
+    stats = {"backend": settings.RERANK_BACKEND, "cascade": dict(_cascade_counts)}
+
+    if _batcher is None:
+        return {"loaded": reranker_loaded(), **stats}
+
+    return {**stats, **_batcher.stats()}
+
+
 # ==================================================
 # 🧠 Rerank Function
 # ==================================================
@@ -51,18 +191,14 @@ def rerank(query: str, chunks: List, top_k: int = 5):
     if not chunks:
         return []
 
-    model = get_reranker()
-
     try:
         # Prepare (query, chunk) pairs
         pairs = [(query, c.page_content) for c in chunks]
 
-        # CPU-safe batch size (important for 12GB RAM)
-        scores = model.predict(
-            pairs,
-            batch_size=8,   # safer than 16 on CPU
-            show_progress_bar=False
-        )
+        if settings.RERANK_BATCHING:
+            scores = get_rerank_batcher().submit(pairs)
+        else:
+            scores = score_pairs(get_reranker(), pairs)
 
         # Combine chunks with scores
         scored = list(zip(chunks, scores))
@@ -74,7 +210,94 @@ def rerank(query: str, chunks: List, top_k: int = 5):
         return [chunk for chunk, _ in scored[:top_k]]
 
     except Exception as e:
-        print("⚠️ Reranker failed:", e)
+        logger.warning("Reranker failed: %s", e)
 
         # Fail-safe: return first top_k chunks without reranking
-        return chunks[:top_k]
\ No newline at end of file
+        return chunks[:top_k]
+
+
+# ==================================================
+# 🪜 Cascade (vector scores → how much to rerank)
+# ==================================================
+
+_cascade_counts = Counter()
+
+
+@dataclass
+class CascadeDecision:
+    action: str         # "skip" | "shrink" | "full"
+    candidates: int     # chunks sent to the cross-encoder
+    margin: float       # vector-score gap at the prompt boundary
+
+
+def plan_cascade(
+    scores: list[float],
+    prompt_k: int,
+    skip_margin: float,
+    shrink_window: float,
+    min_candidates: int,
+) -> CascadeDecision:
+    """
+    Decides from the (descending) vector scores whether the
+    cross-encoder could change which `prompt_k` chunks reach the prompt.
+
+    - skip:   the prompt_k-th score leads the next one by
+              `skip_margin`; vector order is kept.
+    - shrink: candidates scoring below best - `shrink_window` are not
+              reranked (at least `min_candidates` are).
+    - full:   every candidate is reranked.
+    """
+    if len(scores) <= prompt_k:
+        # Everything reaches the prompt anyway
+        return CascadeDecision("skip", 0, float("inf"))
+
+    margin = scores[prompt_k - 1] - scores[prompt_k]
+
+    if margin >= skip_margin:
+        return CascadeDecision("skip", 0, margin)
+
+    within = sum(1 for score in scores if score >= scores[0] - shrink_window)
+    candidates = min(len(scores), max(within, min_candidates, prompt_k + 1))
+
+    if candidates < len(scores):
+        return CascadeDecision("shrink", candidates, margin)
+
+    return CascadeDecision("full", len(scores), margin)
+
+
+def cascade_rerank(query: str, scored_chunks: List, top_k: int = 5, prompt_k: int = 3):
+    """
+    Reranks (chunk, vector score) pairs, sorted by score, only as far
+    as the vector scores leave the prompt's chunks in doubt. Chunks
+    that skip the cross-encoder follow in vector order.
+    """
+
+    chunks = [chunk for chunk, _ in scored_chunks]
+
+    if not settings.RERANK_CASCADE:
+        return rerank(query, chunks, top_k=top_k)
+
+    decision = plan_cascade(
+        [float(score) for _, score in scored_chunks],
+        prompt_k,
+        settings.RERANK_SKIP_MARGIN,
+        settings.RERANK_SHRINK_WINDOW,
+        settings.RERANK_MIN_CANDIDATES,
+    )
+
+    _cascade_counts[decision.action] += 1
+    _cascade_counts["pairs_saved"] += len(chunks) - decision.candidates
+
+    logger.info(
+        "Rerank cascade: %s, margin %.3f (skip >= %.3f), %d/%d candidates",
+        decision.action,
+        decision.margin,
+        settings.RERANK_SKIP_MARGIN,
+        decision.candidates,
+        len(chunks),
+    )
+
+    head, tail = chunks[:decision.candidates], chunks[decision.candidates:]
+    reranked = rerank(query, head, top_k=len(head)) if head else []
+
+    return (reranked + tail)[:top_k]
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from app.db import db
+from app.config import settings
+from app.chroma_store import semantic_search
+from app.executors import embedding_executor
+from app.llm_inference import generate_text, PRIORITY_SUMMARY
+from services.pdf_service import is_junk_chunk, deduplicate_chunks, prompt_excerpt
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_QUERY = "Summarize the main contributions of this paper"
+
+# Bump when the summary prompt changes so old entries stop matching
+SUMMARY_PROMPT_VERSION = 1
+
+NO_CONTENT_SUMMARY = "No readable content found."
+FAILED_SUMMARY = "Summary generation failed."
+
+
+# ==================================================
+# 🔎 Retrieval + Prompt
+# ==================================================
+
+async def retrieve_summary_context(document: dict):
+    owner = document.get("owner")
+
+    chunks = await embedding_executor.run(
+        semantic_search,
+        query=SUMMARY_QUERY,
+        metadata_id=str(document["_id"]),
+        n_results=15,
+        user_id=str(owner) if owner else None,
+        section_weights=settings.SECTION_WEIGHTS_SUMMARY,
+        index_version=document.get("index_version", 0),
+    )
+
+    valid_chunks = [
+        c for c in chunks
+        if c.page_content and not is_junk_chunk(c.page_content)
+    ]
+
+    return deduplicate_chunks(valid_chunks, 12)
+
+
+def build_summary_prompt(chunks) -> str:
+    context = "\n\n".join(prompt_excerpt(c, 800) for c in chunks[:4])
+
+    return f"""
+Summarize the research paper using this format:
+
+Objective:
+Problem Being Addressed:
+Methodology:
+Key Findings:
+Conclusion:
+Limitations:
+
+Text:
+{context}
+""".strip()
+
+
+# ==================================================
+# 💾 Summary Cache (per document + model + index version)
+# ==================================================
+
+def _cache_filter(document: dict) -> dict:
+    return {
+        "document_id": document["_id"],
+        "model": settings.OLLAMA_MODEL,
+        "prompt_version": SUMMARY_PROMPT_VERSION,
+    }
+
+
+async def get_cached_summary(document: dict) -> str | None:
+    cached = await db.document_summaries.find_one({
+        **_cache_filter(document),
+        "index_version": document.get("index_version", 0),
+    })
+
+    return cached["summary"] if cached else None
+
+
+async def store_summary(document: dict, summary: str):
+    if summary in (NO_CONTENT_SUMMARY, FAILED_SUMMARY) or not summary.strip():
+        return
+
+    await db.document_summaries.update_one(
+        _cache_filter(document),
+        {
+            "$set": {
+                "index_version": document.get("index_version", 0),
+                "summary": summary,
+                "created_at": datetime.utcnow(),
+            }
+        },
+        upsert=True,
+    )
+
+
+async def invalidate_summaries(document_id):
+    await db.document_summaries.delete_many({"document_id": document_id})
+
+
+async def generate_summary(document: dict) -> str:
+    valid_chunks = await retrieve_summary_context(document)
+
+    if not valid_chunks:
+        return NO_CONTENT_SUMMARY
+
+    prompt = build_summary_prompt(valid_chunks)
+    summary = (
+        await generate_text(prompt, priority=PRIORITY_SUMMARY)
+        or FAILED_SUMMARY
+    )
+
+    await store_summary(document, summary)
+    return summary
+
+
+async def get_or_create_summary(document: dict) -> tuple[str, bool]:
+    """
+    Returns (summary, served_from_cache).
+    """
+    cached = await get_cached_summary(document)
+
+    if cached is not None:
+        return cached, True
+
+    return await generate_summary(document), False
+
+
+# ==================================================
+# 🌱 Eager Background Summaries
+# ==================================================
+
+_background_tasks: set = set()
+
+# Only the API process opts in: it outlives the tasks and owns the LLM
+# queue they use. Scripts (bulk pre-indexing, re-index) never start them.
+_eager_enabled = False
+
+
+def enable_eager_summaries():
+    """Called at API startup; honours SUMMARY_EAGER."""
+    global _eager_enabled
+    _eager_enabled = settings.SUMMARY_EAGER
+
+
+async def _warm_summary(document_id):
+    try:
+        document = await db.documents.find_one({"_id": document_id})
+
+        if not document or not document.get("ready_for_chat"):
+            return
+
+        await get_or_create_summary(document)
+        logger.info("Eager summary ready for %s", document_id)
+    except Exception as e:
+        logger.warning("Eager summary failed for %s: %s", document_id, e)
+
+
+def schedule_summary(document_id):
+    """
+    Generates the summary in the background when the API enabled
+    eager summaries (SUMMARY_EAGER).
+    """
+    if not _eager_enabled:
+        return
+
+    task = asyncio.create_task(_warm_summary(document_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_summary_task_done)
+
+
+def _summary_task_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Eager summary task failed: %s", task.exception())
@@ -0,0 +1,161 @@
+import io
+import json
+import os
+import re
+import uuid
+
+import zstandard
+
+from app.config import settings
+from services.pdf_extractors import PageText
+
+
+# ==================================================
+# 🗜️ Extracted Text Cache
+# ==================================================
+#
+#   <TEXT_CACHE_DIR>/<document id>/<extractor version>.jsonl.zst
+#
+# One zstd-compressed JSON line per page, after a header line. Files
+# are written and read as streams, so memory stays at one page.
+#
+
+# Bump when the stored layout or the extraction output changes
+TEXT_CACHE_VERSION = 1
+
+
+def extractor_version(backends: list[str]) -> str:
+    """
+    Cache key part for a backend chain: text extracted by a different
+    chain (or format version) is a different entry.
+    """
+    return f"v{TEXT_CACHE_VERSION}-" + "+".join(backends)
+
+
+class CachedTextWriter:
+    """
+    Streams pages into a temporary file; `commit()` publishes it
+    atomically. A writer that is never committed leaves nothing behind.
+    """
+
+    def __init__(self, path: str, header: dict, level: int):
+        self.path = path
+        self._temp_path = f"{path}.{uuid.uuid4().hex}.part"
+        self._file = open(self._temp_path, "wb")
+        self._stream = zstandard.ZstdCompressor(level=level).stream_writer(self._file)
+        self._write(header)
+
+    def _write(self, record: dict):
+        self._stream.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def write(self, page: PageText, headings: list):
+        self._write({
+            "n": page.number,
+            "text": page.text,
+            "error": page.error,
+            "backend": page.backend,
+            "headings": headings,
+        })
+
+    def commit(self):
+        self._stream.close()
+        os.replace(self._temp_path, self.path)
+
+    def discard(self):
+        if not self._stream.closed:
+            self._stream.close()
+        try:
+            os.remove(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class ExtractedTextCache:
+    """
+    Per-page extracted text and detected section headings, saved once
+    per document and extractor version so re-chunking and re-embedding
+    never re-parse the PDF.
+    """
+
+    def __init__(self, directory: str, level: int, enabled: bool = True):
+        self.directory = directory
+        self.level = level
+        self.enabled = enabled
+
+    def path(self, document_id: str, version: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.+-]+", "_", version)
+        return os.path.join(self.directory, str(document_id), f"{safe}.jsonl.zst")
+
+    def has(self, document_id: str, version: str) -> bool:
+        return self.enabled and os.path.exists(self.path(document_id, version))
+
+    def writer(
+        self,
+        document_id: str,
+        version: str,
+        page_count: int,
+        section_fingerprint: str,
+    ) -> CachedTextWriter | None:
+        if not self.enabled:
+            return None
+
+        path = self.path(document_id, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        return CachedTextWriter(
+            path,
+            {
+                "document_id": str(document_id),
+                "version": version,
+                "page_count": page_count,
+                "sections": section_fingerprint,
+            },
+            self.level,
+        )
+
+    def read_header(self, document_id: str, version: str) -> dict:
+        with self._open(document_id, version) as lines:
+            return json.loads(next(lines))
+
+    def iter_pages(self, document_id: str, version: str, section_fingerprint: str):
+        """
+        Yields (PageText, headings) in page order. Headings are None
+        when they were detected by a different SECTION_REGEX, so the
+        caller re-detects them from the text.
+        """
+        with self._open(document_id, version) as lines:
+            header = json.loads(next(lines))
+            same_sections = header.get("sections") == section_fingerprint
+
+            for line in lines:
+                record = json.loads(line)
+                page = PageText(
+                    record["n"],
+                    record["text"],
+                    record.get("error"),
+                    record.get("backend"),
+                )
+                yield page, (record.get("headings") if same_sections else None)
+
+    def _open(self, document_id: str, version: str):
+        raw = open(self.path(document_id, version), "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return _LineReader(reader)
+
+
+class _LineReader:
+    def __init__(self, reader):
+        self._text = io.TextIOWrapper(reader, encoding="utf-8")
+
+    def __enter__(self):
+        return iter(self._text)
+
+    def __exit__(self, *exc):
+        self._text.close()
+
+
+text_cache = ExtractedTextCache(
+    settings.TEXT_CACHE_DIR,
+    level=settings.TEXT_CACHE_LEVEL,
+    enabled=settings.TEXT_CACHE_ENABLED,
+)